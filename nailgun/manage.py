@@ -93,6 +93,24 @@ if __name__ == "__main__":
         help='load data from default fixtures '
              '(settings.FIXTURES_TO_IPLOAD)'
     )
+    replay_rpc_parser = subparsers.add_parser(
+        'replay_rpc', help='apply messages recorded by RPC consumer '
+        'journal and print receiver latencies'
+    )
+    replay_rpc_parser.add_argument(
+        'journal', action='store', help='journal file'
+    )
+    replay_rpc_parser.add_argument(
+        '-s', '--speed', dest='speed', action='store', type=float,
+        help='1 keeps recorded intervals between messages, 2 makes them '
+        'twice as short and so on; by default messages are applied as '
+        'fast as possible', default=0
+    )
+    replay_rpc_parser.add_argument(
+        '-c', '--config', dest='config_file', action='store', type=str,
+        help='custom config file, use it to point to scratch database',
+        default=None
+    )
     dump_settings = subparsers.add_parser(
         'dump_settings', help='dump current settings to YAML'
     )
@@ -135,6 +153,12 @@ if __name__ == "__main__":
         from nailgun.db.sqlalchemy import fixman
         fixman.upload_fixtures()
         logger.info("Done")
+    elif params.action == "replay_rpc":
+        if params.config_file:
+            settings.update_from_file(params.config_file)
+        from nailgun.rpc.replay import replay_journal
+        stats = replay_journal(params.journal, speed=params.speed)
+        sys.stdout.write(stats.format() + "\n")
     elif params.action == "dump_settings":
         sys.stdout.write(settings.dump())
     elif params.action in ("run",):
@@ -16,16 +16,18 @@
 
 from datetime import datetime
 from decorator import decorator
-import json
+from types import GeneratorType
 
 import web
 
 from nailgun.api.serializers.base import BasicSerializer
 from nailgun.api.validators.base import BasicValidator
 from nailgun.db import db
+from nailgun.db.sqlalchemy import versions
 from nailgun.errors import errors
 from nailgun.logger import logger
 from nailgun import notifier
+from nailgun.utils import json_codec
 
 
 def check_client_content_type(handler):
@@ -56,10 +58,143 @@ def content_json(func, *args, **kwargs):
     return build_json_response(data)
 
 
+def etag(*tables):
+    """Decorator of GET method of handler, it sets ETag made of
+    change counters of tables data is read from and answers
+    304 Not Modified without running method if client's
+    If-None-Match header has the same tag.
+    """
+    @decorator
+    def check_etag(func, handler, *args, **kwargs):
+        # tag is taken before data is read, so data
+        # changed meanwhile gets the newer tag next time
+        tag = versions.etag(
+            tables, u'{0}:{1}'.format(web.ctx.query, args))
+        web.header('ETag', tag)
+        if web.ctx.env.get('HTTP_IF_NONE_MATCH') == tag:
+            raise web.notmodified()
+        return func(handler, *args, **kwargs)
+    return check_etag
+
+
+def is_streamed(data):
+    """Checks if data is a generator or a dict with generators
+    or callables among values, such data is encoded by
+    build_json_response lazily with stream_json.
+    """
+    if isinstance(data, GeneratorType):
+        return True
+    if isinstance(data, dict):
+        return any(isinstance(v, GeneratorType) or callable(v)
+                   for v in data.itervalues())
+    return False
+
+
+def iter_json(data):
+    """Yields JSON of data by pieces, output is the same as of
+    json.dumps. Generators are encoded as arrays item by item,
+    dicts with them are encoded key by key (use OrderedDict to
+    keep order of keys), callables are called when encoder
+    reaches them, so they may return values which are known
+    only after preceding generators are exhausted.
+    """
+    if callable(data):
+        data = data()
+    if isinstance(data, GeneratorType):
+        empty = True
+        for item in data:
+            # opening bracket is yielded with the first item,
+            # so errors of query behind generator happen
+            # before response headers are sent
+            for piece in _prefixed('[' if empty else ', ', item):
+                yield piece
+            empty = False
+        yield '[]' if empty else ']'
+    elif is_streamed(data):
+        for i, (key, value) in enumerate(data.iteritems()):
+            prefix = '{' if i == 0 else ', '
+            prefix += json_codec.dumps(key) + ': '
+            for piece in _prefixed(prefix, value):
+                yield piece
+        yield '}'
+    else:
+        yield json_codec.dumps(data)
+
+
+def _prefixed(prefix, data):
+    pieces = iter_json(data)
+    yield prefix + next(pieces)
+    for piece in pieces:
+        yield piece
+
+
+def stream_json(data, chunk_size=65536):
+    """Yields JSON of data in chunks of about chunk_size bytes,
+    the first chunk is yielded as soon as it's ready.
+
+    Data is read when web.py iterates response, after
+    load_db_driver has already finished request transaction,
+    so transaction opened by generators is finished here.
+    """
+    try:
+        chunk = []
+        size = 0
+        limit = 1
+        for piece in iter_json(data):
+            chunk.append(piece)
+            size += len(piece)
+            if size >= limit:
+                yield ''.join(chunk)
+                chunk = []
+                size = 0
+                limit = chunk_size
+        if chunk:
+            yield ''.join(chunk)
+    except Exception:
+        db().rollback()
+        raise
+    finally:
+        db().commit()
+        db().expire_all()
+
+
+def iter_batches(query, column, limit=None, batch_size=100):
+    """Yields lists of objects of query ordered by column,
+    every list is loaded with a separate query which starts
+    after the last value of column in previous list, so
+    large collections are never held in memory at once.
+
+    :param query: Query without order and limit.
+    :param column: Unique column, usually primary key.
+    :param limit: Max number of objects to load.
+    :type  limit: int
+    :param batch_size: Max number of objects in one list.
+    :type  batch_size: int
+    """
+    query = query.order_by(column)
+    last = None
+    while limit is None or limit > 0:
+        size = batch_size if limit is None else min(batch_size, limit)
+        batch_query = query
+        if last is not None:
+            batch_query = batch_query.filter(column > last)
+        batch = batch_query.limit(size).all()
+        if not batch:
+            return
+        yield batch
+        if len(batch) < size:
+            return
+        if limit is not None:
+            limit -= len(batch)
+        last = getattr(batch[-1], column.key)
+
+
 def build_json_response(data):
     web.header('Content-Type', 'application/json')
+    if is_streamed(data):
+        return stream_json(data)
     if type(data) in (dict, list):
-        return json.dumps(data)
+        return json_codec.dumps(data)
     return data
 
 
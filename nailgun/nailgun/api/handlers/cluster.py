@@ -23,6 +23,7 @@ import traceback
 import web
 
 from nailgun.api.handlers.base import content_json
+from nailgun.api.handlers.base import etag
 from nailgun.api.handlers.base import JSONHandler
 from nailgun.api.handlers.tasks import TaskHandler
 from nailgun.api.serializers.network_configuration \
@@ -141,6 +142,7 @@ class ClusterCollectionHandler(JSONHandler):
     validator = ClusterValidator
 
     @content_json
+    @etag('clusters', 'cluster_changes')
     def GET(self):
         """:returns: Collection of JSONized Cluster objects.
         :http: * 200 (OK)
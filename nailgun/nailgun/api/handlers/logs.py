@@ -18,6 +18,7 @@
 Handlers dealing with logs
 """
 
+from collections import OrderedDict
 from itertools import dropwhile
 import json
 import logging
@@ -187,7 +188,6 @@ class LogEntryCollectionHandler(JSONHandler):
                          log_config['id'], e)
             raise web.internalerror("Invalid regular expression in config")
 
-        entries = []
         to_byte = None
         try:
             to_byte = int(user_data.get('to', 0))
@@ -224,68 +224,78 @@ class LogEntryCollectionHandler(JSONHandler):
                 )
             ]
 
-        has_more = False
-        with open(log_file, 'r') as f:
-            f.seek(0, 2)
-            # we need to calculate current position manually instead of using
-            # tell() because read_backwards uses buffering
-            pos = f.tell()
-            multilinebuf = []
-            for line in read_backwards(f):
-                pos -= len(line)
-                if not truncate_log and pos < to_byte:
-                    has_more = pos > 0
-                    break
-                entry = line.rstrip('\n')
-                if not len(entry):
-                    continue
-                if 'skip_regexp' in log_config and \
-                        re.match(log_config['skip_regexp'], entry):
-                    continue
-                m = regexp.match(entry)
-                if m is None:
-                    if log_config.get('multiline'):
-                        #  Add next multiline part to last entry if it exist.
-                        multilinebuf.append(entry)
-                    else:
-                        logger.debug("Unable to parse log entry '%s' from %s",
-                                     entry, log_file)
-                    continue
-                entry_text = m.group('text')
-                if len(multilinebuf):
-                    multilinebuf.reverse()
-                    entry_text += '\n' + '\n'.join(multilinebuf)
-                    multilinebuf = []
-                entry_level = m.group('level').upper() or 'INFO'
-                if level and not (entry_level in allowed_levels):
-                    continue
-                try:
-                    entry_date = time.strptime(m.group('date'),
-                                               log_config['date_format'])
-                except ValueError:
-                    logger.debug("Unable to parse date from log entry."
-                                 " Date format: %r, date part of entry: %r",
-                                 log_config['date_format'],
-                                 m.group('date'))
-                    continue
-
-                for regex, replace in regs:
-                    entry_text = regex.sub(replace, entry_text)
-
-                entries.append([
-                    time.strftime(settings.UI_LOG_DATE_FORMAT, entry_date),
-                    entry_level,
-                    entry_text
-                ])
-                if truncate_log and len(entries) >= max_entries:
-                    has_more = True
-                    break
-
-        return {
-            'entries': entries,
-            'to': log_file_size,
-            'has_more': has_more,
-        }
+        # has_more is known only after entries are read,
+        # it's rendered after them
+        state = {'has_more': False}
+
+        def read_entries():
+            count = 0
+            with open(log_file, 'r') as f:
+                f.seek(0, 2)
+                # we need to calculate current position manually instead
+                # of using tell() because read_backwards uses buffering
+                pos = f.tell()
+                multilinebuf = []
+                for line in read_backwards(f):
+                    pos -= len(line)
+                    if not truncate_log and pos < to_byte:
+                        state['has_more'] = pos > 0
+                        break
+                    entry = line.rstrip('\n')
+                    if not len(entry):
+                        continue
+                    if 'skip_regexp' in log_config and \
+                            re.match(log_config['skip_regexp'], entry):
+                        continue
+                    m = regexp.match(entry)
+                    if m is None:
+                        if log_config.get('multiline'):
+                            #  Add next multiline part to last entry
+                            #  if it exist.
+                            multilinebuf.append(entry)
+                        else:
+                            logger.debug(
+                                "Unable to parse log entry '%s' from %s",
+                                entry, log_file)
+                        continue
+                    entry_text = m.group('text')
+                    if len(multilinebuf):
+                        multilinebuf.reverse()
+                        entry_text += '\n' + '\n'.join(multilinebuf)
+                        multilinebuf = []
+                    entry_level = m.group('level').upper() or 'INFO'
+                    if level and not (entry_level in allowed_levels):
+                        continue
+                    try:
+                        entry_date = time.strptime(m.group('date'),
+                                                   log_config['date_format'])
+                    except ValueError:
+                        logger.debug(
+                            "Unable to parse date from log entry."
+                            " Date format: %r, date part of entry: %r",
+                            log_config['date_format'],
+                            m.group('date'))
+                        continue
+
+                    for regex, replace in regs:
+                        entry_text = regex.sub(replace, entry_text)
+
+                    yield [
+                        time.strftime(settings.UI_LOG_DATE_FORMAT,
+                                      entry_date),
+                        entry_level,
+                        entry_text
+                    ]
+                    count += 1
+                    if truncate_log and count >= max_entries:
+                        state['has_more'] = True
+                        break
+
+        return OrderedDict([
+            ('entries', read_entries()),
+            ('to', log_file_size),
+            ('has_more', lambda: state['has_more']),
+        ])
 
 
 class LogPackageHandler(object):
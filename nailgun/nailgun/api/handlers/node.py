@@ -22,11 +22,14 @@ from datetime import datetime
 import json
 import traceback
 
+from sqlalchemy.orm import defer
 from sqlalchemy.orm import joinedload
 
 import web
 
 from nailgun.api.handlers.base import content_json
+from nailgun.api.handlers.base import etag
+from nailgun.api.handlers.base import iter_batches
 from nailgun.api.handlers.base import JSONHandler
 from nailgun.api.validators.network import NetAssignmentValidator
 from nailgun.api.validators.node import NodeValidator
@@ -36,8 +39,10 @@ from nailgun.db.sqlalchemy.models import NetworkGroup
 from nailgun.db.sqlalchemy.models import Node
 from nailgun.db.sqlalchemy.models import NodeAttributes
 from nailgun.db.sqlalchemy.models import NodeNICInterface
+from nailgun.db.sqlalchemy.models import Role
 from nailgun.logger import logger
 from nailgun.network.manager import NetworkManager
+from nailgun.network.resolver import NetworkDataResolver
 from nailgun.network.topology import TopoChecker
 from nailgun import notifier
 
@@ -55,8 +60,8 @@ class NodeHandler(JSONHandler):
         json_data = None
         try:
             json_data = JSONHandler.render(instance, fields=cls.fields)
-            json_data['network_data'] = NetworkManager.get_node_networks(
-                instance.id)
+            json_data['network_data'] = NetworkDataResolver(
+                [instance]).get(instance)
         except Exception:
             logger.error(traceback.format_exc())
         return json_data
@@ -163,49 +168,153 @@ class NodeCollectionHandler(JSONHandler):
 
     validator = NodeValidator
 
+    # fields which can be requested with fields parameter
+    # besides of cls.fields
+    extra_fields = ('network_data',)
+
+    # relations loaded by the same query when field is requested
+    eager_fields = {
+        'cluster': 'cluster',
+        'roles': 'role_list',
+        'pending_roles': 'pending_role_list'
+    }
+
+    # parameters with comparable columns
+    filters = ('status', 'online', 'pending_addition', 'pending_deletion')
+
     @classmethod
     def render(cls, nodes, fields=None):
+        """:param fields: Fields to render, by default
+        cls.fields and network_data are rendered.
+        """
+        fields = fields or cls.fields + cls.extra_fields
+        node_fields = [f for f in fields if f not in cls.extra_fields]
         json_list = []
-        network_manager = NetworkManager
-        ips_mapped = network_manager.get_grouped_ips_by_node()
-        networks_grouped = network_manager.get_networks_grouped_by_cluster()
+        nodes = list(nodes)
+        networks = None
+        if 'network_data' in fields:
+            networks = NetworkDataResolver(nodes)
         for node in nodes:
             try:
-                json_data = JSONHandler.render(node, fields=cls.fields)
+                json_data = JSONHandler.render(node, fields=node_fields)
 
-                json_data['network_data'] = network_manager.\
-                    get_node_networks_optimized(
-                        node, ips_mapped.get(node.id, []),
-                        networks_grouped.get(node.cluster_id, []))
+                if networks is not None:
+                    json_data['network_data'] = networks.get(node)
                 json_list.append(json_data)
             except Exception:
                 logger.error(traceback.format_exc())
         return json_list
 
+    @classmethod
+    def render_stream(cls, query, fields=None, limit=None):
+        """Generator of rendered nodes of query ordered by id,
+        nodes are loaded and rendered by batches while response
+        is being sent.
+        """
+        for nodes in iter_batches(query, Node.id, limit=limit):
+            for json_data in cls.render(nodes, fields=fields):
+                yield json_data
+
+    @classmethod
+    def get_fields(cls, fields):
+        """Returns tuple of fields from fields parameter
+        or None if it's not specified.
+        """
+        if not fields:
+            return None
+        fields = tuple(f.strip() for f in fields.split(',') if f.strip())
+        unknown = set(fields) - set(cls.fields + cls.extra_fields)
+        if unknown:
+            raise web.badrequest(message=(
+                "Unknown node fields: {0}".format(
+                    ', '.join(sorted(unknown)))))
+        # id is always rendered, it's needed for pagination
+        if 'id' not in fields:
+            fields = ('id',) + fields
+        return fields
+
+    @classmethod
+    def get_filter_value(cls, name, value):
+        if name == 'status':
+            statuses = value.split(',')
+            unknown = set(statuses) - set(Node.NODE_STATUSES)
+            if unknown:
+                raise web.badrequest(message=(
+                    "Unknown node statuses: {0}".format(
+                        ', '.join(sorted(unknown)))))
+            return statuses
+        if value.lower() in ('true', '1'):
+            return True
+        if value.lower() in ('false', '0'):
+            return False
+        raise web.badrequest(message=(
+            "Invalid value of '{0}' parameter: '{1}'".format(name, value)))
+
+    @classmethod
+    def get_int(cls, name, value):
+        if not value.isdigit():
+            raise web.badrequest(message=(
+                "Invalid value of '{0}' parameter: '{1}'".format(name, value)))
+        return int(value)
+
     @content_json
+    @etag('nodes', 'node_roles', 'pending_node_roles', 'roles',
+          'clusters', 'neutron_configs', 'network_groups',
+          'node_nic_interfaces', 'net_assignments', 'ip_addrs')
     def GET(self):
-        """May receive cluster_id parameter to filter list
-        of nodes
-
-        :returns: Collection of JSONized Node objects.
+        """May receive parameters to filter list of nodes:
+        cluster_id (empty value for nodes without cluster),
+        status and roles (comma-separated, any of values matches),
+        online, pending_addition, pending_deletion (true or false).
+
+        Nodes are ordered by id, a page of them is returned
+        with limit and after (id of the last node of previous page)
+        parameters. Only comma-separated fields are returned with
+        fields parameter, meta and network_data aren't even loaded
+        if they are not requested.
+
+        :returns: Collection of JSONized Node objects,
+            it's streamed while nodes are loaded by batches.
         :http: * 200 (OK)
+               * 400 (invalid parameters)
         """
-        user_data = web.input(cluster_id=None)
-        nodes = db().query(Node).options(
-            joinedload('cluster'),
-            joinedload('interfaces'),
-            joinedload('interfaces.assigned_networks_list'),
-            joinedload('role_list'),
-            joinedload('pending_role_list'))
+        user_data = web.input(cluster_id=None, roles=None, after=None,
+                              limit=None, fields=None,
+                              **dict((f, None) for f in self.filters))
+        fields = self.get_fields(user_data.fields)
+        requested = fields or self.fields + self.extra_fields
+
+        nodes = db().query(Node).options(*[
+            joinedload(relation)
+            for field, relation in self.eager_fields.iteritems()
+            if field in requested])
+        if 'meta' not in requested:
+            nodes = nodes.options(defer('meta'))
+
         if user_data.cluster_id == '':
-            nodes = nodes.filter_by(
-                cluster_id=None).all()
+            nodes = nodes.filter_by(cluster_id=None)
         elif user_data.cluster_id:
-            nodes = nodes.filter_by(
-                cluster_id=user_data.cluster_id).all()
-        else:
-            nodes = nodes.all()
-        return self.render(nodes)
+            nodes = nodes.filter_by(cluster_id=user_data.cluster_id)
+        for name in self.filters:
+            value = getattr(user_data, name)
+            if value is None:
+                continue
+            value = self.get_filter_value(name, value)
+            if isinstance(value, list):
+                nodes = nodes.filter(getattr(Node, name).in_(value))
+            else:
+                nodes = nodes.filter(getattr(Node, name) == value)
+        if user_data.roles:
+            nodes = nodes.filter(Node.role_list.any(
+                Role.name.in_(user_data.roles.split(','))))
+
+        if user_data.after:
+            nodes = nodes.filter(
+                Node.id > self.get_int('after', user_data.after))
+        limit = None
+        if user_data.limit:
+            limit = self.get_int('limit', user_data.limit)
+        return self.render_stream(nodes, fields=fields, limit=limit)
 
     @content_json
     def POST(self):
@@ -21,6 +21,7 @@ Handlers dealing with notifications
 import web
 
 from nailgun.api.handlers.base import content_json
+from nailgun.api.handlers.base import etag
 from nailgun.api.handlers.base import JSONHandler
 from nailgun.api.validators.notification import NotificationValidator
 from nailgun.db import db
@@ -89,6 +90,7 @@ class NotificationCollectionHandler(JSONHandler):
     validator = NotificationValidator
 
     @content_json
+    @etag('notifications')
     def GET(self):
         """:returns: Collection of JSONized Notification objects.
         :http: * 200 (OK)
@@ -17,6 +17,8 @@
 import web
 
 from nailgun.api.handlers.base import content_json
+from nailgun.api.handlers.base import etag
+from nailgun.api.handlers.base import iter_batches
 from nailgun.api.handlers.base import JSONHandler
 from nailgun.db import db
 from nailgun.db.sqlalchemy.models import Task
@@ -75,6 +77,7 @@ class TaskCollectionHandler(JSONHandler):
     """
 
     @content_json
+    @etag('tasks')
     def GET(self):
         """May receive cluster_id parameter to filter list
         of tasks
@@ -84,15 +87,14 @@ class TaskCollectionHandler(JSONHandler):
                * 404 (task not found in db)
         """
         user_data = web.input(cluster_id=None)
+        tasks = db().query(Task)
         if user_data.cluster_id == '':
-            tasks = db().query(Task).filter_by(
-                cluster_id=None).all()
+            tasks = tasks.filter_by(cluster_id=None)
         elif user_data.cluster_id:
-            tasks = db().query(Task).filter_by(
-                cluster_id=user_data.cluster_id).all()
-        else:
-            tasks = db().query(Task).all()
-        return map(
-            TaskHandler.render,
-            tasks
+            tasks = tasks.filter_by(cluster_id=user_data.cluster_id)
+        # rendered tasks are streamed while they are loaded
+        return (
+            TaskHandler.render(task)
+            for batch in iter_batches(tasks, Task.id)
+            for task in batch
         )
@@ -14,29 +14,78 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from operator import attrgetter
+
+from sqlalchemy.orm import configure_mappers
+
+
+def _scalar_relation_getter(field):
+    get = attrgetter(field)
+
+    def get_id(instance):
+        value = get(instance)
+        return value.id if value is not None else None
+    return get_id
+
+
+def _collection_getter(field):
+    get = attrgetter(field)
+
+    def get_ids(instance):
+        value = get(instance)
+        return [v.id for v in value] if value is not None else None
+    return get_ids
+
 
 class BasicSerializer(object):
 
+    fields = ()
+
+    # (model, field) => getter, only fields defined
+    # in model are cached, so the cache is bounded
+    _getters = {}
+
+    @classmethod
+    def getter(cls, model, field):
+        """Returns function which returns value of field of model
+        instance as it's serialized: id of related object, list of
+        ids of related objects or value itself. Type of field is
+        resolved only once for every model and field.
+
+        :param model: Model class.
+        :param field: Name of field.
+        :type  field: str
+        """
+        key = (model, field)
+        getter = cls._getters.get(key)
+        if getter is not None:
+            return getter
+
+        # backrefs are added to models when mappers are configured
+        configure_mappers()
+        rel = None
+        f = getattr(model, field, None)
+        if hasattr(f, "impl"):
+            rel = f.impl.__class__.__name__
+        if rel == 'ScalarObjectAttributeImpl':
+            getter = _scalar_relation_getter(field)
+        elif rel == 'CollectionAttributeImpl':
+            getter = _collection_getter(field)
+        else:
+            getter = attrgetter(field)
+        if f is not None:
+            cls._getters[key] = getter
+        return getter
+
     @classmethod
     def serialize(cls, instance, fields=None):
-        data_dict = {}
         use_fields = fields if fields else cls.fields
         if not use_fields:
             raise ValueError("No fields for serialize")
+        model = instance.__class__
+        getters = cls._getters
+        data_dict = {}
         for field in use_fields:
-            value = getattr(instance, field)
-            if value is None:
-                data_dict[field] = value
-            else:
-                f = getattr(instance.__class__, field)
-                if hasattr(f, "impl"):
-                    rel = f.impl.__class__.__name__
-                    if rel == 'ScalarObjectAttributeImpl':
-                        data_dict[field] = value.id
-                    elif rel == 'CollectionAttributeImpl':
-                        data_dict[field] = [v.id for v in value]
-                    else:
-                        data_dict[field] = value
-                else:
-                    data_dict[field] = value
+            getter = getters.get((model, field)) or cls.getter(model, field)
+            data_dict[field] = getter(instance)
         return data_dict
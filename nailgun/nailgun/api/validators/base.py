@@ -13,10 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import json
 from jsonschema import validate
 
 from nailgun.errors import errors
+from nailgun.utils import json_codec
 
 
 class BasicValidator(object):
@@ -25,7 +25,7 @@ class BasicValidator(object):
     def validate_json(cls, data):
         if data:
             try:
-                res = json.loads(data)
+                res = json_codec.loads(data)
             except Exception:
                 raise errors.InvalidData(
                     "Invalid json received",
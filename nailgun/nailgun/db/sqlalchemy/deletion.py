@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Set-based deletion helpers.
+
+Every helper issues one DELETE ... WHERE statement per table instead
+of loading rows into the session and deleting them one by one. ORM
+cascades are not applied, so dependent tables are cleaned up here
+explicitly, except ones with ON DELETE CASCADE foreign keys.
+Helpers don't commit.
+"""
+
+from nailgun.db import db
+from nailgun.db.sqlalchemy.models import Attributes
+from nailgun.db.sqlalchemy.models import Cluster
+from nailgun.db.sqlalchemy.models import ClusterChanges
+from nailgun.db.sqlalchemy.models import IPAddr
+from nailgun.db.sqlalchemy.models import IPAddrRange
+from nailgun.db.sqlalchemy.models import NetworkGroup
+from nailgun.db.sqlalchemy.models import NeutronConfig
+from nailgun.db.sqlalchemy.models import Node
+from nailgun.db.sqlalchemy.models import NodeAttributes
+from nailgun.db.sqlalchemy.models import NodeRoles
+from nailgun.db.sqlalchemy.models import PendingNodeRoles
+from nailgun.db.sqlalchemy.models import Task
+
+
+def delete_where(model, *criteria):
+    """Deletes rows of model matching criteria with one statement.
+
+    Session is flushed before, objects loaded into session are
+    not synchronized, so they shouldn't be used after deletion.
+
+    :param model: Model class.
+    :param criteria: SQLAlchemy filter expressions.
+    :returns: Number of deleted rows.
+    """
+    db().flush()
+    return db().query(model).filter(*criteria).delete(
+        synchronize_session=False)
+
+
+def delete_nodes(*criteria):
+    """Deletes nodes matching criteria with all their
+    roles, attributes, interfaces and IP addresses.
+
+    :param criteria: SQLAlchemy filter expressions on Node.
+    :returns: Number of deleted nodes.
+    """
+    nodes_ids = db().query(Node.id).filter(*criteria).subquery()
+
+    delete_where(NodeRoles, NodeRoles.node.in_(nodes_ids))
+    delete_where(PendingNodeRoles, PendingNodeRoles.node.in_(nodes_ids))
+    delete_where(NodeAttributes, NodeAttributes.node_id.in_(nodes_ids))
+    # interfaces with their network assignments, IP addresses
+    # and node changes are deleted by foreign keys
+    deleted = delete_where(Node, Node.id.in_(nodes_ids))
+    db().expire_all()
+    return deleted
+
+
+def delete_cluster(cluster_id):
+    """Deletes cluster with its nodes, tasks, network groups,
+    IP addresses and attributes.
+
+    :param cluster_id: Cluster database ID.
+    :type  cluster_id: int
+    """
+    delete_nodes(Node.cluster_id == cluster_id)
+
+    ng_ids = db().query(NetworkGroup.id).filter(
+        NetworkGroup.cluster_id == cluster_id
+    ).subquery()
+    delete_where(IPAddr, IPAddr.network.in_(ng_ids))
+    delete_where(IPAddrRange, IPAddrRange.network_group_id.in_(ng_ids))
+    delete_where(NetworkGroup, NetworkGroup.cluster_id == cluster_id)
+
+    # subtasks are deleted in the same statement as their parents
+    delete_where(Task, Task.cluster_id == cluster_id)
+    delete_where(Attributes, Attributes.cluster_id == cluster_id)
+    delete_where(ClusterChanges, ClusterChanges.cluster_id == cluster_id)
+    delete_where(NeutronConfig, NeutronConfig.cluster_id == cluster_id)
+    delete_where(Cluster, Cluster.id == cluster_id)
+    db().expire_all()
@@ -210,12 +210,11 @@ class Cluster(Base):
         db().commit()
 
     def clear_pending_changes(self, node_id=None):
-        chs = db().query(ClusterChanges).filter_by(
-            cluster_id=self.id
-        )
+        from nailgun.db.sqlalchemy.deletion import delete_where
+        criteria = [ClusterChanges.cluster_id == self.id]
         if node_id:
-            chs = chs.filter_by(node_id=node_id)
-        map(db().delete, chs.all())
+            criteria.append(ClusterChanges.node_id == node_id)
+        delete_where(ClusterChanges, *criteria)
         db().commit()
 
     @property
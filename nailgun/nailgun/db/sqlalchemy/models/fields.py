@@ -14,10 +14,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import json
-
 import sqlalchemy.types as types
 
+from nailgun.utils import json_codec
+
 
 class JSON(types.TypeDecorator):
 
@@ -25,12 +25,12 @@ class JSON(types.TypeDecorator):
 
     def process_bind_param(self, value, dialect):
         if value is not None:
-            value = json.dumps(value)
+            value = json_codec.dumps(value)
         return value
 
     def process_result_value(self, value, dialect):
         if value is not None:
-            value = json.loads(value)
+            value = json_codec.loads(value)
         return value
 
 
@@ -20,12 +20,16 @@ from sqlalchemy import ForeignKey
 from sqlalchemy import Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy import String
+from sqlalchemy import UniqueConstraint
 
 from nailgun.db.sqlalchemy.models.base import Base
 
 
 class IPAddr(Base):
     __tablename__ = 'ip_addrs'
+    __table_args__ = (
+        UniqueConstraint('network', 'ip_addr'),
+    )
     id = Column(Integer, primary_key=True)
     network = Column(Integer, ForeignKey('network_groups.id',
                                          ondelete="CASCADE"))
@@ -129,8 +129,8 @@ class Node(Base):
 
     @property
     def network_data(self):
-        from nailgun.network.manager import NetworkManager
-        return NetworkManager.get_node_networks(self.id)
+        from nailgun.network.resolver import NetworkDataResolver
+        return NetworkDataResolver([self]).get(self)
 
     @property
     def volume_manager(self):
@@ -210,12 +210,14 @@ class Node(Base):
 
         :raises: errors.CanNotFindInterface
         """
+        from nailgun.network.interfaces import NodeInterfacesIndex
         from nailgun.network.manager import NetworkManager
 
-        admin_ng = NetworkManager.get_admin_network_group()
-        for interface in self.interfaces:
-            if admin_ng in interface.assigned_networks_list:
-                return interface
+        admin_ng_id = NetworkManager.get_admin_network_group_id()
+        interface = NodeInterfacesIndex.get(self).by_network_id.get(
+            admin_ng_id)
+        if interface is not None:
+            return interface
 
         for interface in self.interfaces:
             ip_addr = interface.ip_addr
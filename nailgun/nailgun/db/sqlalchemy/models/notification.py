@@ -18,6 +18,7 @@ from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import Enum
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import Text
 
@@ -26,6 +27,10 @@ from nailgun.db.sqlalchemy.models.base import Base
 
 class Notification(Base):
     __tablename__ = 'notifications'
+    # notifications are deduplicated by task, node and message
+    __table_args__ = (
+        Index('notifications_task_id_node_id', 'task_id', 'node_id'),
+    )
 
     NOTIFICATION_STATUSES = (
         'read',
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Change counters of tables. Counter of table is changed by every
+INSERT, UPDATE and DELETE statement executed for it and once more
+when transaction is committed, so ETag made of counters changes
+only after data is changed and is visible to other sessions.
+Counters are kept in memory of process, so ETags depend on epoch
+which is different for every process start.
+"""
+
+import hashlib
+import itertools
+import threading
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import UpdateBase
+
+from nailgun.db.sqlalchemy import engine
+
+
+epoch = uuid.uuid4().hex
+
+_counter = itertools.count(1)
+_versions = {}
+_lock = threading.Lock()
+# tables changed by not committed transaction of session of thread
+_local = threading.local()
+
+
+def bump(tables):
+    """Changes counters of tables."""
+    with _lock:
+        version = next(_counter)
+        for table in tables:
+            _versions[table] = version
+
+
+def get(tables):
+    """Returns tuple of counters of tables."""
+    return tuple(_versions.get(table, 0) for table in tables)
+
+
+def etag(tables, key=''):
+    """Returns ETag header value for data read from tables.
+
+    :param tables: Names of tables.
+    :param key: Parameters data depends on, e.g. query string.
+    :type  key: str
+    """
+    data = u'{0}:{1}:{2}'.format(
+        epoch, ','.join(str(v) for v in get(tables)), key)
+    return '"{0}"'.format(hashlib.md5(data.encode('utf-8')).hexdigest())
+
+
+@event.listens_for(engine, 'after_execute')
+def _statement_executed(conn, clauseelement, multiparams, params, result):
+    if isinstance(clauseelement, UpdateBase):
+        table = clauseelement.table.name
+        bump([table])
+        if not hasattr(_local, 'tables'):
+            _local.tables = set()
+        _local.tables.add(table)
+
+
+@event.listens_for(Session, 'after_commit')
+def _transaction_committed(session):
+    if session.transaction is not None and session.transaction.nested:
+        # changes of savepoint aren't visible until outer commit
+        return
+    tables = getattr(_local, 'tables', None)
+    if tables:
+        _local.tables = set()
+        bump(tables)
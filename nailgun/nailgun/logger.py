@@ -14,12 +14,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
 import logging
 import sys
+import threading
 
 from logging.handlers import WatchedFileHandler
 from StringIO import StringIO
 
+from nailgun.utils import json_codec
+
 
 SERVER_ERROR_MSG = '500 Internal Server Error'
 DATEFORMAT = '%Y-%m-%d %H:%M:%S'
@@ -57,6 +61,65 @@ def make_api_logger():
 logger = make_nailgun_logger()
 
 
+class LazyPayload(object):
+    """Message payload for log record, it's serialized to JSON
+    only when record is emitted. Payload longer than max_size is
+    cut, the rest of it is replaced by its length and MD5 digest.
+
+        logger.info("Received: %s", LazyPayload(kwargs, 4096))
+    """
+
+    def __init__(self, payload, max_size=0):
+        """:param payload: JSON serializable object or string.
+        :param max_size: Max length of logged payload,
+        0 disables cutting.
+        :type  max_size: int
+        """
+        self.payload = payload
+        self.max_size = max_size
+
+    def __str__(self):
+        data = self.payload
+        if not isinstance(data, basestring):
+            data = json_codec.dumps(data)
+        if isinstance(data, unicode):
+            data = data.encode('utf-8')
+        if not self.max_size or len(data) <= self.max_size:
+            return data
+        rest = data[self.max_size:]
+        return "{0}... ({1} bytes more, md5 {2})".format(
+            data[:self.max_size], len(rest), hashlib.md5(rest).hexdigest())
+
+
+class LogSampler(object):
+    """Allows to log only every rate-th of repeated records,
+    records are repeated if they have the same key.
+    """
+
+    # number of keys to remember
+    cache_size = 10000
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, key, rate):
+        """Returns True if record with key should be logged,
+        the first record of every key is logged.
+
+        :param rate: 1 logs all records, 2 every second one and so on.
+        :type  rate: int
+        """
+        if rate <= 1:
+            return True
+        with self._lock:
+            count = self._counters.get(key, 0)
+            if count == 0 and len(self._counters) >= self.cache_size:
+                self._counters.clear()
+            self._counters[key] = count + 1
+        return count % rate == 0
+
+
 class WriteLogger(logging.Logger, object):
 
     def __init__(self, logger, level=logging.DEBUG):
@@ -98,6 +161,11 @@ class HTTPLoggerMiddleware(object):
             self.api_logger.debug(response_info)
 
     def __logging_request(self, env):
+        if not self.api_logger.isEnabledFor(logging.DEBUG):
+            return
+
+        from nailgun.settings import settings
+
         length = int(env.get('CONTENT_LENGTH', 0))
         body = ''
 
@@ -105,16 +173,15 @@ class HTTPLoggerMiddleware(object):
             body = env['wsgi.input'].read(length)
             env['wsgi.input'] = StringIO(body)
 
-        request_info = "Request %s %s from %s:%s %s" % (
+        self.api_logger.debug(
+            "Request %s %s from %s:%s %s",
             env['REQUEST_METHOD'],
             env['REQUEST_URI'],
             self.__get_remote_ip(env),
             env['REMOTE_PORT'],
-            body
+            LazyPayload(body, settings.PAYLOAD_LOGGING.get('max_size', 0))
         )
 
-        self.api_logger.debug(request_info)
-
     def __get_remote_ip(self, env):
         if 'HTTP_X_REAL_IP' in env:
             return env['HTTP_X_REAL_IP']
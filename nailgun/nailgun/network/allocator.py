@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from bisect import bisect_left
+from bisect import insort
+
+from netaddr import IPAddress
+
+from nailgun.db import db
+from nailgun.db.sqlalchemy.models import IPAddr
+from nailgun.errors import errors
+from nailgun.network.ranges import ip_to_int
+from nailgun.network.ranges import IPRangeIndex
+
+
+class IPAllocator(object):
+    """Allocator of free IP addresses within a set of IP ranges.
+
+    Ranges are kept as sorted and merged (first, last) integer pairs,
+    used addresses as a sorted list of integers. The next free
+    addresses are found in a single pass over both lists, so no
+    database queries are issued per candidate address.
+    """
+
+    def __init__(self, ip_ranges, used_ips=None):
+        """:param ip_ranges: Iterable of (first, last) IP address pairs
+        or IPRangeIndex.
+        :type  ip_ranges: iterable
+        :param used_ips: Iterable of IP addresses which can't be allocated.
+        :type  used_ips: iterable
+        """
+        if not isinstance(ip_ranges, IPRangeIndex):
+            ip_ranges = IPRangeIndex(ip_ranges)
+        self.ranges = ip_ranges.ranges
+        self.used = []
+        if self.ranges:
+            lowest, highest = self.ranges[0][0], self.ranges[-1][1]
+            self.used = sorted(set(
+                ip for ip in (ip_to_int(i) for i in used_ips or [])
+                if lowest <= ip <= highest
+            ))
+
+    @classmethod
+    def get_used_ips(cls):
+        """Returns all IP addresses stored in ip_addrs table
+        with one query. Addresses are checked against the whole
+        table, so the same address is never given out twice
+        in different groups.
+        """
+        return [ip for (ip,) in db().query(IPAddr.ip_addr)]
+
+    @classmethod
+    def for_network_group(cls, network_group, used_ips=None):
+        """Builds allocator for given Network Group.
+
+        :param network_group: NetworkGroup object.
+        :type  network_group: NetworkGroup
+        :param used_ips: Already loaded used IP addresses,
+        they are loaded from database if not passed.
+        :type  used_ips: list
+        :returns: IPAllocator
+        """
+        return cls.for_ranges(
+            IPRangeIndex.for_network_group(network_group),
+            network_group.gateway,
+            used_ips
+        )
+
+    @classmethod
+    def for_ranges(cls, ip_ranges, gateway=None, used_ips=None):
+        """Builds allocator for given IP ranges excluding gateway.
+
+        :param ip_ranges: List of (first, last) IP address pairs
+        or IPRangeIndex.
+        :type  ip_ranges: list
+        :param gateway: Gateway IP address.
+        :type  gateway: str
+        :param used_ips: Already loaded used IP addresses,
+        they are loaded from database if not passed.
+        :type  used_ips: list
+        :returns: IPAllocator
+        """
+        if used_ips is None:
+            used_ips = cls.get_used_ips()
+        else:
+            used_ips = list(used_ips)
+        if gateway:
+            used_ips.append(gateway)
+        return cls(ip_ranges, used_ips)
+
+    def is_used(self, ip_addr):
+        ip = ip_to_int(ip_addr)
+        idx = bisect_left(self.used, ip)
+        return idx < len(self.used) and self.used[idx] == ip
+
+    def mark_used(self, ip_addr):
+        if not self.is_used(ip_addr):
+            insort(self.used, ip_to_int(ip_addr))
+
+    def get_free_ips(self, num=1):
+        """Returns list of num free IP addresses and marks them
+        as used, so next calls return other addresses.
+
+        :param num: Number of IP addresses.
+        :type  num: int
+        :returns: List of IP addresses as strings.
+        :raises: errors.OutOfIPs
+        """
+        free = []
+        used = self.used
+        for first, last in self.ranges:
+            idx = bisect_left(used, first)
+            candidate = first
+            while candidate <= last and len(free) < num:
+                if idx < len(used) and used[idx] == candidate:
+                    idx += 1
+                else:
+                    free.append(candidate)
+                candidate += 1
+            if len(free) == num:
+                break
+
+        if len(free) < num:
+            raise errors.OutOfIPs()
+
+        for ip in free:
+            insort(used, ip)
+        return [str(IPAddress(ip)) for ip in free]
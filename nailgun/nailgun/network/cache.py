@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from collections import namedtuple
+import threading
+
+from netaddr import IPNetwork
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import Session
+
+from nailgun.db import db
+from nailgun.db.sqlalchemy.models import IPAddrRange
+from nailgun.db.sqlalchemy.models import NetworkGroup
+from nailgun.logger import logger
+
+
+AdminNetwork = namedtuple(
+    'AdminNetwork',
+    ('id', 'cidr', 'network', 'netmask', 'gateway', 'ranges')
+)
+
+
+class AdminNetworkCache(object):
+    """Process-wide cache of admin network group data.
+
+    Holds plain values (not ORM objects), so it can be shared
+    between sessions and threads. Cache is dropped when admin
+    NetworkGroup or its IPAddrRange rows are changed through
+    SQLAlchemy. Changes made directly in database require
+    nailgun restart.
+    """
+
+    _lock = threading.Lock()
+    _data = None
+    # incremented on every invalidation, data loaded
+    # before invalidation is not stored
+    _generation = 0
+    # set when changes are flushed but not committed yet
+    _pending = False
+
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get(cls):
+        """Returns AdminNetwork or None if there is no admin
+        network group in database.
+        """
+        data = cls._data
+        if data is not None:
+            cls.hits += 1
+            return data
+
+        cls.misses += 1
+        generation = cls._generation
+        admin_ng = db().query(NetworkGroup).options(
+            joinedload('ip_ranges')
+        ).filter_by(
+            name="fuelweb_admin"
+        ).first()
+        if not admin_ng:
+            return None
+
+        data = AdminNetwork(
+            id=admin_ng.id,
+            cidr=admin_ng.cidr,
+            network=IPNetwork(admin_ng.cidr),
+            netmask=admin_ng.netmask,
+            gateway=admin_ng.gateway,
+            ranges=[(r.first, r.last) for r in admin_ng.ip_ranges]
+        )
+        with cls._lock:
+            if generation == cls._generation:
+                cls._data = data
+        return data
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._generation += 1
+            cls._data = None
+
+    @classmethod
+    def stats(cls):
+        return {'hits': cls.hits, 'misses': cls.misses}
+
+    @classmethod
+    def reset_stats(cls):
+        cls.hits = cls.misses = 0
+
+    @classmethod
+    def _on_change(cls):
+        cls._pending = True
+        cls.invalidate()
+
+    @classmethod
+    def _on_transaction_end(cls):
+        # data could be loaded by other thread between
+        # flush and commit, so invalidate it once again
+        if cls._pending:
+            cls._pending = False
+            cls.invalidate()
+
+
+def _network_group_changed(mapper, connection, target):
+    data = AdminNetworkCache._data
+    if target.name == 'fuelweb_admin' or (data and target.id == data.id):
+        logger.debug("Admin network group changed, dropping cache")
+        AdminNetworkCache._on_change()
+
+
+def _ip_range_changed(mapper, connection, target):
+    data = AdminNetworkCache._data
+    if data is None or target.network_group_id == data.id:
+        AdminNetworkCache._on_change()
+
+
+def _bulk_changed(session, query, query_context, result):
+    entities = [d['type'] for d in query.column_descriptions]
+    if NetworkGroup in entities or IPAddrRange in entities:
+        AdminNetworkCache._on_change()
+
+
+def _transaction_ended(session):
+    AdminNetworkCache._on_transaction_end()
+
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(NetworkGroup, _event, _network_group_changed)
+    event.listen(IPAddrRange, _event, _ip_range_changed)
+
+for _event in ('after_bulk_update', 'after_bulk_delete'):
+    event.listen(Session, _event, _bulk_changed)
+
+for _event in ('after_commit', 'after_rollback'):
+    event.listen(Session, _event, _transaction_ended)
@@ -25,6 +25,7 @@ from nailgun.api.serializers.network_configuration \
 from nailgun.db.sqlalchemy.models import NetworkGroup
 from nailgun.errors import errors
 from nailgun.logger import logger
+from nailgun.network.ranges import IPRangeIndex
 from nailgun.task.helpers import TaskHelper
 
 
@@ -212,15 +213,15 @@ class NetworkCheck(object):
                         )
                         self.result.append({"ids": [int(ng["id"])],
                                             "errors": ["ip_ranges"]})
-                    if pub_gw in npair[0] or pub_gw in npair[1]:
-                        self.err_msgs.append(
-                            u"Address intersection between "
-                            u"public gateway and IP range "
-                            u"of {0} network.".format(ng['name'])
-                        )
-                        self.result.append({"ids": [int(ng["id"])],
-                                            "errors": ["gateway",
-                                                       "ip_ranges"]})
+                if int(pub_gw) in IPRangeIndex(ng['ip_ranges']):
+                    self.err_msgs.append(
+                        u"Address intersection between "
+                        u"public gateway and IP range "
+                        u"of {0} network.".format(ng['name'])
+                    )
+                    self.result.append({"ids": [int(ng["id"])],
+                                        "errors": ["gateway",
+                                                   "ip_ranges"]})
                 # Check that Public IP ranges are in Public CIDR
                 if ng['name'] == 'public':
                     for net in nets:
@@ -458,13 +459,14 @@ class NetworkCheck(object):
                     )
                 self.result.append({"ids": [int(public["id"])],
                                     "errors": ["ip_ranges"]})
-            if public_gw in npair[0] or public_gw in npair[1]:
-                self.err_msgs.append(
-                    u"Address intersection between public gateway "
-                    u"and IP range of public network."
-                )
-                self.result.append({"ids": [int(public["id"])],
-                                    "errors": ["gateway", "ip_ranges"]})
+        if int(public_gw) in IPRangeIndex(
+                [(r.first, r.last) for r in ranges]):
+            self.err_msgs.append(
+                u"Address intersection between public gateway "
+                u"and IP range of public network."
+            )
+            self.result.append({"ids": [int(public["id"])],
+                                "errors": ["gateway", "ip_ranges"]})
         self.expose_error_messages()
 
         # Check that Public IP ranges are in Public CIDR
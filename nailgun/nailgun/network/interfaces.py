@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm import Session
+
+from nailgun.db.sqlalchemy.models import NetworkAssignment
+from nailgun.db.sqlalchemy.models import NetworkGroup
+from nailgun.db.sqlalchemy.models import Node
+from nailgun.db.sqlalchemy.models import NodeNICInterface
+
+
+class NodeInterfacesIndex(object):
+    """Index of node interfaces by assigned networks.
+
+    Index is built lazily on the first lookup and kept per session
+    till the end of transaction, handlers commit at the end of every
+    request, so index lives no longer than request. It's dropped
+    when network assignments or interfaces of node are changed.
+    """
+
+    # session => {node id => NodeInterfacesIndex}
+    _indexes = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    def __init__(self, node):
+        """:param node: Node object.
+        :type  node: Node
+        """
+        # network name => first interface with network assigned
+        self.by_network_name = {}
+        # network group id => first interface with network assigned
+        self.by_network_id = {}
+        # interface name => [NetworkGroup] ordered by id
+        self.networks_by_interface = {}
+        for iface in node.interfaces:
+            networks = list(iface.assigned_networks_list)
+            self.networks_by_interface[iface.name] = networks
+            for net in networks:
+                self.by_network_name.setdefault(net.name, iface)
+                self.by_network_id.setdefault(net.id, iface)
+
+    @classmethod
+    def get(cls, node):
+        """Returns index for node, builds it if there
+        is no index in node session yet.
+
+        :param node: Node object.
+        :type  node: Node
+        :returns: NodeInterfacesIndex
+        """
+        session = object_session(node)
+        if session is None:
+            return cls(node)
+
+        indexes = cls._indexes.get(session)
+        if indexes is None:
+            with cls._lock:
+                indexes = cls._indexes.setdefault(session, {})
+
+        index = indexes.get(node.id)
+        if index is None:
+            index = indexes[node.id] = cls(node)
+        return index
+
+    @classmethod
+    def invalidate(cls, session, node_id=None):
+        """Drops index of node or all indexes of session.
+
+        :param session: Session object.
+        :param node_id: Node ID, all indexes are dropped if not passed.
+        """
+        indexes = cls._indexes.get(session)
+        if not indexes:
+            return
+        if node_id is None:
+            indexes.clear()
+        else:
+            indexes.pop(node_id, None)
+
+
+def _assigned_networks_changed(target, value, initiator):
+    session = object_session(target)
+    if session is not None:
+        NodeInterfacesIndex.invalidate(session, target.node_id)
+
+
+def _node_interfaces_changed(target, value, initiator):
+    session = object_session(target)
+    if session is not None:
+        NodeInterfacesIndex.invalidate(session, target.id)
+
+
+def _interface_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        NodeInterfacesIndex.invalidate(session, target.node_id)
+
+
+def _rows_changed(mapper, connection, target):
+    # node of network assignment row isn't known
+    # without query, so all indexes are dropped
+    session = object_session(target)
+    if session is not None:
+        NodeInterfacesIndex.invalidate(session)
+
+
+def _bulk_changed(session, query, query_context, result):
+    entities = [d['type'] for d in query.column_descriptions]
+    if set(entities) & set((NetworkAssignment, NodeNICInterface,
+                            NetworkGroup)):
+        NodeInterfacesIndex.invalidate(session)
+
+
+def _transaction_ended(session):
+    NodeInterfacesIndex.invalidate(session)
+
+
+for _event in ('append', 'remove'):
+    event.listen(NodeNICInterface.assigned_networks_list, _event,
+                 _assigned_networks_changed)
+    event.listen(Node.interfaces, _event, _node_interfaces_changed)
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(NodeNICInterface, _event, _interface_changed)
+    event.listen(NetworkAssignment, _event, _rows_changed)
+    event.listen(NetworkGroup, _event, _rows_changed)
+
+for _event in ('after_bulk_update', 'after_bulk_delete'):
+    event.listen(Session, _event, _bulk_changed)
+
+for _event in ('after_commit', 'after_rollback'):
+    event.listen(Session, _event, _transaction_ended)
@@ -17,18 +17,18 @@
 from collections import defaultdict
 from itertools import chain
 from itertools import groupby
-from itertools import ifilter
-from itertools import imap
 from itertools import islice
 
-from netaddr import IPAddress
 from netaddr import IPNetwork
-from netaddr import IPRange
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.sql import not_
 
 
 from nailgun.db import db
+from nailgun.db.sqlalchemy.deletion import delete_where
 from nailgun.db.sqlalchemy.models import Cluster
 from nailgun.db.sqlalchemy.models import IPAddr
 from nailgun.db.sqlalchemy.models import IPAddrRange
@@ -38,10 +38,19 @@ from nailgun.db.sqlalchemy.models import Node
 from nailgun.db.sqlalchemy.models import NodeNICInterface
 from nailgun.errors import errors
 from nailgun.logger import logger
+from nailgun.network.allocator import IPAllocator
+from nailgun.network.cache import AdminNetworkCache
+from nailgun.network.interfaces import NodeInterfacesIndex
+from nailgun.network.ranges import IPRangeIndex
+from nailgun.network.resolver import NetworkDataResolver
 
 
 class NetworkManager(object):
 
+    # how many times IP addresses allocation is tried
+    # when conflicting address is inserted by other process
+    ip_allocation_attempts = 3
+
     @classmethod
     def update_range_mask_from_cidr(cls, network_group, cidr):
         """Update network ranges for cidr
@@ -60,6 +69,21 @@ class NetworkManager(object):
         db().add(ip_range)
         db().commit()
 
+    @classmethod
+    def get_admin_network_data(cls, fail_if_not_found=True):
+        '''Method for receiving cached Admin NetworkGroup data.
+
+        :param fail_if_not_found: Raise an error
+        if admin network group is not found in database.
+        :type  fail_if_not_found: bool
+        :returns: AdminNetwork or None.
+        :raises: errors.AdminNetworkNotFound
+        '''
+        admin_net = AdminNetworkCache.get()
+        if not admin_net and fail_if_not_found:
+            raise errors.AdminNetworkNotFound()
+        return admin_net
+
     @classmethod
     def get_admin_network_group_id(cls, fail_if_not_found=True):
         '''Method for receiving Admin NetworkGroup ID.
@@ -70,12 +94,8 @@ class NetworkManager(object):
         :returns: Admin NetworkGroup ID or None.
         :raises: errors.AdminNetworkNotFound
         '''
-        admin_ng = db().query(NetworkGroup).filter_by(
-            name="fuelweb_admin"
-        ).first()
-        if not admin_ng and fail_if_not_found:
-            raise errors.AdminNetworkNotFound()
-        return admin_ng.id
+        admin_net = cls.get_admin_network_data(fail_if_not_found)
+        return admin_net.id if admin_net else None
 
     @classmethod
     def get_admin_network_group(cls, fail_if_not_found=True):
@@ -87,9 +107,14 @@ class NetworkManager(object):
         :returns: Admin NetworkGroup or None.
         :raises: errors.AdminNetworkNotFound
         '''
-        admin_ng = db().query(NetworkGroup).filter_by(
-            name="fuelweb_admin"
-        ).first()
+        admin_net = cls.get_admin_network_data(fail_if_not_found)
+        if not admin_net:
+            return None
+        # object is taken from session if it's already loaded there
+        admin_ng = db().identity_map.get(
+            identity_key(NetworkGroup, admin_net.id))
+        if admin_ng is None:
+            admin_ng = db().query(NetworkGroup).get(admin_net.id)
         if not admin_ng and fail_if_not_found:
             raise errors.AdminNetworkNotFound()
         return admin_ng
@@ -105,10 +130,7 @@ class NetworkManager(object):
         """
         logger.debug("Deleting old IPs for network with id=%s, cidr=%s",
                      nw_group.id, nw_group.cidr)
-        ips = db().query(IPAddr).filter(
-            IPAddr.network == nw_group.id
-        ).all()
-        map(db().delete, ips)
+        delete_where(IPAddr, IPAddr.network == nw_group.id)
         db().commit()
 
     @classmethod
@@ -121,32 +143,58 @@ class NetworkManager(object):
         :type  num: int
         :returns: None
         """
-        admin_net_id = cls.get_admin_network_group_id()
-        node_admin_ips = db().query(IPAddr).filter_by(
-            node=node_id,
-            network=admin_net_id
-        ).all()
-
-        if not node_admin_ips or len(node_admin_ips) < num:
-            admin_net = db().query(NetworkGroup).get(admin_net_id)
-            logger.debug(
-                u"Trying to assign admin ips: node=%s count=%s",
-                node_id,
-                num - len(node_admin_ips)
-            )
-            free_ips = cls.get_free_ips(
-                admin_net.id,
-                num=num - len(node_admin_ips)
+        cls.assign_admin_ips_bulk([(node_id, num)])
+
+    @classmethod
+    def assign_admin_ips_bulk(cls, nodes_ips_num):
+        """Idempotent assignment of admin IP addresses to set of nodes.
+
+        Existing admin IPs and used addresses are loaded with one
+        query each, missing addresses are chosen in memory and
+        written with one insert and one commit.
+
+        :param nodes_ips_num: List of (node ID, number of IPs) pairs.
+        :type  nodes_ips_num: list
+        :returns: None
+        """
+        if not nodes_ips_num:
+            return
+
+        admin_net = cls.get_admin_network_data()
+        nodes_ids = [node_id for node_id, _ in nodes_ips_num]
+
+        def build():
+            assigned = dict(
+                db().query(IPAddr.node, func.count(IPAddr.id)).filter(
+                    IPAddr.network == admin_net.id
+                ).filter(
+                    IPAddr.node.in_(nodes_ids)
+                ).group_by(IPAddr.node)
             )
-            logger.info(len(free_ips))
-            for ip in free_ips:
-                ip_db = IPAddr(
-                    node=node_id,
-                    ip_addr=ip,
-                    network=admin_net_id
+
+            allocator = None
+            new_ips = []
+            for node_id, num in nodes_ips_num:
+                missing = num - assigned.get(node_id, 0)
+                if missing <= 0:
+                    continue
+                logger.debug(
+                    u"Trying to assign admin ips: node=%s count=%s",
+                    node_id,
+                    missing
                 )
-                db().add(ip_db)
-            db().commit()
+                if allocator is None:
+                    allocator = IPAllocator.for_ranges(
+                        admin_net.ranges, admin_net.gateway)
+                for ip in allocator.get_free_ips(missing):
+                    new_ips.append({
+                        'node': node_id,
+                        'network': admin_net.id,
+                        'ip_addr': ip
+                    })
+            return new_ips
+
+        cls._allocate_ips([admin_net.id], build)
 
     @classmethod
     def assign_ips(cls, nodes_ids, network_name):
@@ -165,69 +213,171 @@ class NetworkManager(object):
         :returns: None
         :raises: Exception, errors.AssignIPError
         """
-        cluster_id = db().query(Node).get(nodes_ids[0]).cluster_id
-        for node_id in nodes_ids:
-            node = db().query(Node).get(node_id)
+        nodes = dict(
+            (n.id, n) for n in
+            db().query(Node).filter(Node.id.in_(nodes_ids))
+        )
+        cls.assign_ips_bulk(
+            [nodes[node_id] for node_id in nodes_ids],
+            [network_name]
+        )
+
+    @classmethod
+    def assign_ips_bulk(cls, nodes, networks_names):
+        """Idempotent assignment IP addresses to set of nodes
+        in set of networks.
+
+        Existing assignments and used addresses are loaded
+        with one query each, missing addresses are chosen in
+        memory and written with one insert and one commit, so
+        the number of statements doesn't depend on nodes count.
+
+        :param nodes: List of Node objects from one cluster.
+        :type  nodes: list
+        :param networks_names: List of network names.
+        :type  networks_names: list
+        :returns: None
+        :raises: Exception, errors.AssignIPError
+        """
+        if not nodes:
+            return
+
+        cluster_id = nodes[0].cluster_id
+        for node in nodes:
             if node.cluster_id != cluster_id:
                 raise Exception(
                     u"Node id='{0}' doesn't belong to cluster_id='{1}'".format(
-                        node_id,
+                        node.id,
                         cluster_id
                     )
                 )
 
-        network = db().query(NetworkGroup).\
-            filter(NetworkGroup.cluster_id == cluster_id).\
-            filter_by(name=network_name).first()
-
-        if not network:
-            raise errors.AssignIPError(
-                u"Network '%s' for cluster_id=%s not found." %
-                (network_name, cluster_id)
+        networks = dict(
+            (n.name, n) for n in db().query(NetworkGroup).options(
+                joinedload('ip_ranges')
+            ).filter(
+                NetworkGroup.cluster_id == cluster_id
+            ).filter(
+                NetworkGroup.name.in_(networks_names)
             )
-
-        for node_id in nodes_ids:
-            node_ips = imap(
-                lambda i: i.ip_addr,
-                cls._get_ips_except_admin(
-                    node_id=node_id,
-                    network_id=network.id
+        )
+        for network_name in networks_names:
+            if network_name not in networks:
+                raise errors.AssignIPError(
+                    u"Network '%s' for cluster_id=%s not found." %
+                    (network_name, cluster_id)
                 )
-            )
-            # check if any of node_ips in required ranges
 
-            ip_already_assigned = False
+        nodes_ids = [n.id for n in nodes]
+
+        def build():
+            nodes_ips = defaultdict(list)
+            for node_id, network_id, ip_addr in db().query(
+                IPAddr.node, IPAddr.network, IPAddr.ip_addr
+            ).filter(
+                IPAddr.node.in_(nodes_ids)
+            ).filter(
+                IPAddr.network.in_([n.id for n in networks.itervalues()])
+            ):
+                nodes_ips[(node_id, network_id)].append(ip_addr)
+
+            used_ips = None
+            new_ips = []
+            for network_name in networks_names:
+                network = networks[network_name]
+                allocator = None
+                for node_id in nodes_ids:
+                    # check if any of node ips in required ranges
+                    if any(cls.check_ip_belongs_to_net(ip, network)
+                           for ip in nodes_ips[(node_id, network.id)]):
+                        logger.info(
+                            u"Node id='{0}' already has an IP address "
+                            "inside '{1}' network.".format(
+                                node_id,
+                                network.name
+                            )
+                        )
+                        continue
 
-            for ip in node_ips:
-                if cls.check_ip_belongs_to_net(ip, network):
+                    # IP address has not been assigned, let's do it
                     logger.info(
-                        u"Node id='{0}' already has an IP address "
-                        "inside '{1}' network.".format(
+                        "Assigning IP for node '{0}' in network '{1}'".format(
                             node_id,
-                            network.name
+                            network_name
                         )
                     )
-                    ip_already_assigned = True
-                    break
-
-            if ip_already_assigned:
-                continue
-
-            # IP address has not been assigned, let's do it
-            logger.info(
-                "Assigning IP for node '{0}' in network '{1}'".format(
-                    node_id,
-                    network_name
+                    if used_ips is None:
+                        used_ips = IPAllocator.get_used_ips()
+                    if allocator is None:
+                        allocator = IPAllocator.for_network_group(
+                            network, used_ips)
+                    free_ip = allocator.get_free_ips()[0]
+                    used_ips.append(free_ip)
+                    new_ips.append({
+                        'node': node_id,
+                        'network': network.id,
+                        'ip_addr': free_ip
+                    })
+            return new_ips
+
+        cls._allocate_ips([n.id for n in networks.itervalues()], build)
+
+    @classmethod
+    def _lock_network_groups(cls, network_ids):
+        """Locks rows of network groups with SELECT ... FOR UPDATE
+        till the end of current transaction, so IP addresses
+        of these network groups are allocated by one process at
+        a time. Rows are locked in order of IDs to avoid deadlocks.
+
+        :param network_ids: Network groups IDs.
+        :type  network_ids: list
+        :returns: None
+        """
+        db().query(NetworkGroup.id).filter(
+            NetworkGroup.id.in_(network_ids)
+        ).order_by(NetworkGroup.id).with_lockmode('update').all()
+
+    @classmethod
+    def _allocate_ips(cls, network_ids, build):
+        """Locks network groups, builds new IP addresses and writes
+        them with one executemany insert, then commits the session.
+
+        Every attempt is made in a savepoint. If other process
+        inserted the same address in spite of lock, unique
+        constraint on (network, ip_addr) is violated, so the
+        savepoint is rolled back and addresses are built again.
+
+        :param network_ids: IDs of network groups addresses are
+        allocated from.
+        :type  network_ids: list
+        :param build: Function returning list of dicts with
+        IPAddr columns values, it's called once per attempt.
+        :type  build: callable
+        :returns: None
+        :raises: sqlalchemy.exc.IntegrityError if all attempts failed
+        """
+        for attempt in xrange(1, cls.ip_allocation_attempts + 1):
+            db().begin_nested()
+            try:
+                cls._lock_network_groups(network_ids)
+                ips = build()
+                if ips:
+                    db().execute(IPAddr.__table__.insert(), ips)
+                db().commit()
+                break
+            except IntegrityError:
+                db().rollback()
+                if attempt == cls.ip_allocation_attempts:
+                    raise
+                logger.warning(
+                    u"IP address conflict in network groups %s, "
+                    "retrying allocation, attempt %s",
+                    network_ids, attempt
                 )
-            )
-            free_ip = cls.get_free_ips(network.id)[0]
-            ip_db = IPAddr(
-                network=network.id,
-                node=node_id,
-                ip_addr=free_ip
-            )
-            db().add(ip_db)
-            db().commit()
+            except Exception:
+                db().rollback()
+                raise
+        db().commit()
 
     @classmethod
     def assign_vip(cls, cluster_id, network_name):
@@ -261,29 +411,30 @@ class NetworkManager(object):
                             (network_name, cluster_id))
 
         admin_net_id = cls.get_admin_network_group_id()
-        cluster_ips = [ne.ip_addr for ne in db().query(IPAddr).filter_by(
-            network=network.id,
-            node=None
-        ).filter(
-            not_(IPAddr.network == admin_net_id)
-        ).all()]
-        # check if any of used_ips in required cidr: network.cidr
-        ips_belongs_to_net = False
-        for ip in cluster_ips:
-            if cls.check_ip_belongs_to_net(ip, network):
-                ips_belongs_to_net = True
-                break
+        vips = []
+
+        def build():
+            del vips[:]
+            cluster_ips = [ip for (ip,) in db().query(
+                IPAddr.ip_addr
+            ).filter_by(
+                network=network.id,
+                node=None
+            ).filter(
+                not_(IPAddr.network == admin_net_id)
+            ).order_by(IPAddr.id)]
+            # check if any of used_ips in required cidr: network.cidr
+            if any(cls.check_ip_belongs_to_net(ip, network)
+                   for ip in cluster_ips):
+                vips.append(cluster_ips[0])
+                return []
 
-        if ips_belongs_to_net:
-            vip = cluster_ips[0]
-        else:
             # IP address has not been assigned, let's do it
-            vip = cls.get_free_ips(network.id)[0]
-            ne_db = IPAddr(network=network.id, ip_addr=vip)
-            db().add(ne_db)
-            db().commit()
+            vips.append(cls.get_free_ips(network.id)[0])
+            return [{'network': network.id, 'ip_addr': vips[0]}]
 
-        return vip
+        cls._allocate_ips([network.id], build)
+        return vips[0]
 
     @classmethod
     def _chunked_range(cls, iterable, chunksize=64):
@@ -312,45 +463,14 @@ class NetworkManager(object):
 
     @classmethod
     def check_ip_belongs_to_net(cls, ip_addr, network):
-        addr = IPAddress(ip_addr)
-        ipranges = imap(
-            lambda ir: IPRange(ir.first, ir.last),
-            network.ip_ranges
-        )
-        for r in ipranges:
-            if addr in r:
-                return True
-        return False
-
-    @classmethod
-    def _iter_free_ips(cls, network_group):
-        """Represents iterator over free IP addresses
-        in all ranges for given Network Group
-        """
-        for ip_addr in ifilter(
-            lambda ip: db().query(IPAddr).filter_by(
-                ip_addr=str(ip)
-            ).first() is None and not str(ip) == network_group.gateway,
-            chain(*[
-                IPRange(ir.first, ir.last)
-                for ir in network_group.ip_ranges
-            ])
-        ):
-            yield ip_addr
+        return ip_addr in IPRangeIndex.for_network_group(network)
 
     @classmethod
     def get_free_ips(cls, network_group_id, num=1):
         """Returns list of free IP addresses for given Network Group
         """
         ng = db().query(NetworkGroup).get(network_group_id)
-        free_ips = []
-        for ip in cls._iter_free_ips(ng):
-            free_ips.append(str(ip))
-            if len(free_ips) == num:
-                break
-        if len(free_ips) < num:
-            raise errors.OutOfIPs()
-        return free_ips
+        return IPAllocator.for_network_group(ng).get_free_ips(num)
 
     @classmethod
     def _get_ips_except_admin(cls, node_id=None,
@@ -414,45 +534,18 @@ class NetworkManager(object):
         :returns: List of network info for node.
         """
         node_db = db().query(Node).get(node_id)
-        cluster_db = node_db.cluster
-        if cluster_db is None:
-            # Node doesn't belong to any cluster, so it should not have nets
-            return []
-
-        ips = cls._get_ips_except_admin(node_id=node_id)
-        network_data = []
-        network_ids = []
-        for ip in ips:
-            net = db().query(NetworkGroup).get(ip.network)
-            interface = cls._get_interface_by_network_name(
-                node_db.id, net.name)
-
-            if net.name == 'public':
-                # Get prefix from netmask instead of cidr
-                # for public network
-
-                # Convert netmask to prefix
-                prefix = str(IPNetwork(
-                    '0.0.0.0/' + net.netmask).prefixlen)
-                netmask = net.netmask
-            else:
-                prefix = str(IPNetwork(net.cidr).prefixlen)
-                netmask = str(IPNetwork(net.cidr).netmask)
-
-            network_data.append({
-                'name': net.name,
-                'vlan': net.vlan_start,
-                'ip': ip.ip_addr + '/' + prefix,
-                'netmask': netmask,
-                'brd': str(IPNetwork(net.cidr).broadcast),
-                'gateway': net.gateway,
-                'dev': interface.name})
-            network_ids.append(net.id)
+        return NetworkDataResolver([node_db]).get(node_db)
 
-        network_data.extend(
-            cls._add_networks_wo_ips(cluster_db, network_ids, node_db))
+    @classmethod
+    def get_nodes_networks(cls, nodes):
+        """Method for receiving network data for a set of nodes
+        with a fixed number of queries.
 
-        return network_data
+        :param nodes: Node objects.
+        :type  nodes: iterable
+        :returns: Dict {node id: list of network info for node}.
+        """
+        return NetworkDataResolver(nodes).get_all()
 
     @classmethod
     def get_node_network_by_netname(cls, node_id, netname):
@@ -488,89 +581,8 @@ class NetworkManager(object):
         @nodes_db - List of Node instances
         @ips_db - generator([IPAddr1, IPAddr2])
         """
-        cluster_db = node_db.cluster
-        if cluster_db is None:
-            # Node doesn't belong to any cluster, so it should not have nets
-            return []
-
-        network_data = []
-        network_ids = []
-        for ip in ips_db:
-            net = ip.network_data
-            interface = cls._get_interface_by_network_name(
-                node_db,
-                net.name
-            )
-
-            # Get prefix from netmask instead of cidr
-            # for public network
-            if net.name == 'public':
-
-                # Convert netmask to prefix
-                prefix = str(IPNetwork(
-                    '0.0.0.0/' + net.netmask).prefixlen)
-                netmask = net.netmask
-            else:
-                prefix = str(IPNetwork(net.cidr).prefixlen)
-                netmask = str(IPNetwork(net.cidr).netmask)
-
-            network_data.append({
-                'name': net.name,
-                'vlan': net.vlan_start,
-                'ip': ip.ip_addr + '/' + prefix,
-                'netmask': netmask,
-                'brd': str(IPNetwork(net.cidr).broadcast),
-                'gateway': net.gateway,
-                'dev': interface.name})
-            network_ids.append(net.id)
-
-        nets_wo_ips = [n for n in networks if n.id not in network_ids]
-
-        for net in nets_wo_ips:
-            interface = cls._get_interface_by_network_name(
-                node_db,
-                net.name
-            )
-
-            if net.name == 'fixed' and cluster_db.net_manager == 'VlanManager':
-                continue
-            network_data.append({
-                'name': net.name,
-                'vlan': net.vlan_start,
-                'dev': interface.name})
-
-        network_data.append(cls._get_admin_network(node_db))
-
-        return network_data
-
-    @classmethod
-    def _add_networks_wo_ips(cls, cluster_db, network_ids, node_db):
-        add_net_data = []
-        # And now let's add networks w/o IP addresses
-        nets = db().query(NetworkGroup).\
-            filter(NetworkGroup.cluster_id == cluster_db.id)
-        if network_ids:
-            nets = nets.filter(not_(NetworkGroup.id.in_(network_ids)))
-
-        # For now, we pass information about all networks,
-        #    so these vlans will be created on every node we call this func for
-        # However it will end up with errors if we precreate vlans in VLAN mode
-        #   in fixed network. We are skipping fixed nets in Vlan mode.
-        for net in nets.order_by(NetworkGroup.id).all():
-            interface = cls._get_interface_by_network_name(
-                node_db,
-                net.name
-            )
-
-            if net.name == 'fixed' and cluster_db.net_manager == 'VlanManager':
-                continue
-            add_net_data.append({
-                'name': net.name,
-                'vlan': net.vlan_start,
-                'dev': interface.name})
-
-        add_net_data.append(cls._get_admin_network(node_db))
-        return add_net_data
+        return NetworkDataResolver.from_loaded(
+            node_db, ips_db, networks).get(node_db)
 
     @classmethod
     def _update_attrs(cls, node_data):
@@ -605,15 +617,28 @@ class NetworkManager(object):
             logger.warn("Cannot update interfaces: %s" % str(e))
             return
 
+        # all node interfaces are compared in memory by MAC, changes
+        # are flushed at once and unchanged rows are not written
+        interfaces_db = dict(
+            (interface.mac.lower(), interface)
+            for interface in node.interfaces
+        )
+        reported_macs = set()
         for interface in node.meta["interfaces"]:
-            interface_db = db().query(NodeNICInterface).filter_by(
-                mac=interface['mac']).first()
+            mac = interface['mac'].lower()
+            reported_macs.add(mac)
+            interface_db = interfaces_db.get(mac)
             if interface_db:
-                cls.__update_existing_interface(interface_db.id, interface)
+                cls.__set_interface_attributes(interface_db, interface)
             else:
-                cls.__add_new_interface(node, interface)
+                interfaces_db[mac] = cls.__add_new_interface(node, interface)
 
-        cls.__delete_not_found_interfaces(node, node.meta["interfaces"])
+        cls.__delete_not_found_interfaces(
+            node,
+            [i for mac, i in interfaces_db.iteritems()
+             if mac not in reported_macs]
+        )
+        db().commit()
 
     @classmethod
     def __check_interfaces_correctness(cls, node):
@@ -647,8 +672,8 @@ class NetworkManager(object):
 
     @classmethod
     def is_ip_belongs_to_admin_subnet(cls, ip_addr):
-        admin_cidr = cls.get_admin_network_group().cidr
-        if ip_addr and IPAddress(ip_addr) in IPNetwork(admin_cidr):
+        admin_net = cls.get_admin_network_data()
+        if ip_addr and ip_addr in IPRangeIndex.for_cidr(admin_net.cidr):
             return True
         return False
 
@@ -658,37 +683,32 @@ class NetworkManager(object):
         interface.node_id = node.id
         cls.__set_interface_attributes(interface, interface_attrs)
         db().add(interface)
-        db().commit()
         node.interfaces.append(interface)
-
-    @classmethod
-    def __update_existing_interface(cls, interface_id, interface_attrs):
-        interface = db().query(NodeNICInterface).get(interface_id)
-        cls.__set_interface_attributes(interface, interface_attrs)
-        db().commit()
+        return interface
 
     @classmethod
     def __set_interface_attributes(cls, interface, interface_attrs):
-        interface.name = interface_attrs['name']
-        interface.mac = interface_attrs['mac']
+        """Sets only attributes which differ from reported ones,
+        so unchanged interfaces are not updated in database.
+        """
+        values = {
+            'name': interface_attrs['name'],
+            'current_speed': interface_attrs.get('current_speed'),
+            'max_speed': interface_attrs.get('max_speed'),
+            'ip_addr': interface_attrs.get('ip'),
+            'netmask': interface_attrs.get('netmask'),
+            'state': interface_attrs.get('state')
+        }
+        # mac is stored in lower case
+        if (interface.mac or '').lower() != interface_attrs['mac'].lower():
+            values['mac'] = interface_attrs['mac']
 
-        interface.current_speed = interface_attrs.get('current_speed')
-        interface.max_speed = interface_attrs.get('max_speed')
-        interface.ip_addr = interface_attrs.get('ip')
-        interface.netmask = interface_attrs.get('netmask')
-        interface.state = interface_attrs.get('state')
+        for attr, value in values.iteritems():
+            if getattr(interface, attr) != value:
+                setattr(interface, attr, value)
 
     @classmethod
-    def __delete_not_found_interfaces(cls, node, interfaces):
-        interfaces_mac_addresses = map(
-            lambda interface: interface['mac'], interfaces)
-
-        interfaces_to_delete = db().query(NodeNICInterface).filter(
-            NodeNICInterface.node_id == node.id
-        ).filter(
-            not_(NodeNICInterface.mac.in_(interfaces_mac_addresses))
-        ).all()
-
+    def __delete_not_found_interfaces(cls, node, interfaces_to_delete):
         if interfaces_to_delete:
             mac_addresses = ' '.join(
                 map(lambda i: i.mac, interfaces_to_delete))
@@ -723,14 +743,6 @@ class NetworkManager(object):
 
         return dict(zip(interfaces_names, admin_ips))
 
-    @classmethod
-    def _get_admin_network(cls, node):
-        """Returns dict with admin network."""
-        return {
-            'name': 'admin',
-            'dev': node.admin_interface.name
-        }
-
     @classmethod
     def _get_interface_by_network_name(cls, node, network_name):
         """Return network device which has appointed
@@ -738,14 +750,13 @@ class NetworkManager(object):
         """
         if not isinstance(node, Node):
             node = db().query(Node).get(node)
-        for interface in node.interfaces:
-            for network in interface.assigned_networks_list:
-                if network.name == network_name:
-                    return interface
-
-        raise errors.CanNotFindInterface(
-            u'Cannot find interface by name "{0}" for node: '
-            '{1}'.format(network_name, node.full_name))
+        interface = NodeInterfacesIndex.get(node).by_network_name.get(
+            network_name)
+        if interface is None:
+            raise errors.CanNotFindInterface(
+                u'Cannot find interface by name "{0}" for node: '
+                '{1}'.format(network_name, node.full_name))
+        return interface
 
     @classmethod
     def get_end_point_ip(cls, cluster_id):
@@ -794,13 +805,10 @@ class NetworkManager(object):
 
     @classmethod
     def get_node_interface_by_netname(cls, node_id, netname):
-        return db().query(NodeNICInterface).join(
-            (NetworkGroup, NodeNICInterface.assigned_networks_list)
-        ).filter(
-            NetworkGroup.name == netname
-        ).filter(
-            NodeNICInterface.node_id == node_id
-        ).first()
+        node = db().query(Node).get(node_id)
+        if node is None:
+            return None
+        return NodeInterfacesIndex.get(node).by_network_name.get(netname)
 
     @classmethod
     def _set_ip_ranges(cls, network_group_id, ip_ranges):
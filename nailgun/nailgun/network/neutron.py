@@ -15,8 +15,6 @@
 #    under the License.
 
 from netaddr import IPNetwork
-from netaddr import IPRange
-from netaddr import IPSet
 
 from nailgun.db import db
 from nailgun.db.sqlalchemy.models import Cluster
@@ -27,6 +25,9 @@ from nailgun.db.sqlalchemy.models import NeutronConfig
 from nailgun.errors import errors
 from nailgun.logger import logger
 from nailgun.network.manager import NetworkManager
+from nailgun.network.pool import CIDRPool
+from nailgun.network.pool import VLANPool
+from nailgun.network.ranges import ip_to_int
 
 
 class NeutronManager(NetworkManager):
@@ -240,9 +241,6 @@ class NeutronManager(NetworkManager):
         :raises: errors.OutOfVLANs, errors.OutOfIPs,
         errors.NoSuitableCIDR
         '''
-        used_nets = []
-        used_vlans = []
-
         global_params = db().query(GlobalParameters).first()
 
         cluster_db = db().query(Cluster).get(cluster_id)
@@ -255,22 +253,39 @@ class NeutronManager(NetworkManager):
 
         networks_list = networks_metadata["neutron"]["networks"]
 
-        def _free_vlans():
-            free_vlans = set(
-                range(
-                    *global_params.parameters["vlan_range"]
+        vlans = VLANPool(*global_params.parameters["vlan_range"])
+        if len(vlans) < len(networks_list):
+            raise errors.OutOfVLANs()
+
+        used_nets = []
+        # groups are added to session only when all of them are built,
+        # so nothing is left in session if allocation fails
+        new_groups = []
+        # pool CIDRs => CIDRPool, networks usually share the same pool
+        cidr_pools = {}
+
+        def _cidr_pool(pool):
+            key = tuple(pool)
+            if key not in cidr_pools:
+                cidr_pool = CIDRPool(pool)
+                cidr_pool.reserve_cidr(
+                    global_params.parameters["net_exclude"])
+                cidr_pool.reserve(
+                    ip_to_int(admin_network_range.first),
+                    ip_to_int(admin_network_range.last)
                 )
-            ) - set(used_vlans)
-            if not free_vlans or len(free_vlans) < len(networks_list):
-                raise errors.OutOfVLANs()
-            return sorted(list(free_vlans))
+                for net in used_nets:
+                    cidr_pool.reserve(net.first, net.last)
+                cidr_pools[key] = cidr_pool
+            return cidr_pools[key]
 
         for network in networks_list:
-            free_vlans = _free_vlans()
-            vlan_start = free_vlans[0] if "vlan_start" not in network \
-                else network.get("vlan_start")
-            if vlan_start and vlan_start not in free_vlans:
-                vlan_start = free_vlans[0]
+            if "vlan_start" not in network:
+                vlan_start = vlans.allocate()
+            else:
+                vlan_start = network.get("vlan_start")
+                if vlan_start and not vlans.take(vlan_start):
+                    vlan_start = vlans.allocate()
 
             logger.debug("Found free vlan: %s", vlan_start)
             pool = network.get('pool')
@@ -282,30 +297,10 @@ class NeutronManager(NetworkManager):
                     )
                 )
 
-            nets_free_set = IPSet(pool) -\
-                IPSet(
-                    IPNetwork(global_params.parameters["net_exclude"])
-                ) -\
-                IPSet(
-                    IPRange(
-                        admin_network_range.first,
-                        admin_network_range.last
-                    )
-                ) -\
-                IPSet(used_nets)
-            if not nets_free_set:
-                raise errors.OutOfIPs()
-
-            free_cidrs = sorted(list(nets_free_set._cidrs))
-            new_net = None
-            for fcidr in free_cidrs:
-                for n in fcidr.subnet(24, count=1):
-                    new_net = n
-                    break
-                if new_net:
-                    break
-            if not new_net:
-                raise errors.NoSuitableCIDR()
+            new_net = _cidr_pool(pool).allocate(24)
+            used_nets.append(new_net)
+            for cidr_pool in cidr_pools.itervalues():
+                cidr_pool.reserve(new_net.first, new_net.last)
 
             if network.get("ip_range"):
                 new_ip_range = IPAddrRange(
@@ -329,14 +324,8 @@ class NeutronManager(NetworkManager):
                 vlan_start=vlan_start,
                 amount=1
             )
-            db().add(nw_group)
-            db().commit()
             nw_group.ip_ranges.append(new_ip_range)
-            db().commit()
-            cls.cleanup_network_group(nw_group)
-
-            used_vlans.append(vlan_start)
-            used_nets.append(str(new_net))
+            new_groups.append(nw_group)
 
         if cluster_db.net_segment_type == 'vlan':
             private_network_group = NetworkGroup(
@@ -347,8 +336,12 @@ class NeutronManager(NetworkManager):
                 vlan_start=None,
                 amount=1
             )
-            db().add(private_network_group)
-            db().commit()
+            new_groups.append(private_network_group)
+
+        db().add_all(new_groups)
+        # new network groups have no IP addresses,
+        # so they are not cleaned up
+        db().commit()
 
     @classmethod
     def update(cls, cluster, network_configuration):
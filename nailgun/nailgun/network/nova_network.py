@@ -56,11 +56,11 @@ class NovaNetworkManager(NetworkManager):
                 network_size=network['network_size']
                 if 'network_size' in network else 256
             )
-            db().add(nw_group)
-            db().commit()
             nw_group.ip_ranges.append(new_ip_range)
-            db().commit()
-            cls.cleanup_network_group(nw_group)
+            db().add(nw_group)
+        # new network groups have no IP addresses,
+        # so they are not cleaned up
+        db().commit()
 
     @classmethod
     def assign_networks_by_default(cls, node):
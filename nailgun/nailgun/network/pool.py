@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from bisect import bisect_right
+
+from netaddr import IPNetwork
+
+from nailgun.errors import errors
+from nailgun.network.ranges import IPRangeIndex
+
+
+class CIDRPool(object):
+    """Free IPv4 address space kept as sorted list of free
+    (first, last) integer intervals.
+
+    Allocated and reserved blocks are cut out of the list in place,
+    so nothing is rebuilt between allocations.
+    """
+
+    def __init__(self, cidrs):
+        """:param cidrs: Iterable of CIDRs forming the address space.
+        :type  cidrs: iterable
+        """
+        nets = [IPNetwork(cidr) for cidr in cidrs]
+        self.free = IPRangeIndex.merge(
+            (net.first, net.last) for net in nets)
+
+    def __nonzero__(self):
+        return bool(self.free)
+
+    @property
+    def size(self):
+        return sum(last - first + 1 for first, last in self.free)
+
+    def reserve(self, first, last):
+        """Removes interval from free address space. Parts
+        of interval which are not free are ignored.
+
+        :param first: First address of interval as integer.
+        :param last: Last address of interval as integer.
+        """
+        idx = max(bisect_right(self.free, (first,)) - 1, 0)
+        end = idx
+        pieces = []
+        while end < len(self.free) and self.free[end][0] <= last:
+            free_first, free_last = self.free[end]
+            if free_last >= first:
+                if free_first < first:
+                    pieces.append((free_first, first - 1))
+                if free_last > last:
+                    pieces.append((last + 1, free_last))
+            else:
+                pieces.append((free_first, free_last))
+            end += 1
+        self.free[idx:end] = pieces
+
+    def reserve_cidr(self, cidr):
+        """Removes CIDR from free address space.
+
+        :param cidr: CIDR string or IPNetwork.
+        """
+        net = IPNetwork(cidr)
+        self.reserve(net.first, net.last)
+
+    def allocate(self, prefixlen=24):
+        """Returns the lowest free aligned block of given prefix
+        length and removes it from free address space.
+
+        :param prefixlen: Prefix length of block.
+        :type  prefixlen: int
+        :returns: IPNetwork
+        :raises: errors.OutOfIPs, errors.NoSuitableCIDR
+        """
+        if not self.free:
+            raise errors.OutOfIPs()
+
+        size = 1 << (32 - prefixlen)
+        for free_first, free_last in self.free:
+            # first address aligned to block size
+            block = (free_first + size - 1) & ~(size - 1)
+            if block + size - 1 <= free_last:
+                self.reserve(block, block + size - 1)
+                return IPNetwork((block, prefixlen))
+
+        raise errors.NoSuitableCIDR()
+
+
+class VLANPool(object):
+    """Free VLAN IDs kept as bits of an integer, bit N is set
+    when VLAN ID N is free.
+    """
+
+    def __init__(self, first, last):
+        """Pool of VLAN IDs from first up to, but not including, last,
+        the same as range(first, last).
+
+        :param first: First VLAN ID.
+        :type  first: int
+        :param last: VLAN ID after the last one.
+        :type  last: int
+        """
+        self.bits = 0
+        if last > first:
+            self.bits = ((1 << (last - first)) - 1) << first
+
+    def __contains__(self, vlan):
+        return vlan is not None and vlan >= 0 and \
+            bool(self.bits >> vlan & 1)
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def take(self, vlan):
+        """Marks VLAN ID as used.
+
+        :param vlan: VLAN ID.
+        :type  vlan: int
+        :returns: True if VLAN ID was free.
+        """
+        if vlan not in self:
+            return False
+        self.bits &= ~(1 << vlan)
+        return True
+
+    def allocate(self):
+        """Returns the lowest free VLAN ID and marks it as used.
+
+        :returns: int
+        :raises: errors.OutOfVLANs
+        """
+        if not self.bits:
+            raise errors.OutOfVLANs()
+        vlan = (self.bits & -self.bits).bit_length() - 1
+        self.bits &= ~(1 << vlan)
+        return vlan
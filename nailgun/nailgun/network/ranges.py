@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from bisect import bisect_right
+import socket
+import struct
+import threading
+
+from netaddr import IPAddress
+from netaddr import IPNetwork
+
+
+def ip_to_int(ip_addr):
+    """Converts IP address to integer without building
+    netaddr objects for plain IPv4 strings.
+
+    :param ip_addr: IP address as string, integer or IPAddress.
+    :returns: int
+    """
+    if isinstance(ip_addr, (int, long)):
+        return ip_addr
+    if isinstance(ip_addr, basestring):
+        try:
+            return struct.unpack('!I', socket.inet_pton(
+                socket.AF_INET, ip_addr))[0]
+        except (socket.error, UnicodeEncodeError):
+            pass
+    return int(IPAddress(ip_addr))
+
+
+class IPRangeIndex(object):
+    """Set of IP ranges kept as sorted and merged integer
+    intervals, membership is answered by binary search.
+
+    Indexes built with for_network_group and for_cidr are cached
+    by their ranges, so they are reused by all callers and never
+    become stale when ranges of network group are changed.
+    """
+
+    _cache = {}
+    _cache_lock = threading.Lock()
+    # cache is dropped completely when it grows over this size
+    _cache_size = 1024
+
+    def __init__(self, ip_ranges):
+        """:param ip_ranges: Iterable of (first, last) IP address pairs.
+        :type  ip_ranges: iterable
+        """
+        self.ranges = self.merge(
+            (ip_to_int(first), ip_to_int(last))
+            for first, last in ip_ranges
+        )
+        self.firsts = [first for first, last in self.ranges]
+
+    @classmethod
+    def merge(cls, ranges):
+        """Sorts integer intervals and merges overlapping
+        and adjacent ones.
+        """
+        merged = []
+        for first, last in sorted(ranges):
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+            else:
+                merged.append((first, last))
+        return merged
+
+    @classmethod
+    def _cached(cls, key, builder):
+        index = cls._cache.get(key)
+        if index is None:
+            index = builder()
+            with cls._cache_lock:
+                if len(cls._cache) >= cls._cache_size:
+                    cls._cache.clear()
+                cls._cache[key] = index
+        return index
+
+    @classmethod
+    def for_network_group(cls, network_group):
+        """Returns index of IP ranges of Network Group.
+
+        :param network_group: NetworkGroup object.
+        :type  network_group: NetworkGroup
+        :returns: IPRangeIndex
+        """
+        ranges = tuple(
+            (ir.first, ir.last) for ir in network_group.ip_ranges)
+        return cls._cached(('ranges', ranges), lambda: cls(ranges))
+
+    @classmethod
+    def for_cidr(cls, cidr):
+        """Returns index with one interval covering CIDR.
+
+        :param cidr: CIDR string.
+        :type  cidr: str
+        :returns: IPRangeIndex
+        """
+        def build():
+            net = IPNetwork(cidr)
+            return cls([(net.first, net.last)])
+        return cls._cached(('cidr', str(cidr)), build)
+
+    def __contains__(self, ip_addr):
+        ip = ip_to_int(ip_addr)
+        idx = bisect_right(self.firsts, ip) - 1
+        return idx >= 0 and ip <= self.ranges[idx][1]
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def __iter__(self):
+        return iter(self.ranges)
+
+    @property
+    def size(self):
+        return sum(last - first + 1 for first, last in self.ranges)
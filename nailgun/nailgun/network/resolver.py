@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from collections import defaultdict
+from collections import namedtuple
+
+from netaddr import IPNetwork
+from sqlalchemy.sql import not_
+
+from nailgun.db import db
+from nailgun.db.sqlalchemy.models import IPAddr
+from nailgun.db.sqlalchemy.models import NetworkAssignment
+from nailgun.db.sqlalchemy.models import NetworkGroup
+from nailgun.db.sqlalchemy.models import NodeNICInterface
+from nailgun.errors import errors
+from nailgun.logger import logger
+from nailgun.network.cache import AdminNetworkCache
+from nailgun.network.ranges import IPRangeIndex
+
+
+Interface = namedtuple('Interface', ('id', 'name', 'ip_addr'))
+
+
+class NetworkDataResolver(object):
+    """Builds network data for a set of nodes at once.
+
+    IP addresses, network groups, interfaces and network assignments
+    of all given nodes are loaded with a fixed number of queries,
+    prefix, netmask and broadcast are calculated once per network
+    group. Data is a snapshot: resolver should not be kept after
+    IP addresses or network assignments of nodes are changed.
+    """
+
+    def __init__(self, nodes, load=True):
+        """:param nodes: Node objects.
+        :type  nodes: iterable
+        :param load: Load data from database.
+        :type  load: bool
+        """
+        self.nodes = dict((node.id, node) for node in nodes)
+        # network group id => NetworkGroup
+        self.networks = {}
+        # cluster id => [NetworkGroup] ordered by id
+        self.cluster_networks = defaultdict(list)
+        # node id => [(network group id, ip address)] ordered by IPAddr.id
+        self.ips = defaultdict(list)
+        # node id => [Interface] ordered by name
+        self.interfaces = defaultdict(list)
+        # interface id => set of network group ids
+        self.assignments = defaultdict(set)
+        # node id => {network name => interface name}, built lazily
+        self._ifaces_by_netname = {}
+        self._net_params = {}
+        self.admin_net = AdminNetworkCache.get()
+        if load and self.nodes:
+            self._load()
+
+    @classmethod
+    def for_cluster(cls, cluster):
+        """Returns resolver for all nodes of cluster.
+
+        :param cluster: Cluster object.
+        :type  cluster: Cluster
+        :returns: NetworkDataResolver
+        """
+        return cls(cluster.nodes)
+
+    @classmethod
+    def from_loaded(cls, node, ips, networks):
+        """Returns resolver for one node built from already loaded
+        objects, no queries are issued if node interfaces with
+        their assigned networks are loaded too.
+
+        :param node: Node object.
+        :type  node: Node
+        :param ips: IPAddr objects of node except admin ones.
+        :type  ips: iterable
+        :param networks: NetworkGroup objects of node cluster.
+        :type  networks: iterable
+        """
+        ips = list(ips)
+        resolver = cls([node], load=False)
+        resolver._add_networks(networks)
+        resolver._add_ips((ip.node, ip.network, ip.ip_addr) for ip in ips)
+        resolver._add_networks(
+            ip.network_data for ip in ips
+            if ip.network not in resolver.networks)
+        for iface in node.interfaces:
+            resolver._add_interfaces(
+                [(iface.id, node.id, iface.name, iface.ip_addr)])
+            resolver._add_assignments(
+                (iface.id, ng.id) for ng in iface.assigned_networks_list)
+        return resolver
+
+    def _load(self):
+        node_ids = self.nodes.keys()
+        cluster_ids = set(
+            n.cluster_id for n in self.nodes.itervalues() if n.cluster_id)
+
+        if cluster_ids:
+            self._add_networks(
+                db().query(NetworkGroup).filter(
+                    NetworkGroup.cluster_id.in_(cluster_ids)
+                ).order_by(NetworkGroup.id)
+            )
+
+        ips = db().query(
+            IPAddr.node, IPAddr.network, IPAddr.ip_addr
+        ).filter(
+            IPAddr.node.in_(node_ids)
+        ).order_by(IPAddr.id)
+        if self.admin_net:
+            ips = ips.filter(not_(IPAddr.network == self.admin_net.id))
+        self._add_ips(ips)
+
+        # IP addresses from networks of other clusters
+        missing = set(
+            net_id for node_ips in self.ips.itervalues()
+            for net_id, ip in node_ips if net_id not in self.networks)
+        if missing:
+            self._add_networks(
+                db().query(NetworkGroup).filter(
+                    NetworkGroup.id.in_(missing)
+                ).order_by(NetworkGroup.id)
+            )
+
+        self._add_interfaces(
+            db().query(
+                NodeNICInterface.id,
+                NodeNICInterface.node_id,
+                NodeNICInterface.name,
+                NodeNICInterface.ip_addr
+            ).filter(
+                NodeNICInterface.node_id.in_(node_ids)
+            ).order_by(NodeNICInterface.name)
+        )
+        self._add_assignments(
+            db().query(
+                NetworkAssignment.interface_id,
+                NetworkAssignment.network_id
+            ).join(
+                NodeNICInterface,
+                NodeNICInterface.id == NetworkAssignment.interface_id
+            ).filter(
+                NodeNICInterface.node_id.in_(node_ids)
+            )
+        )
+
+    def _add_networks(self, networks):
+        for net in networks:
+            if net.id in self.networks:
+                continue
+            self.networks[net.id] = net
+            if net.cluster_id:
+                self.cluster_networks[net.cluster_id].append(net)
+        for nets in self.cluster_networks.itervalues():
+            nets.sort(key=lambda net: net.id)
+
+    def _add_ips(self, ips):
+        for node_id, net_id, ip_addr in ips:
+            self.ips[node_id].append((net_id, ip_addr))
+
+    def _add_interfaces(self, interfaces):
+        for iface_id, node_id, name, ip_addr in interfaces:
+            self.interfaces[node_id].append(
+                Interface(iface_id, name, ip_addr))
+
+    def _add_assignments(self, assignments):
+        for iface_id, net_id in assignments:
+            self.assignments[iface_id].add(net_id)
+
+    def _get_net_params(self, net):
+        """Returns (prefix, netmask, broadcast) for network group."""
+        if net.id not in self._net_params:
+            cidr = IPNetwork(net.cidr)
+            if net.name == 'public':
+                # Get prefix from netmask instead of cidr
+                # for public network
+                prefix = str(IPNetwork('0.0.0.0/' + net.netmask).prefixlen)
+                netmask = net.netmask
+            else:
+                prefix = str(cidr.prefixlen)
+                netmask = str(cidr.netmask)
+            self._net_params[net.id] = (prefix, netmask, str(cidr.broadcast))
+        return self._net_params[net.id]
+
+    def get_interface_name(self, node, network_name):
+        """Returns name of node interface which has network
+        with specified name assigned.
+
+        :param node: Node object or ID.
+        :raises: errors.CanNotFindInterface
+        """
+        node_id = getattr(node, 'id', node)
+        ifaces_by_netname = self._ifaces_by_netname.get(node_id)
+        if ifaces_by_netname is None:
+            ifaces_by_netname = self._ifaces_by_netname[node_id] = {}
+            # interfaces are ordered by name, the first one wins
+            for iface in reversed(self.interfaces[node_id]):
+                for net_id in self.assignments[iface.id]:
+                    net = self.networks.get(net_id)
+                    if net is not None:
+                        ifaces_by_netname[net.name] = iface.name
+
+        if network_name in ifaces_by_netname:
+            return ifaces_by_netname[network_name]
+
+        raise errors.CanNotFindInterface(
+            u'Cannot find interface by name "{0}" for node: '
+            '{1}'.format(network_name, self.nodes[node_id].full_name))
+
+    def get_admin_interface_name(self, node):
+        """Same as Node.admin_interface, but without queries."""
+        node_id = getattr(node, 'id', node)
+        interfaces = self.interfaces[node_id]
+        admin_net = self.admin_net
+        if admin_net:
+            admin_index = IPRangeIndex.for_cidr(admin_net.cidr)
+            for iface in interfaces:
+                if admin_net.id in self.assignments[iface.id]:
+                    return iface.name
+
+            for iface in interfaces:
+                if iface.ip_addr and iface.ip_addr in admin_index:
+                    return iface.name
+
+        if not interfaces:
+            raise errors.CanNotFindInterface(
+                u'Node "{0}" has no interfaces'.format(
+                    self.nodes[node_id].full_name))
+
+        logger.warning(u'Cannot find admin interface for node '
+                       'return first interface: "%s"' %
+                       self.nodes[node_id].full_name)
+        return interfaces[0].name
+
+    def get(self, node):
+        """Returns network data for node in the same format
+        as NetworkManager.get_node_networks.
+
+        :param node: Node object or ID.
+        :returns: List of network info for node.
+        """
+        node = self.nodes[getattr(node, 'id', node)]
+        cluster = node.cluster
+        if cluster is None:
+            # Node doesn't belong to any cluster, so it should not have nets
+            return []
+
+        network_data = []
+        network_ids = set()
+        for net_id, ip_addr in self.ips[node.id]:
+            net = self.networks[net_id]
+            prefix, netmask, brd = self._get_net_params(net)
+            network_data.append({
+                'name': net.name,
+                'vlan': net.vlan_start,
+                'ip': ip_addr + '/' + prefix,
+                'netmask': netmask,
+                'brd': brd,
+                'gateway': net.gateway,
+                'dev': self.get_interface_name(node.id, net.name)})
+            network_ids.add(net.id)
+
+        # For now, we pass information about all networks,
+        #    so these vlans will be created on every node we call this func for
+        # However it will end up with errors if we precreate vlans in VLAN mode
+        #   in fixed network. We are skipping fixed nets in Vlan mode.
+        for net in self.cluster_networks[cluster.id]:
+            if net.id in network_ids:
+                continue
+            dev = self.get_interface_name(node.id, net.name)
+            if net.name == 'fixed' and cluster.net_manager == 'VlanManager':
+                continue
+            network_data.append({
+                'name': net.name,
+                'vlan': net.vlan_start,
+                'dev': dev})
+
+        network_data.append({
+            'name': 'admin',
+            'dev': self.get_admin_interface_name(node.id)})
+
+        return network_data
+
+    def get_by_netname(self, node, netname):
+        """Returns network info with specified name for node.
+
+        :raises: errors.CanNotFindNetworkForNode
+        """
+        for net in self.get(node):
+            if net['name'] == netname:
+                return net
+        raise errors.CanNotFindNetworkForNode(
+            u'Cannot find network with name: %s' % netname)
+
+    def get_all(self):
+        """Returns {node id: network data} for all nodes."""
+        return dict((node_id, self.get(node_id)) for node_id in self.nodes)
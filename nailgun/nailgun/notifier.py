@@ -14,7 +14,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from contextlib import contextmanager
 from datetime import datetime
+import threading
+import traceback
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
 from nailgun.db import db
 from nailgun.db.sqlalchemy.models import Notification
@@ -23,11 +29,124 @@ from nailgun.errors import errors
 from nailgun.logger import logger
 
 
+_local = threading.local()
+
+
+class NotificationBuffer(object):
+    """Notifications created inside of buffered() block. They are
+    deduplicated in memory and written by one insert at commit.
+    """
+
+    def __init__(self):
+        self.notifications = []
+        # task uuid => task id
+        self._tasks = {}
+        # (node id, task id, message) of added notifications
+        self._keys = set()
+
+    def task_id(self, task_uuid):
+        if task_uuid not in self._tasks:
+            self._tasks[task_uuid] = db().query(Task.id).filter_by(
+                uuid=task_uuid).scalar()
+        return self._tasks[task_uuid]
+
+    def add(self, topic, message, cluster_id=None, node_id=None,
+            task_uuid=None):
+        task_id = self.task_id(task_uuid) if task_uuid else None
+        if node_id and task_id:
+            key = (node_id, task_id, message)
+            if key in self._keys:
+                return
+            self._keys.add(key)
+        self.notifications.append({
+            'topic': topic,
+            'message': message,
+            'cluster_id': cluster_id,
+            'node_id': node_id,
+            'task_id': task_id,
+            'datetime': datetime.now()
+        })
+
+    def flush(self, session):
+        """Writes notifications which don't exist yet in database.
+        The same as notify() they are checked for existence only
+        when they have node and task.
+        """
+        notifications = self.notifications
+        if not notifications:
+            return
+        self.notifications = []
+
+        keys = [(n['node_id'], n['task_id'], n['message'])
+                for n in notifications if n['node_id'] and n['task_id']]
+        if keys:
+            exist = set(session.query(
+                Notification.node_id,
+                Notification.task_id,
+                Notification.message
+            ).filter(
+                Notification.task_id.in_(set(k[1] for k in keys))
+            ).filter(
+                Notification.node_id.in_(set(k[0] for k in keys))
+            ))
+            notifications = [
+                n for n in notifications
+                if (n['node_id'], n['task_id'], n['message']) not in exist
+            ]
+
+        if notifications:
+            session.execute(Notification.__table__.insert(), notifications)
+        for n in notifications:
+            logger.info(
+                "Notification: topic: %s message: %s" % (
+                    n['topic'], n['message'])
+            )
+
+
+@contextmanager
+def buffered():
+    """Notifications created by notify() inside of block are
+    written with the next commit of session, the ones left
+    after the last commit are written when block exits.
+    Nested blocks use the buffer of the outer one.
+    """
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is not None:
+        yield buffer
+        return
+
+    buffer = _local.buffer = NotificationBuffer()
+    try:
+        yield buffer
+    finally:
+        _local.buffer = None
+        if buffer.notifications:
+            try:
+                buffer.flush(db())
+                db().commit()
+            except Exception:
+                logger.error(traceback.format_exc())
+                db().rollback()
+
+
+@event.listens_for(Session, 'before_commit')
+def _flush_buffer(session):
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is not None:
+        buffer.flush(session)
+
+
 def notify(topic, message,
            cluster_id=None, node_id=None, task_uuid=None):
     if topic == 'discover' and node_id is None:
         raise errors.CannotFindNodeIDForDiscovering(
             "No node id in discover notification")
+
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is not None:
+        buffer.add(topic, message, cluster_id, node_id, task_uuid)
+        return
+
     task = None
     if task_uuid:
         task = db().query(Task).filter_by(uuid=task_uuid).first()
@@ -54,3 +173,33 @@ def notify(topic, message,
         logger.info(
             "Notification: topic: %s message: %s" % (topic, message)
         )
+
+
+def notify_many(topic, notifications, task_uuid=None):
+    """Creates notifications of one topic at once. Already
+    existing notifications are found with one query, new ones
+    are written with one executemany insert and one commit.
+
+    :param topic: Notification topic.
+    :type  topic: str
+    :param notifications: List of dicts with 'message' and
+    optional 'cluster_id' and 'node_id' keys.
+    :type  notifications: list
+    :param task_uuid: UUID of task notifications belong to.
+    :type  task_uuid: str
+    :returns: None
+    """
+    if not notifications:
+        return
+    if topic == 'discover' and any(
+            n.get('node_id') is None for n in notifications):
+        raise errors.CannotFindNodeIDForDiscovering(
+            "No node id in discover notification")
+
+    with buffered():
+        for n in notifications:
+            notify(topic, n['message'],
+                   cluster_id=n.get('cluster_id'),
+                   node_id=n.get('node_id'),
+                   task_uuid=task_uuid)
+        db().commit()
@@ -26,7 +26,9 @@ from nailgun.db.sqlalchemy.models import NetworkGroup
 from nailgun.db.sqlalchemy.models import Node
 from nailgun.errors import errors
 from nailgun.logger import logger
+from nailgun.network.interfaces import NodeInterfacesIndex
 from nailgun.network.manager import NetworkManager
+from nailgun.network.resolver import NetworkDataResolver
 from nailgun.settings import settings
 from nailgun.task.helpers import TaskHelper
 from nailgun.utils import dict_merge
@@ -68,15 +70,16 @@ class DeploymentMultinodeSerializer(object):
         """Method generates facts which
         through an orchestrator passes to puppet
         """
-        nodes = cls.serialize_nodes(nodes)
-        common_attrs = cls.get_common_attrs(cluster)
+        networks = NetworkDataResolver.for_cluster(cluster)
+        nodes = cls.serialize_nodes(nodes, networks)
+        common_attrs = cls.get_common_attrs(cluster, networks)
 
         cls.set_deployment_priorities(nodes)
 
         return [dict_merge(node, common_attrs) for node in nodes]
 
     @classmethod
-    def get_common_attrs(cls, cluster):
+    def get_common_attrs(cls, cluster, networks=None):
         """Cluster attributes."""
         attrs = cluster.attributes.merged_attrs_values()
         attrs['deployment_mode'] = cluster.mode
@@ -89,8 +92,8 @@ class DeploymentMultinodeSerializer(object):
 
         attrs = dict_merge(
             attrs,
-            cls.get_net_provider_serializer(cluster).get_common_attrs(cluster,
-                                                                      attrs))
+            cls.get_net_provider_serializer(cluster).get_common_attrs(
+                cluster, attrs, networks))
 
         return attrs
 
@@ -132,20 +135,24 @@ class DeploymentMultinodeSerializer(object):
             n['priority'] = other_nodes_prior
 
     @classmethod
-    def serialize_nodes(cls, nodes):
+    def serialize_nodes(cls, nodes, networks=None):
         """Serialize node for each role.
         For example if node has two roles then
         in orchestrator will be passed two serialized
         nodes.
         """
+        nodes = list(nodes)
+        if networks is None:
+            networks = NetworkDataResolver(nodes)
         serialized_nodes = []
         for node in nodes:
             for role in node.all_roles:
-                serialized_nodes.append(cls.serialize_node(node, role))
+                serialized_nodes.append(
+                    cls.serialize_node(node, role, networks))
         return serialized_nodes
 
     @classmethod
-    def serialize_node(cls, node, role):
+    def serialize_node(cls, node, role, networks=None):
         """Serialize node, then it will be
         merged with common attributes
         """
@@ -165,7 +172,8 @@ class DeploymentMultinodeSerializer(object):
         }
 
         node_attrs.update(
-            cls.get_net_provider_serializer(node.cluster).get_node_attrs(node))
+            cls.get_net_provider_serializer(node.cluster).get_node_attrs(
+                node, networks))
 
         return node_attrs
 
@@ -231,13 +239,13 @@ class DeploymentHASerializer(DeploymentMultinodeSerializer):
         return node_list
 
     @classmethod
-    def get_common_attrs(cls, cluster):
+    def get_common_attrs(cls, cluster, networks=None):
         """Common attributes for all facts
         """
         common_attrs = super(
             DeploymentHASerializer,
             cls
-        ).get_common_attrs(cluster)
+        ).get_common_attrs(cluster, networks)
 
         for ng in cluster.network_groups:
             if ng.meta.get("assign_vip"):
@@ -303,18 +311,20 @@ class DeploymentHASerializer(DeploymentMultinodeSerializer):
 class NetworkDeploymentSerializer(object):
 
     @classmethod
-    def get_common_attrs(cls, cluster, attrs):
+    def get_common_attrs(cls, cluster, attrs, networks=None):
         """Cluster network attributes."""
-        common = cls.network_provider_cluster_attrs(cluster)
+        if networks is None:
+            networks = NetworkDataResolver.for_cluster(cluster)
+        common = cls.network_provider_cluster_attrs(cluster, networks)
         common.update(cls.network_ranges(cluster))
         common.update({'master_ip': settings.MASTER_IP})
         common['nodes'] = deepcopy(attrs['nodes'])
 
         # Addresses
         for node in get_nodes_not_for_deletion(cluster):
-            netw_data = node.network_data
+            netw_data = networks.get(node)
             addresses = {}
-            for net in node.cluster.network_groups:
+            for net in cluster.network_groups:
                 if net.meta.get('render_addr_mask'):
                     addresses.update(cls.get_addr_mask(
                         netw_data,
@@ -326,16 +336,18 @@ class NetworkDeploymentSerializer(object):
         return common
 
     @classmethod
-    def get_node_attrs(cls, node):
+    def get_node_attrs(cls, node, networks=None):
         """Node network attributes."""
-        return cls.network_provider_node_attrs(node.cluster, node)
+        if networks is None:
+            networks = NetworkDataResolver([node])
+        return cls.network_provider_node_attrs(node.cluster, node, networks)
 
     @classmethod
-    def network_provider_cluster_attrs(cls, cluster):
+    def network_provider_cluster_attrs(cls, cluster, networks):
         raise NotImplemented
 
     @classmethod
-    def network_provider_node_attrs(cls, cluster, node):
+    def network_provider_node_attrs(cls, cluster, node, networks):
         raise NotImplemented
 
     @classmethod
@@ -389,15 +401,19 @@ class NetworkDeploymentSerializer(object):
         }
 
     @staticmethod
-    def get_admin_ip_w_prefix(node):
+    def get_admin_ip_w_prefix(node, networks=None):
         """Getting admin ip and assign prefix from admin network."""
         network_manager = NetworkManager
+        if networks is None:
+            admin_interface_name = node.admin_interface.name
+        else:
+            admin_interface_name = networks.get_admin_interface_name(node)
         admin_ip = network_manager.get_admin_ips_for_interfaces(
-            node)[node.admin_interface.name]
+            node)[admin_interface_name]
         admin_ip = IPNetwork(admin_ip)
 
         # Assign prefix from admin network
-        admin_net = IPNetwork(network_manager.get_admin_network_group().cidr)
+        admin_net = network_manager.get_admin_network_data().network
         admin_ip.prefixlen = admin_net.prefixlen
 
         return str(admin_ip)
@@ -406,14 +422,14 @@ class NetworkDeploymentSerializer(object):
 class NovaNetworkDeploymentSerializer(NetworkDeploymentSerializer):
 
     @classmethod
-    def network_provider_cluster_attrs(cls, cluster):
+    def network_provider_cluster_attrs(cls, cluster, networks):
         return {'novanetwork_parameters': cls.novanetwork_attrs(cluster),
                 'dns_nameservers': cluster.dns_nameservers}
 
     @classmethod
-    def network_provider_node_attrs(cls, cluster, node):
-        network_data = node.network_data
-        interfaces = cls.configure_interfaces(node)
+    def network_provider_node_attrs(cls, cluster, node, networks):
+        network_data = networks.get(node)
+        interfaces = cls.configure_interfaces(node, networks)
         cls.__add_hw_interfaces(interfaces, node.meta['interfaces'])
 
         # Interfaces assingment
@@ -421,7 +437,7 @@ class NovaNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         attrs.update(cls.interfaces_list(network_data))
 
         if cluster.net_manager == 'VlanManager':
-            attrs.update(cls.add_vlan_interfaces(node))
+            attrs.update(cls.add_vlan_interfaces(node, networks))
 
         return attrs
 
@@ -444,22 +460,25 @@ class NovaNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         return attrs
 
     @classmethod
-    def add_vlan_interfaces(cls, node):
+    def add_vlan_interfaces(cls, node, networks=None):
         """Assign fixed_interfaces and vlan_interface.
         They should be equal.
         """
-        fixed_interface = NetworkManager._get_interface_by_network_name(
-            node.id, 'fixed')
+        if networks is None:
+            networks = NetworkDataResolver([node])
+        fixed_interface = networks.get_interface_name(node, 'fixed')
 
-        attrs = {'fixed_interface': fixed_interface.name,
-                 'vlan_interface': fixed_interface.name}
+        attrs = {'fixed_interface': fixed_interface,
+                 'vlan_interface': fixed_interface}
         return attrs
 
     @classmethod
-    def configure_interfaces(cls, node):
+    def configure_interfaces(cls, node, networks=None):
         """Configure interfaces
         """
-        network_data = node.network_data
+        if networks is None:
+            networks = NetworkDataResolver([node])
+        network_data = networks.get(node)
         interfaces = {}
 
         for network in network_data:
@@ -481,7 +500,7 @@ class NovaNetworkDeploymentSerializer(NetworkDeploymentSerializer):
 
             # Add gateway for public
             if network_name == 'admin':
-                admin_ip_addr = cls.get_admin_ip_w_prefix(node)
+                admin_ip_addr = cls.get_admin_ip_w_prefix(node, networks)
                 interface['ipaddr'].append(admin_ip_addr)
             elif network_name == 'public' and network.get('gateway'):
                 interface['gateway'] = network['gateway']
@@ -530,7 +549,7 @@ class NovaNetworkDeploymentSerializer(NetworkDeploymentSerializer):
 class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
 
     @classmethod
-    def network_provider_cluster_attrs(cls, cluster):
+    def network_provider_cluster_attrs(cls, cluster, networks):
         """Cluster attributes."""
         attrs = {'quantum': True,
                  'quantum_settings': cls.neutron_attrs(cluster)}
@@ -538,8 +557,8 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         if cluster.mode == 'multinode':
             for node in cluster.nodes:
                 if cls._node_has_role_by_name(node, 'controller'):
-                    mgmt_cidr = NetworkManager.get_node_network_by_netname(
-                        node.id,
+                    mgmt_cidr = networks.get_by_netname(
+                        node,
                         'management'
                     )['ip']
                     attrs['management_vip'] = mgmt_cidr.split('/')[0]
@@ -548,11 +567,12 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         return attrs
 
     @classmethod
-    def network_provider_node_attrs(cls, cluster, node):
+    def network_provider_node_attrs(cls, cluster, node, networks):
         """Serialize node, then it will be
         merged with common attributes
         """
-        node_attrs = {'network_scheme': cls.generate_network_scheme(node)}
+        node_attrs = {
+            'network_scheme': cls.generate_network_scheme(node, networks)}
 
         return node_attrs
 
@@ -640,7 +660,10 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         return attrs
 
     @classmethod
-    def generate_network_scheme(cls, node):
+    def generate_network_scheme(cls, node, networks=None):
+        if networks is None:
+            networks = NetworkDataResolver([node])
+        admin_interface = networks.get_admin_interface_name(node)
 
         # Create a data structure and fill it with static values.
 
@@ -684,7 +707,7 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
                 )
             }
 
-            if iface.name == node.admin_interface.name:
+            if iface.name == admin_interface:
                 # A physical interface for the FuelWeb admin network should
                 # not be used through bridge. Directly only.
                 continue
@@ -698,7 +721,6 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
                 'name': iface.name
             })
 
-        nm = NetworkManager
         # Populate IP address information to endpoints.
         netgroup_mapping = [
             ('storage', 'br-storage'),
@@ -709,14 +731,14 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         for ngname, brname in netgroup_mapping:
             # Here we get a dict with network description for this particular
             # node with its assigned IPs and device names for each network.
-            netgroup = nm.get_node_network_by_netname(node.id, ngname)
+            netgroup = networks.get_by_netname(node, ngname)
             attrs['endpoints'][brname]['IP'] = [netgroup['ip']]
             netgroups[ngname] = netgroup
         attrs['endpoints']['br-ex']['gateway'] = netgroups['public']['gateway']
 
         # Connect interface bridges to network bridges.
         for ngname, brname in netgroup_mapping:
-            netgroup = nm.get_node_network_by_netname(node.id, ngname)
+            netgroup = netgroups[ngname]
             if not netgroup['vlan']:
                 # Untagged network.
                 attrs['transformations'].append({
@@ -743,10 +765,10 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
             attrs['transformations'].append({
                 'action': 'add-patch',
                 'bridges': [
-                    'br-%s' % nm.get_node_interface_by_netname(
-                        node.id,
+                    'br-%s' % networks.get_interface_name(
+                        node,
                         'private'
-                    ).name,
+                    ),
                     'br-prv'
                 ]
             })
@@ -760,10 +782,10 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
             )
 
         # Fill up all about fuelweb-admin network.
-        attrs['endpoints'][node.admin_interface.name] = {
-            "IP": [cls.get_admin_ip_w_prefix(node)]
+        attrs['endpoints'][admin_interface] = {
+            "IP": [cls.get_admin_ip_w_prefix(node, networks)]
         }
-        attrs['roles']['fw-admin'] = node.admin_interface.name
+        attrs['roles']['fw-admin'] = admin_interface
 
         return attrs
 
@@ -778,7 +800,8 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         trunks = [0]
 
         if use_vlan_splinters == 'hard':
-            for ng in iface.assigned_networks_list:
+            index = NodeInterfacesIndex.get(iface.node)
+            for ng in index.networks_by_interface[iface.name]:
                 if ng.name == 'private':
                     vlan_range = cluster.neutron_config.L2.get(
                         "phys_nets", {}
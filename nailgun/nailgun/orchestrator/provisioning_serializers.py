@@ -95,7 +95,7 @@ class ProvisioningSerializer(object):
         interfaces_extra = {}
         net_manager = NetworkManager
         admin_ips = net_manager.get_admin_ips_for_interfaces(node)
-        admin_netmask = net_manager.get_admin_network_group().netmask
+        admin_netmask = net_manager.get_admin_network_data().netmask
 
         for interface in node.interfaces:
             name = interface.name
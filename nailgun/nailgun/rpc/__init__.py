@@ -14,14 +14,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import json
+import logging
+import threading
 
 from kombu import Connection
 from kombu import Exchange
+from kombu.pools import producers
 from kombu import Queue
 
 from nailgun.logger import logger
 from nailgun.settings import settings
+from nailgun.utils import json_codec
 
 creds = (
     ("userid", "guest"),
@@ -59,14 +62,51 @@ nailgun_queue = Queue(
 )
 
 
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def get_connection():
+    """Returns connection to broker shared by all threads of process,
+    producers acquired for it are taken from kombu pool and
+    reconnect when broker connection is lost.
+    """
+    with _connections_lock:
+        if conn_str not in _connections:
+            _connections[conn_str] = Connection(conn_str)
+        return _connections[conn_str]
+
+
+def encode(message):
+    """Serializes message, returns (body, compression) pair.
+    Body is compressed with zlib only if it's not smaller than
+    RPC_PRODUCER compression_threshold, in this case "compression"
+    header is set by kombu and orchestrator decompresses it.
+    """
+    body = json_codec.dumps(message)
+    threshold = settings.RPC_PRODUCER.get('compression_threshold', 0)
+    if threshold and len(body) >= threshold:
+        return body, 'zlib'
+    return body, None
+
+
 def cast(name, message):
-    logger.debug(
-        "RPC cast to orchestrator:\n{0}".format(
-            json.dumps(message, indent=4)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "RPC cast to orchestrator:\n{0}".format(
+                json_codec.dumps(message, indent=4)
+            )
         )
-    )
-    with Connection(conn_str) as conn:
-        with conn.Producer(serializer='json') as producer:
-            producer.publish(message,
-                             exchange=naily_exchange, routing_key=name,
-                             declare=[naily_queue])
+    body, compression = encode(message)
+    with producers[get_connection()].acquire(block=True) as producer:
+        producer.publish(body,
+                         content_type='application/json',
+                         content_encoding='utf-8',
+                         compression=compression,
+                         exchange=naily_exchange, routing_key=name,
+                         declare=[naily_queue],
+                         retry=True,
+                         retry_policy={
+                             'max_retries': settings.RPC_PRODUCER.get(
+                                 'max_retries', 3)
+                         })
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from copy import deepcopy
+
+
+class MessageCoalescer(object):
+    """Merges progress messages of the same task.
+
+    Consecutive deploy_resp and provision_resp messages of a task
+    are merged into one: the latest status, progress and error are
+    kept for task and for every node. Messages of other methods are
+    never merged and work as barriers, messages are not moved across
+    them. A message with terminal status of task or of any node
+    closes its group, so terminal statuses are never overwritten
+    or reordered.
+    """
+
+    methods = ('deploy_resp', 'provision_resp')
+    terminal_statuses = ('ready', 'error')
+
+    def __init__(self):
+        # [(body, [messages])] in order of application
+        self.groups = []
+        # task uuid => group which still accepts messages
+        self._open = {}
+        # number of added messages
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, body, message=None):
+        """Adds message to the end of queue, len() of coalescer
+        is the number of messages added since the last pop_all().
+
+        :param body: Decoded message body.
+        :type  body: dict
+        :param message: Transport message, it's returned with
+        merged body, so it can be acknowledged after that.
+        """
+        self.size += 1
+        method = body.get('method')
+        args = body.get('args') or {}
+        task_uuid = args.get('task_uuid')
+        if method not in self.methods or not task_uuid:
+            # nothing is merged across other messages
+            self._open.clear()
+            self.groups.append((body, [message]))
+            return
+
+        group = self._open.get(task_uuid)
+        if group is not None and group[0]['method'] == method:
+            self._merge(group[0]['args'], args)
+            group[1].append(message)
+        else:
+            group = ({'method': method, 'args': deepcopy(args)}, [message])
+            self.groups.append(group)
+            self._open[task_uuid] = group
+
+        if self._is_terminal(args):
+            del self._open[task_uuid]
+
+    @classmethod
+    def _is_terminal(cls, args):
+        if args.get('status') in cls.terminal_statuses:
+            return True
+        return any(node.get('status') in cls.terminal_statuses
+                   for node in args.get('nodes') or [])
+
+    def pop_all(self):
+        """Returns list of (merged body, [messages]) pairs
+        in order of application and empties queue.
+        """
+        groups = self.groups
+        self.groups = []
+        self._open.clear()
+        self.size = 0
+        return groups
+
+    @classmethod
+    def _merge(cls, merged, args):
+        nodes = merged.get('nodes') or []
+        position = dict((node.get('uid'), i) for i, node in enumerate(nodes))
+        for node in args.get('nodes') or []:
+            uid = node.get('uid')
+            if uid in position:
+                nodes[position[uid]].update(node)
+            else:
+                position[uid] = len(nodes)
+                nodes.append(dict(node))
+
+        for key, value in args.iteritems():
+            if key == 'nodes':
+                continue
+            # None means no news, previous value is kept
+            if value is not None or key not in merged:
+                merged[key] = value
+        if nodes:
+            merged['nodes'] = nodes
+        if args.get('nodes') and args.get('progress') is None:
+            # task progress is recalculated by nodes
+            # when message has no progress of its own
+            merged['progress'] = None
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import struct
+import threading
+import time
+
+from nailgun.utils import json_codec
+
+
+# every record is header and message body serialized to JSON,
+# header is timestamp of message and length of body
+HEADER = struct.Struct('>dI')
+
+
+class MessageJournal(object):
+    """Appends received messages to file, so they can be replayed
+    later with "manage.py replay_rpc". When file grows larger than
+    max_bytes it's renamed to <path>.1, <path>.1 to <path>.2 and so on,
+    files older than backup_count are removed.
+    """
+
+    def __init__(self, path, max_bytes=100 * 1024 * 1024, backup_count=5):
+        """:param path: Journal file path.
+        :param max_bytes: Size of file to rotate it at, 0 disables
+        rotation.
+        :type  max_bytes: int
+        :param backup_count: How many rotated files to keep.
+        :type  backup_count: int
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        self.size = self._file.tell()
+
+    def write(self, body, timestamp=None):
+        """Appends message body to journal.
+
+        :param body: Decoded message body.
+        :type  body: dict
+        :param timestamp: Time message is received at,
+        current time by default.
+        :type  timestamp: float
+        """
+        data = json_codec.dumps(body, separators=(',', ':'))
+        if timestamp is None:
+            timestamp = time.time()
+        record = HEADER.pack(timestamp, len(data)) + data
+        with self._lock:
+            if self.max_bytes and self.size and \
+                    self.size + len(record) > self.max_bytes:
+                self._rotate()
+            self._file.write(record)
+            self._file.flush()
+            self.size += len(record)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count:
+            for i in xrange(self.backup_count - 1, 0, -1):
+                name = '{0}.{1}'.format(self.path, i)
+                if os.path.exists(name):
+                    os.rename(name, '{0}.{1}'.format(self.path, i + 1))
+            os.rename(self.path, '{0}.1'.format(self.path))
+            self._file = open(self.path, 'ab')
+        else:
+            self._file = open(self.path, 'wb')
+        self.size = 0
+
+
+def journal_files(path):
+    """Returns existing files of journal from the oldest one."""
+    files = [path]
+    i = 1
+    while os.path.exists('{0}.{1}'.format(path, i)):
+        files.insert(0, '{0}.{1}'.format(path, i))
+        i += 1
+    return [name for name in files if os.path.exists(name)]
+
+
+def read_journal(path):
+    """Yields (timestamp, body) pairs of all files of journal
+    in order messages were received. Incomplete record at the end
+    of file, left if consumer was killed while writing it, is skipped.
+    """
+    for name in journal_files(path):
+        with open(name, 'rb') as journal:
+            while True:
+                header = journal.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                timestamp, length = HEADER.unpack(header)
+                data = journal.read(length)
+                if len(data) < length:
+                    break
+                yield timestamp, json_codec.loads(data)
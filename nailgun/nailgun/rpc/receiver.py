@@ -16,7 +16,6 @@
 
 import collections
 import itertools
-import json
 import netifaces
 import os
 import traceback
@@ -26,16 +25,24 @@ from sqlalchemy import or_
 from nailgun import notifier
 
 from nailgun.db import db
-from nailgun.db.sqlalchemy.models import IPAddr
+from nailgun.db.sqlalchemy.deletion import delete_cluster
+from nailgun.db.sqlalchemy.deletion import delete_nodes
 from nailgun.db.sqlalchemy.models import Node
+from nailgun.db.sqlalchemy.models import NodeNICInterface
 from nailgun.db.sqlalchemy.models import Release
 from nailgun.db.sqlalchemy.models import Task
 from nailgun.errors import errors
+from nailgun.logger import LazyPayload
 from nailgun.logger import logger
+from nailgun.logger import LogSampler
 from nailgun.network.manager import NetworkManager
+from nailgun.settings import settings
 from nailgun.task.helpers import TaskHelper
 
 
+progress_sampler = LogSampler()
+
+
 def get_task_by_uuid(uuid):
     task = db().query(Task).filter_by(uuid=uuid).first()
     if not task:
@@ -47,11 +54,64 @@ def get_task_by_uuid(uuid):
 class NailgunReceiver(object):
 
     @classmethod
-    def remove_nodes_resp(cls, **kwargs):
-        logger.info(
-            "RPC method remove_nodes_resp received: %s" %
-            json.dumps(kwargs)
+    def _node_id(cls, uid):
+        """Returns node id from uid of RPC message
+        or None if uid is missing or not a number.
+        """
+        try:
+            return int(uid)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _get_nodes_by_uids(cls, uids):
+        """Loads nodes with one query, invalid uids are skipped.
+
+        :param uids: Nodes uids from RPC message.
+        :type  uids: iterable
+        :returns: Dict {node id: Node}
+        """
+        nodes_ids = set(cls._node_id(uid) for uid in uids)
+        nodes_ids.discard(None)
+        if not nodes_ids:
+            return {}
+        return dict(
+            (node.id, node) for node in
+            db().query(Node).filter(Node.id.in_(nodes_ids))
         )
+
+    @classmethod
+    def _is_progress(cls, kwargs):
+        """Checks if message only reports progress of task, such
+        messages are sampled in logs. Messages with error or final
+        status of task or of any node are always logged.
+        """
+        final = ('ready', 'error')
+        if not kwargs.get('task_uuid') or kwargs.get('error') or \
+                kwargs.get('status') in final:
+            return False
+        return not any(node.get('status') in final
+                       for node in kwargs.get('nodes') or [])
+
+    @classmethod
+    def _log_received(cls, method, kwargs):
+        """Logs received message. It's serialized only if record is
+        emitted and cut to PAYLOAD_LOGGING max_size, only every
+        progress_sample_rate-th progress message of task is logged.
+        """
+        logging_settings = settings.PAYLOAD_LOGGING
+        if cls._is_progress(kwargs) and \
+                not progress_sampler(
+                    (method, kwargs['task_uuid']),
+                    logging_settings.get('progress_sample_rate', 1)):
+            return
+        logger.info(
+            "RPC method %s received: %s", method,
+            LazyPayload(kwargs, logging_settings.get('max_size', 0)))
+
+    @classmethod
+    def remove_nodes_resp(cls, **kwargs):
+        cls._log_received('remove_nodes_resp', kwargs)
         task_uuid = kwargs.get('task_uuid')
         nodes = kwargs.get('nodes') or []
         error_nodes = kwargs.get('error_nodes') or []
@@ -60,24 +120,34 @@ class NailgunReceiver(object):
         status = kwargs.get('status')
         progress = kwargs.get('progress')
 
+        nodes_ids = [int(node['uid']) for node in nodes]
+        existing_ids = set()
+        if nodes_ids:
+            existing_ids = set(nid for (nid,) in db().query(Node.id).filter(
+                Node.id.in_(nodes_ids)))
+
+        nodes_to_delete = []
         for node in nodes:
-            node_db = db().query(Node).get(node['uid'])
-            if not node_db:
+            if int(node['uid']) not in existing_ids:
                 logger.error(
                     u"Failed to delete node '%s': node doesn't exist",
                     str(node)
                 )
                 break
-            db().delete(node_db)
+            nodes_to_delete.append(int(node['uid']))
 
-        for node in inaccessible_nodes:
-            # Nodes which not answered by rpc just removed from db
-            node_db = db().query(Node).get(node['uid'])
-            if node_db:
+        # Nodes which not answered by rpc just removed from db
+        inaccessible_ids = [int(node['uid']) for node in inaccessible_nodes]
+        if inaccessible_ids:
+            for node_db in db().query(Node).filter(
+                    Node.id.in_(inaccessible_ids)):
                 logger.warn(
                     u'Node %s not answered by RPC, removing from db',
                     node_db.human_readable_name)
-                db().delete(node_db)
+                nodes_to_delete.append(node_db.id)
+
+        if nodes_to_delete:
+            delete_nodes(Node.id.in_(nodes_to_delete))
 
         for node in error_nodes:
             node_db = db().query(Node).get(node['uid'])
@@ -115,10 +185,7 @@ class NailgunReceiver(object):
 
     @classmethod
     def remove_cluster_resp(cls, **kwargs):
-        logger.info(
-            "RPC method remove_cluster_resp received: %s" %
-            json.dumps(kwargs)
-        )
+        cls._log_received('remove_cluster_resp', kwargs)
         task_uuid = kwargs.get('task_uuid')
 
         cls.remove_nodes_resp(**kwargs)
@@ -130,13 +197,7 @@ class NailgunReceiver(object):
             logger.debug("Removing environment itself")
             cluster_name = cluster.name
 
-            ips = db().query(IPAddr).filter(
-                IPAddr.network.in_([n.id for n in cluster.network_groups])
-            )
-            map(db().delete, ips)
-            db().commit()
-
-            db().delete(cluster)
+            delete_cluster(cluster.id)
             db().commit()
 
             notifier.notify(
@@ -165,10 +226,7 @@ class NailgunReceiver(object):
 
     @classmethod
     def deploy_resp(cls, **kwargs):
-        logger.info(
-            "RPC method deploy_resp received: %s" %
-            json.dumps(kwargs)
-        )
+        cls._log_received('deploy_resp', kwargs)
         task_uuid = kwargs.get('task_uuid')
         nodes = kwargs.get('nodes') or []
         message = kwargs.get('error')
@@ -187,14 +245,18 @@ class NailgunReceiver(object):
         if not status:
             status = task.status
 
-        # First of all, let's update nodes in database
+        # First of all, let's update nodes in database,
+        # all nodes are loaded and committed at once
+        nodes_db = cls._get_nodes_by_uids(node.get('uid') for node in nodes)
+        failed_nodes = []
         for node in nodes:
-            node_db = db().query(Node).get(node['uid'])
+            uid = node.get('uid')
+            node_db = nodes_db.get(cls._node_id(uid))
 
             if not node_db:
                 logger.warning(
                     u"No node found with uid '{0}' - nothing changed".format(
-                        node['uid']
+                        uid
                     )
                 )
                 continue
@@ -206,14 +268,14 @@ class NailgunReceiver(object):
                 'progress',
                 'online'
             )
+            failure_message = None
             for param in update_fields:
                 if param in node:
                     logger.debug(
-                        u"Updating node {0} - set {1} to {2}".format(
-                            node['uid'],
-                            param,
-                            node[param]
-                        )
+                        u"Updating node %s - set %s to %s",
+                        uid,
+                        param,
+                        node[param]
                     )
                     setattr(node_db, param, node[param])
 
@@ -226,24 +288,28 @@ class NailgunReceiver(object):
                         if node.get('online') is False \
                                 and not node_db.error_msg:
                             node_db.error_msg = u"Node is offline"
-                        # Notification on particular node failure
-                        notifier.notify(
-                            "error",
-                            u"Failed to deploy node '{0}': {1}".format(
-                                node_db.name,
-                                node_db.error_msg or "Unknown error"
-                            ),
-                            cluster_id=task.cluster_id,
-                            node_id=node['uid'],
-                            task_uuid=task_uuid
-                        )
+                        if failure_message is None:
+                            failure_message = \
+                                u"Failed to deploy node '{0}': {1}".format(
+                                    node_db.name,
+                                    node_db.error_msg or "Unknown error"
+                                )
 
-            db().add(node_db)
+            if failure_message is not None:
+                # Notification on particular node failure
+                failed_nodes.append({
+                    'message': failure_message,
+                    'cluster_id': task.cluster_id,
+                    'node_id': node_db.id
+                })
+
+        if failed_nodes:
+            # commits nodes changes together with notifications
+            notifier.notify_many("error", failed_nodes, task_uuid)
+        else:
             db().commit()
 
         # We should calculate task progress by nodes info
-        task = get_task_by_uuid(task_uuid)
-
         if nodes and not progress:
             progress = TaskHelper.recalculate_deployment_task_progress(task)
 
@@ -257,9 +323,7 @@ class NailgunReceiver(object):
 
     @classmethod
     def provision_resp(cls, **kwargs):
-        logger.info(
-            "RPC method provision_resp received: %s" %
-            json.dumps(kwargs))
+        cls._log_received('provision_resp', kwargs)
 
         task_uuid = kwargs.get('task_uuid')
         message = kwargs.get('error')
@@ -269,9 +333,10 @@ class NailgunReceiver(object):
 
         task = get_task_by_uuid(task_uuid)
 
+        nodes_db = cls._get_nodes_by_uids(node.get('uid') for node in nodes)
         for node in nodes:
             uid = node.get('uid')
-            node_db = db().query(Node).get(uid)
+            node_db = nodes_db.get(cls._node_id(uid))
 
             if not node_db:
                 logger.warn('Task with uid "{0}" not found'.format(uid))
@@ -288,7 +353,6 @@ class NailgunReceiver(object):
 
         db().commit()
 
-        task = get_task_by_uuid(task_uuid)
         if nodes and not progress:
             progress = TaskHelper.recalculate_provisioning_task_progress(task)
 
@@ -426,10 +490,7 @@ class NailgunReceiver(object):
 
     @classmethod
     def verify_networks_resp(cls, **kwargs):
-        logger.info(
-            "RPC method verify_networks_resp received: %s" %
-            json.dumps(kwargs)
-        )
+        cls._log_received('verify_networks_resp', kwargs)
         task_uuid = kwargs.get('task_uuid')
         nodes = kwargs.get('nodes')
         error_msg = kwargs.get('error')
@@ -471,14 +532,15 @@ class NailgunReceiver(object):
                     )
                 status = 'error'
             else:
+                cached_nodes_by_uid = {}
+                for cached_node in cached_nodes:
+                    cached_nodes_by_uid.setdefault(
+                        str(cached_node['uid']), cached_node)
+
                 error_nodes = []
                 for node in nodes:
-                    cached_nodes_filtered = filter(
-                        lambda n: str(n['uid']) == str(node['uid']),
-                        cached_nodes
-                    )
-
-                    if not cached_nodes_filtered:
+                    cached_node = cached_nodes_by_uid.get(str(node['uid']))
+                    if cached_node is None:
                         logger.warning(
                             "verify_networks_resp: arguments contain node "
                             "data which is not in the task cache: %r",
@@ -486,16 +548,15 @@ class NailgunReceiver(object):
                         )
                         continue
 
-                    cached_node = cached_nodes_filtered[0]
+                    received_networks = {}
+                    for network in node.get('networks', []):
+                        received_networks.setdefault(network['iface'], network)
 
                     for cached_network in cached_node['networks']:
-                        received_networks_filtered = filter(
-                            lambda n: n['iface'] == cached_network['iface'],
-                            node.get('networks', [])
-                        )
+                        received_network = received_networks.get(
+                            cached_network['iface'])
 
-                        if received_networks_filtered:
-                            received_network = received_networks_filtered[0]
+                        if received_network is not None:
                             absent_vlans = list(
                                 set(cached_network['vlans']) -
                                 set(received_network['vlans'])
@@ -509,34 +570,12 @@ class NailgunReceiver(object):
                             absent_vlans = cached_network['vlans']
 
                         if absent_vlans:
-                            data = {'uid': node['uid'],
-                                    'interface': cached_network['iface'],
-                                    'absent_vlans': absent_vlans}
-                            node_db = db().query(Node).get(node['uid'])
-                            if node_db:
-                                data['name'] = node_db.name
-                                db_nics = filter(
-                                    lambda i:
-                                    i.name == cached_network['iface'],
-                                    node_db.interfaces
-                                )
-                                if db_nics:
-                                    data['mac'] = db_nics[0].mac
-                                else:
-                                    logger.warning(
-                                        "verify_networks_resp: can't find "
-                                        "interface %r for node %r in DB",
-                                        cached_network['iface'], node_db.id
-                                    )
-                                    data['mac'] = 'unknown'
-                            else:
-                                logger.warning(
-                                    "verify_networks_resp: can't find node "
-                                    "%r in DB",
-                                    node['uid']
-                                )
+                            error_nodes.append({
+                                'uid': node['uid'],
+                                'interface': cached_network['iface'],
+                                'absent_vlans': absent_vlans})
 
-                            error_nodes.append(data)
+                cls._add_nodes_interfaces_info(error_nodes)
 
                 if error_nodes:
                     result = error_nodes
@@ -554,6 +593,47 @@ class NailgunReceiver(object):
             TaskHelper.update_verify_networks(task_uuid, status, progress,
                                               error_msg, result)
 
+    @classmethod
+    def _add_nodes_interfaces_info(cls, error_nodes):
+        """Adds node name and interface MAC to every verification
+        error, names and MACs of all nodes are loaded by one query.
+
+        :param error_nodes: List of dicts with node uid and interface.
+        """
+        if not error_nodes:
+            return
+
+        nodes_ids = set(int(data['uid']) for data in error_nodes)
+        names = {}
+        macs = {}
+        for node_id, name, iface, mac in db().query(
+            Node.id, Node.name, NodeNICInterface.name, NodeNICInterface.mac
+        ).outerjoin(
+            NodeNICInterface, NodeNICInterface.node_id == Node.id
+        ).filter(Node.id.in_(nodes_ids)):
+            names[node_id] = name
+            if iface is not None:
+                macs.setdefault((node_id, iface), mac)
+
+        for data in error_nodes:
+            node_id = int(data['uid'])
+            if node_id not in names:
+                logger.warning(
+                    "verify_networks_resp: can't find node %r in DB",
+                    data['uid']
+                )
+                continue
+
+            data['name'] = names[node_id]
+            data['mac'] = macs.get((node_id, data['interface']))
+            if data['mac'] is None:
+                logger.warning(
+                    "verify_networks_resp: can't find "
+                    "interface %r for node %r in DB",
+                    data['interface'], node_id
+                )
+                data['mac'] = 'unknown'
+
     @classmethod
     def _master_networks_gen(cls, ifaces):
         for iface in ifaces:
@@ -571,10 +651,7 @@ class NailgunReceiver(object):
         """Receiver method for check_dhcp task
         For example of kwargs check FakeCheckingDhcpThread
         """
-        logger.info(
-            "RPC method check_dhcp_resp received: %s",
-            json.dumps(kwargs)
-        )
+        cls._log_received('check_dhcp_resp', kwargs)
         messages = []
 
         result = collections.defaultdict(list)
@@ -619,10 +696,7 @@ class NailgunReceiver(object):
 
     @classmethod
     def check_redhat_credentials_resp(cls, **kwargs):
-        logger.info(
-            "RPC method check_redhat_credentials_resp received: %s" %
-            json.dumps(kwargs)
-        )
+        cls._log_received('check_redhat_credentials_resp', kwargs)
         task_uuid = kwargs.get('task_uuid')
         error_msg = kwargs.get('error')
         status = kwargs.get('status')
@@ -668,10 +742,7 @@ class NailgunReceiver(object):
 
     @classmethod
     def redhat_check_licenses_resp(cls, **kwargs):
-        logger.info(
-            "RPC method redhat_check_licenses_resp received: %s" %
-            json.dumps(kwargs)
-        )
+        cls._log_received('redhat_check_licenses_resp', kwargs)
         task_uuid = kwargs.get('task_uuid')
         error_msg = kwargs.get('error')
         status = kwargs.get('status')
@@ -720,10 +791,7 @@ class NailgunReceiver(object):
 
     @classmethod
     def download_release_resp(cls, **kwargs):
-        logger.info(
-            "RPC method download_release_resp received: %s" %
-            json.dumps(kwargs)
-        )
+        cls._log_received('download_release_resp', kwargs)
         task_uuid = kwargs.get('task_uuid')
         error_msg = kwargs.get('error')
         status = kwargs.get('status')
@@ -800,10 +868,7 @@ class NailgunReceiver(object):
 
     @classmethod
     def dump_environment_resp(cls, **kwargs):
-        logger.info(
-            "RPC method dump_environment_resp received: %s" %
-            json.dumps(kwargs)
-        )
+        cls._log_received('dump_environment_resp', kwargs)
         task_uuid = kwargs.get('task_uuid')
         status = kwargs.get('status')
         progress = kwargs.get('progress')
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from collections import defaultdict
+import math
+import time
+
+from nailgun.rpc.journal import read_journal
+from nailgun.rpc.receiver import NailgunReceiver
+from nailgun.rpc.threaded import RPCConsumer
+
+
+def percentile(values, percent):
+    """Returns nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+
+class ReplayStats(object):
+
+    percents = (50, 90, 99)
+
+    def __init__(self):
+        # method => latencies of its messages in seconds
+        self.latencies = defaultdict(list)
+        self.elapsed = 0.0
+
+    def add(self, method, latency):
+        self.latencies[method].append(latency)
+
+    @property
+    def count(self):
+        return sum(len(values) for values in self.latencies.itervalues())
+
+    def rate(self):
+        """Returns number of replayed messages per second."""
+        if not self.elapsed:
+            return 0.0
+        return self.count / self.elapsed
+
+    def methods(self):
+        """Returns {method: {'count': n, 'p50': .., 'max': ..}},
+        latencies are in seconds.
+        """
+        result = {}
+        for method, values in self.latencies.iteritems():
+            values = sorted(values)
+            stats = {'count': len(values), 'max': values[-1]}
+            for percent in self.percents:
+                stats['p{0}'.format(percent)] = percentile(values, percent)
+            result[method] = stats
+        return result
+
+    def format(self):
+        columns = ['count'] + \
+            ['p{0}'.format(p) for p in self.percents] + ['max']
+        lines = [u"{0:<30}{1}".format(
+            u"method", u"".join(u"{0:>10}".format(c) for c in columns))]
+        for method, stats in sorted(self.methods().iteritems()):
+            lines.append(u"{0:<30}{1:>10}{2}".format(
+                method, stats['count'],
+                u"".join(u"{0:>9.1f}ms".format(stats[c] * 1000)
+                         for c in columns[1:])))
+        lines.append(u"{0} messages in {1:.2f}s, {2:.1f} msg/s".format(
+            self.count, self.elapsed, self.rate()))
+        return u"\n".join(lines)
+
+
+def replay(records, receiver=NailgunReceiver, speed=0):
+    """Applies journal records to receiver like RPC consumer does,
+    returns ReplayStats.
+
+    :param records: (timestamp, body) pairs, see read_journal.
+    :param receiver: Receiver class.
+    :param speed: 0 to apply messages as fast as possible,
+    1 to keep recorded intervals between them, 2 to make them
+    twice as short and so on.
+    :type  speed: float
+    """
+    consumer = RPCConsumer(None, receiver)
+    stats = ReplayStats()
+    started = time.time()
+    first = None
+    for timestamp, body in records:
+        if speed:
+            if first is None:
+                first = timestamp
+            delay = (timestamp - first) / speed - (time.time() - started)
+            if delay > 0:
+                time.sleep(delay)
+        applied = time.time()
+        consumer.apply(body)
+        stats.add(body.get('method'), time.time() - applied)
+    stats.elapsed = time.time() - started
+    return stats
+
+
+def replay_journal(path, speed=0):
+    """Replays all files of journal to NailgunReceiver
+    and returns ReplayStats.
+    """
+    return replay(read_journal(path), speed=speed)
@@ -14,43 +14,230 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import Queue
+import socket
 import threading
 import traceback
 
 from kombu import Connection
 from kombu.mixins import ConsumerMixin
 
+from nailgun import notifier
+
 from nailgun.db import db
+from nailgun.db.sqlalchemy.models import Task
 from nailgun.errors import errors
 from nailgun.logger import logger
 import nailgun.rpc as rpc
+from nailgun.rpc.coalescer import MessageCoalescer
+from nailgun.rpc.journal import MessageJournal
 from nailgun.rpc.receiver import NailgunReceiver
+from nailgun.settings import settings
+
+
+class RPCWorker(threading.Thread):
+    """Applies messages of its partitions one by one. Every
+    worker runs in its own thread, so it has its own session.
+    """
+
+    def __init__(self, consumer):
+        super(RPCWorker, self).__init__()
+        self.daemon = True
+        self.consumer = consumer
+        self.queue = Queue.Queue()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            body, messages = item
+            try:
+                self.consumer.apply(body)
+            finally:
+                # channel isn't thread-safe, messages are
+                # acknowledged by consumer thread
+                self.consumer.done.put(messages)
+        db.remove()
 
 
 class RPCConsumer(ConsumerMixin):
 
-    def __init__(self, connection, receiver):
+    # size of task uuid => partition key cache
+    partitions_cache_size = 10000
+
+    def __init__(self, connection, receiver, coalesce_window=0,
+                 coalesce_timeout=0.05, workers=1, prefetch_count=0,
+                 journal=None):
+        """:param connection: kombu Connection.
+        :param receiver: Receiver class, messages are passed to its
+        methods with names from messages.
+        :param coalesce_window: How many messages may be merged
+        before they are applied, 0 disables merging.
+        :type  coalesce_window: int
+        :param coalesce_timeout: How long to wait for the next
+        message to merge, in seconds.
+        :type  coalesce_timeout: float
+        :param workers: Number of worker threads, messages are
+        applied in consumer thread if it's 1.
+        :type  workers: int
+        :param prefetch_count: How many unacknowledged messages
+        broker sends, 0 means no limit.
+        :type  prefetch_count: int
+        :param journal: Journal to record received messages to.
+        :type  journal: MessageJournal
+        """
         self.connection = connection
         self.receiver = receiver
+        self.coalesce_window = coalesce_window
+        self.coalesce_timeout = coalesce_timeout
+        self.prefetch_count = prefetch_count
+        self.journal = journal
+        self.coalescer = MessageCoalescer()
+        self._consume_connection = None
+        self._lock = threading.Lock()
+        # number of messages taken from queue
+        self.received = 0
+        # number of (merged) messages passed to receiver
+        self.applied = 0
+
+        # task uuid => partition key
+        self._partitions = {}
+        # lists of messages applied by workers
+        self.done = Queue.Queue()
+        self.workers = []
+        if workers > 1:
+            self.workers = [RPCWorker(self) for _ in xrange(workers)]
+            for worker in self.workers:
+                worker.start()
 
     def get_consumers(self, Consumer, channel):
         return [Consumer(queues=[rpc.nailgun_queue],
                          callbacks=[self.consume_msg])]
 
+    def on_consume_ready(self, connection, channel, consumers, **kwargs):
+        self._consume_connection = connection
+        if self.prefetch_count:
+            for consumer in consumers:
+                consumer.qos(prefetch_count=self.prefetch_count)
+
+    def on_iteration(self):
+        if len(self.coalescer):
+            self.drain()
+        self.ack_done()
+
+    def stats(self):
+        return {'received': self.received, 'applied': self.applied}
+
     def consume_msg(self, body, msg):
-        callback = getattr(self.receiver, body["method"])
+        self.received += 1
+        if self.journal is not None:
+            self.journal.write(body)
+        if not self.coalesce_window:
+            self.dispatch(body, [msg])
+        else:
+            self.coalescer.add(body, msg)
+            if len(self.coalescer) >= self.coalesce_window:
+                self.flush()
+        self.ack_done()
+
+    def drain(self):
+        """Takes messages already waiting in queue, for at most
+        coalesce_timeout per message, and applies merged ones.
+        """
+        conn = self._consume_connection
         try:
-            callback(**body["args"])
-            db().commit()
-        except errors.CannotFindTask as e:
-            logger.warn(str(e))
-            db().rollback()
-        except Exception:
-            logger.error(traceback.format_exc())
-            db().rollback()
+            while conn is not None and \
+                    0 < len(self.coalescer) < self.coalesce_window:
+                conn.drain_events(timeout=self.coalesce_timeout)
+        except socket.timeout:
+            pass
         finally:
-            msg.ack()
-            db().expire_all()
+            self.flush()
+
+    def flush(self):
+        for body, messages in self.coalescer.pop_all():
+            self.dispatch(body, messages)
+
+    def dispatch(self, body, messages):
+        """Applies message in consumer thread or passes it
+        to worker of its partition.
+
+        :param body: Message body.
+        :type  body: dict
+        :param messages: Transport messages to acknowledge
+        after body is applied.
+        :type  messages: list
+        """
+        if not self.workers:
+            try:
+                self.apply(body)
+            finally:
+                for msg in messages:
+                    msg.ack()
+            return
+
+        key = self.partition_key(body)
+        worker = self.workers[hash(key) % len(self.workers)]
+        worker.queue.put((body, messages))
+
+    def partition_key(self, body):
+        """Returns key of partition message belongs to. Tasks
+        of one cluster change the same nodes and cluster, so
+        their messages are in one partition and keep order.
+        """
+        task_uuid = (body.get('args') or {}).get('task_uuid')
+        if not task_uuid:
+            return None
+
+        key = self._partitions.get(task_uuid)
+        if key is None:
+            try:
+                cluster_id = db().query(Task.cluster_id).filter_by(
+                    uuid=task_uuid).scalar()
+            finally:
+                db().rollback()
+            if cluster_id:
+                key = ('cluster', cluster_id)
+            else:
+                key = ('task', task_uuid)
+            if len(self._partitions) >= self.partitions_cache_size:
+                self._partitions.clear()
+            self._partitions[task_uuid] = key
+        return key
+
+    def ack_done(self):
+        while True:
+            try:
+                messages = self.done.get_nowait()
+            except Queue.Empty:
+                break
+            for msg in messages:
+                msg.ack()
+
+    def stop_workers(self):
+        for worker in self.workers:
+            worker.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.ack_done()
+
+    def apply(self, body):
+        with self._lock:
+            self.applied += 1
+        callback = getattr(self.receiver, body["method"])
+        # notifications of message are written at once with commit
+        with notifier.buffered():
+            try:
+                callback(**body["args"])
+                db().commit()
+            except errors.CannotFindTask as e:
+                logger.warn(str(e))
+                db().rollback()
+            except Exception:
+                logger.error(traceback.format_exc())
+                db().rollback()
+        db().expire_all()
 
 
 class RPCKombuThread(threading.Thread):
@@ -69,6 +256,32 @@ class RPCKombuThread(threading.Thread):
         super(RPCKombuThread, self).join(timeout)
 
     def run(self):
+        consumer_settings = settings.RPC_CONSUMER
+        journal = None
+        if consumer_settings.get('journal'):
+            journal = MessageJournal(
+                consumer_settings['journal'],
+                max_bytes=int(
+                    consumer_settings.get('journal_max_bytes', 0)),
+                backup_count=int(
+                    consumer_settings.get('journal_backup_count', 0))
+            )
         with Connection(rpc.conn_str) as conn:
-            self.consumer = RPCConsumer(conn, self.receiver)
-            self.consumer.run()
+            self.consumer = RPCConsumer(
+                conn,
+                self.receiver,
+                coalesce_window=int(
+                    consumer_settings.get('coalesce_window', 0)),
+                coalesce_timeout=float(
+                    consumer_settings.get('coalesce_timeout', 0.05)),
+                workers=int(consumer_settings.get('workers', 1)),
+                prefetch_count=int(
+                    consumer_settings.get('prefetch_count', 0)),
+                journal=journal
+            )
+            try:
+                self.consumer.run()
+            finally:
+                self.consumer.stop_workers()
+                if journal is not None:
+                    journal.close()
@@ -16,7 +16,9 @@
 
 import os
 import shutil
+import time
 
+from sqlalchemy import func
 from sqlalchemy import or_
 
 from nailgun.db import db
@@ -31,6 +33,11 @@ from nailgun.settings import settings
 
 class TaskHelper(object):
 
+    # task uuid => (time, progress) of the last propagation
+    # of its progress to parent task
+    _propagated = {}
+    _propagated_cache_size = 10000
+
     @classmethod
     def make_slave_name(cls, nid):
         return u"node-%s" % str(nid)
@@ -46,7 +53,7 @@ class TaskHelper(object):
             if n.fqdn != fqdn:
                 n.fqdn = fqdn
                 logger.debug("Updating node fqdn: %s %s", n.id, n.fqdn)
-                db().commit()
+        db().commit()
 
     @classmethod
     def prepare_syslog_dir(cls, node, prefix=None):
@@ -126,6 +133,7 @@ class TaskHelper(object):
         data = {'status': status, 'progress': progress,
                 'message': msg, 'result': result}
 
+        previous_status = task.status
         for key, value in data.iteritems():
             if value is not None:
                 setattr(task, key, value)
@@ -134,14 +142,44 @@ class TaskHelper(object):
                         task.uuid, task.name, key, value))
         db().commit()
 
-        if task.cluster_id:
+        finished = task.status in ('ready', 'error')
+        # cluster status depends only on finished tasks
+        if task.cluster_id and finished:
             logger.debug("Updating cluster status: %s "
                          "cluster_id: %s status: %s",
                          uuid, task.cluster_id, status)
             cls.update_cluster_status(uuid)
-        if task.parent:
-            logger.debug("Updating parent task: %s.", task.parent.uuid)
-            cls.update_parent_task(task.parent.uuid)
+        if task.parent_id:
+            if finished or task.status != previous_status:
+                cls._propagated.pop(task.uuid, None)
+                logger.debug("Updating parent task: %s.", task.parent.uuid)
+                cls.update_parent_task(task.parent.uuid)
+            elif cls._should_propagate_progress(task):
+                logger.debug("Updating parent task progress: %s.",
+                             task.parent.uuid)
+                cls._update_parent_progress(task.parent)
+                db().commit()
+
+    @classmethod
+    def _should_propagate_progress(cls, task):
+        """Progress of subtask is propagated to parent task when it
+        changes by TASK_PROGRESS_PROPAGATION progress_step percent
+        or when interval seconds passed since the last propagation.
+        """
+        propagation = settings.TASK_PROGRESS_PROPAGATION
+        now = time.time()
+        last = cls._propagated.get(task.uuid)
+        if last is not None:
+            last_time, last_progress = last
+            if abs((task.progress or 0) - (last_progress or 0)) < \
+                    propagation.get('progress_step', 0) and \
+                    now - last_time < propagation.get('interval', 0):
+                return False
+
+        if len(cls._propagated) >= cls._propagated_cache_size:
+            cls._propagated.clear()
+        cls._propagated[task.uuid] = (now, task.progress)
+        return True
 
     @classmethod
     def update_verify_networks(cls, uuid, status,
@@ -206,26 +244,26 @@ class TaskHelper(object):
                 db().commit()
                 cls.update_cluster_status(uuid)
             else:
-                subtasks_with_progress = filter(
-                    lambda s: s.progress is not None,
-                    subtasks
-                )
-                if subtasks_with_progress:
-                    task.progress = int(
-                        round(
-                            sum(
-                                [s.weight * s.progress for s
-                                 in subtasks_with_progress]
-                            ) /
-                            sum(
-                                [s.weight for s
-                                 in subtasks_with_progress]
-                            ), 0)
-                    )
-                else:
-                    task.progress = 0
+                cls._update_parent_progress(task)
                 db().commit()
 
+    @classmethod
+    def _update_parent_progress(cls, task):
+        """Sets progress of task to weighted average progress
+        of its subtasks, it's calculated by database.
+        """
+        progress, weight = db().query(
+            func.sum(Task.weight * Task.progress),
+            func.sum(Task.weight)
+        ).filter(
+            Task.parent_id == task.id,
+            None != Task.progress
+        ).one()
+        if weight:
+            task.progress = int(round(float(progress) / weight, 0))
+        else:
+            task.progress = 0
+
     @classmethod
     def update_cluster_status(cls, uuid):
         task = db().query(Task).filter_by(uuid=uuid).first()
@@ -289,38 +327,51 @@ class TaskHelper(object):
             node.progress = 0
             node.error_type = error_type
 
+    @classmethod
+    def _nodes_progress_groups(cls, cluster_id, statuses=None):
+        """Returns (status, online, count, progress sum) tuples
+        for nodes of cluster, all of them are taken by one query.
+        """
+        query = db().query(
+            Node.status,
+            Node.online,
+            func.count(Node.id),
+            func.coalesce(func.sum(Node.progress), 0)
+        ).filter_by(cluster_id=cluster_id)
+        if statuses:
+            query = query.filter(Node.status.in_(statuses))
+        return query.group_by(Node.status, Node.online).all()
+
     @classmethod
     def recalculate_deployment_task_progress(cls, task):
-        cluster_nodes = db().query(Node).filter_by(cluster_id=task.cluster_id)
-        nodes_progress = []
-        nodes_progress.extend(
-            cluster_nodes.filter_by(status='discover').count() * [0])
-        nodes_progress.extend(
-            cluster_nodes.filter_by(online=False).count() * [100])
-
-        # Progress of provisioned node is 0
-        # because deployment not started yet
-        nodes_progress.extend(
-            cluster_nodes.filter_by(status='provisioned').count() * [0])
-
-        nodes_progress.extend([
-            n.progress for n in
-            cluster_nodes.filter(
-                Node.status.in_(['deploying', 'ready']))])
-
-        if nodes_progress:
-            return int(float(sum(nodes_progress)) / len(nodes_progress))
+        count = 0
+        progress = 0
+        for status, online, nodes, nodes_progress in \
+                cls._nodes_progress_groups(task.cluster_id):
+            # Progress of discovered and provisioned nodes is 0
+            # because deployment not started yet
+            if status in ('discover', 'provisioned'):
+                count += nodes
+            elif status in ('deploying', 'ready'):
+                count += nodes
+                progress += nodes_progress
+            # offline nodes are counted once more with progress 100
+            if online is False:
+                count += nodes
+                progress += 100 * nodes
+
+        if count:
+            return int(float(progress) / count)
 
     @classmethod
     def recalculate_provisioning_task_progress(cls, task):
-        cluster_nodes = db().query(Node).filter_by(cluster_id=task.cluster_id)
-        nodes_progress = [
-            n.progress for n in
-            cluster_nodes.filter(
-                Node.status.in_(['provisioning', 'provisioned']))]
+        groups = cls._nodes_progress_groups(
+            task.cluster_id, ['provisioning', 'provisioned'])
+        count = sum(nodes for _, _, nodes, _ in groups)
+        progress = sum(nodes_progress for _, _, _, nodes_progress in groups)
 
-        if nodes_progress:
-            return int(float(sum(nodes_progress)) / len(nodes_progress))
+        if count:
+            return int(float(progress) / count)
 
     @classmethod
     def nodes_to_delete(cls, cluster):
@@ -430,9 +481,8 @@ class TaskHelper(object):
         update fqdns, assign admin ips
         """
         cls.update_slave_nodes_fqdn(nodes)
-        for node in nodes:
-            NetworkManager.assign_admin_ips(
-                node.id, len(node.meta.get('interfaces', [])))
+        NetworkManager.assign_admin_ips_bulk(
+            cls._admin_ips_num(nodes))
 
     @classmethod
     def prepare_for_deployment(cls, nodes):
@@ -441,16 +491,21 @@ class TaskHelper(object):
         """
         cls.update_slave_nodes_fqdn(nodes)
 
-        nodes_ids = [n.id for n in nodes]
         netmanager = NetworkManager
-        if nodes_ids:
-            netmanager.assign_ips(nodes_ids, 'management')
-            netmanager.assign_ips(nodes_ids, 'public')
-            netmanager.assign_ips(nodes_ids, 'storage')
-
-            for node in nodes:
-                netmanager.assign_admin_ips(
-                    node.id, len(node.meta.get('interfaces', [])))
+        if nodes:
+            netmanager.assign_ips_bulk(
+                nodes, ['management', 'public', 'storage'])
+            netmanager.assign_admin_ips_bulk(
+                cls._admin_ips_num(nodes))
+
+    @classmethod
+    def _admin_ips_num(cls, nodes):
+        """Every node gets admin IP for each of its interfaces
+        """
+        return [
+            (node.id, len(node.meta.get('interfaces', [])))
+            for node in nodes
+        ]
 
     @classmethod
     def raise_if_node_offline(cls, nodes):
@@ -16,12 +16,16 @@
 
 import traceback
 
+from sqlalchemy import or_
+
 from nailgun.api.serializers.network_configuration \
     import NeutronNetworkConfigurationSerializer
 from nailgun.api.serializers.network_configuration \
     import NovaNetworkConfigurationSerializer
 from nailgun.db import db
+from nailgun.db.sqlalchemy.deletion import delete_where
 from nailgun.db.sqlalchemy.models import Cluster
+from nailgun.db.sqlalchemy.models import Node
 from nailgun.db.sqlalchemy.models import RedHatAccount
 from nailgun.db.sqlalchemy.models import Task
 from nailgun.errors import errors
@@ -515,20 +519,24 @@ class ClusterDeletionManager(TaskManager):
             )
 
         logger.debug("Removing cluster tasks")
-        for task in current_cluster_tasks:
-            if task.status == "running":
-                raise errors.DeletionAlreadyStarted()
-            elif task.status in ("ready", "error"):
-                for subtask in task.subtasks:
-                    db().delete(subtask)
-                db().delete(task)
-                db().commit()
+        if any(t.status == "running" for t in current_cluster_tasks):
+            raise errors.DeletionAlreadyStarted()
+        finished_tasks_ids = [t.id for t in current_cluster_tasks
+                              if t.status in ("ready", "error")]
+        if finished_tasks_ids:
+            delete_where(Task, or_(
+                Task.id.in_(finished_tasks_ids),
+                Task.parent_id.in_(finished_tasks_ids)
+            ))
+            db().commit()
 
         logger.debug("Labeling cluster nodes to delete")
-        for node in self.cluster.nodes:
-            node.pending_deletion = True
-            db().add(node)
-            db().commit()
+        db().query(Node).filter_by(
+            cluster_id=self.cluster.id
+        ).update(
+            {'pending_deletion': True},
+            synchronize_session=False
+        )
 
         self.cluster.status = 'remove'
         db().add(self.cluster)
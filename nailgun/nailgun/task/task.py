@@ -27,6 +27,7 @@ from sqlalchemy.orm import object_mapper
 import nailgun.rpc as rpc
 
 from nailgun.db import db
+from nailgun.db.sqlalchemy.deletion import delete_nodes
 from nailgun.db.sqlalchemy.models import CapacityLog
 from nailgun.db.sqlalchemy.models import Cluster
 from nailgun.db.sqlalchemy.models import Node
@@ -221,8 +222,10 @@ class DeletionTask(object):
         # and be able to delete node from nodes_to_delete safely
         nodes_to_delete_constant = list(nodes_to_delete)
 
+        nodes_db = dict((n.id, n) for n in task.cluster.nodes)
+        offline_nodes_ids = []
         for node in nodes_to_delete_constant:
-            node_db = db().query(Node).get(node['id'])
+            node_db = nodes_db[node['id']]
 
             slave_name = TaskHelper.make_slave_name(node['id'])
             logger.debug("Removing node from database and pending it "
@@ -231,11 +234,14 @@ class DeletionTask(object):
                 logger.info(
                     "Node is offline or not deployed yet,"
                     " can't clean MBR: %s", slave_name)
-                db().delete(node_db)
-                db().commit()
+                offline_nodes_ids.append(node['id'])
 
                 nodes_to_delete.remove(node)
 
+        if offline_nodes_ids:
+            delete_nodes(Node.id.in_(offline_nodes_ids))
+            db().commit()
+
         # only real tasks
         engine_nodes = []
         if not USE_FAKE:
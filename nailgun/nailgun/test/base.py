@@ -54,6 +54,7 @@ from nailgun.db.sqlalchemy.models import RedHatAccount
 from nailgun.db.sqlalchemy.models import Release
 from nailgun.db.sqlalchemy.models import Task
 
+from nailgun.network.cache import AdminNetworkCache
 from nailgun.network.manager import NetworkManager
 from nailgun.wsgi import build_app
 
@@ -672,6 +673,8 @@ class BaseTestCase(TestCase):
 
     def setUp(self):
         flush()
+        # flush() bypasses ORM events, so cache has to be dropped here
+        AdminNetworkCache.invalidate()
         self.env = Environment(app=self.app)
         self.env.upload_fixtures(self.fixtures)
 
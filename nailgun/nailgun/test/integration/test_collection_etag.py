@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.base import reverse
+
+
+class TestCollectionETag(BaseIntegrationTest):
+
+    def get(self, handler, etag=None, **params):
+        headers = dict(self.default_headers)
+        if etag:
+            headers['If-None-Match'] = etag
+        return self.app.get(
+            reverse(handler),
+            params=params,
+            headers=headers,
+            expect_errors=True
+        )
+
+    def test_not_modified(self):
+        self.env.create(
+            cluster_kwargs={"api": False},
+            nodes_kwargs=[{}, {}]
+        )
+        for handler in ('NodeCollectionHandler',
+                        'ClusterCollectionHandler',
+                        'TaskCollectionHandler',
+                        'NotificationCollectionHandler'):
+            resp = self.get(handler)
+            self.assertEquals(200, resp.status)
+            etag = resp.headers['ETag']
+
+            resp = self.get(handler, etag)
+            self.assertEquals(304, resp.status)
+            self.assertEquals('', resp.body)
+            self.assertEquals(etag, resp.headers['ETag'])
+
+    def test_etag_is_changed_by_commit(self):
+        cluster = self.env.create_cluster(api=False)
+        etag = self.get('TaskCollectionHandler').headers['ETag']
+
+        task = Task(name='deploy', cluster_id=cluster.id)
+        self.db.add(task)
+        self.db.commit()
+
+        resp = self.get('TaskCollectionHandler', etag)
+        self.assertEquals(200, resp.status)
+        self.assertNotEquals(etag, resp.headers['ETag'])
+
+        # other tables don't change tag
+        etag = resp.headers['ETag']
+        self.env.create_node(api=False)
+        self.assertEquals(
+            304, self.get('TaskCollectionHandler', etag).status)
+
+    def test_etag_depends_on_parameters(self):
+        cluster = self.env.create_cluster(api=False)
+        etag = self.get('TaskCollectionHandler').headers['ETag']
+        resp = self.get('TaskCollectionHandler', etag,
+                        cluster_id=cluster.id)
+        self.assertEquals(200, resp.status)
+        self.assertNotEquals(etag, resp.headers['ETag'])
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from nailgun.db.sqlalchemy.deletion import delete_cluster
+from nailgun.db.sqlalchemy.deletion import delete_nodes
+from nailgun.db.sqlalchemy.models import Attributes
+from nailgun.db.sqlalchemy.models import Cluster
+from nailgun.db.sqlalchemy.models import IPAddr
+from nailgun.db.sqlalchemy.models import IPAddrRange
+from nailgun.db.sqlalchemy.models import NetworkGroup
+from nailgun.db.sqlalchemy.models import Node
+from nailgun.db.sqlalchemy.models import NodeAttributes
+from nailgun.db.sqlalchemy.models import NodeNICInterface
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.test.base import BaseIntegrationTest
+
+
+class TestDeletion(BaseIntegrationTest):
+
+    def create_env(self):
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {"pending_addition": True},
+                {"pending_addition": True},
+                {"pending_addition": True}
+            ]
+        )
+        cluster = self.env.clusters[0]
+        self.env.network_manager.assign_ips_bulk(
+            self.env.nodes, ['management', 'public'])
+        self.env.network_manager.assign_admin_ips_bulk(
+            [(n.id, 1) for n in self.env.nodes])
+        self.env.network_manager.assign_vip(cluster.id, 'management')
+
+        task = Task(name='deploy', cluster=cluster)
+        self.db.add(task)
+        self.db.commit()
+        task.create_subtask('provision')
+        return cluster.id, [n.id for n in self.env.nodes]
+
+    def count(self, model, *criteria):
+        return self.db.query(model).filter(*criteria).count()
+
+    def test_delete_nodes(self):
+        cluster_id, nodes_ids = self.create_env()
+        other_node = self.env.create_node()
+
+        delete_nodes(Node.id.in_(nodes_ids[:2]))
+        self.db.commit()
+
+        self.assertEquals(
+            [n.id for n in self.db.query(Node).order_by(Node.id)],
+            [nodes_ids[2], other_node.id])
+        self.assertEquals(
+            self.count(NodeNICInterface,
+                       NodeNICInterface.node_id.in_(nodes_ids[:2])), 0)
+        self.assertEquals(
+            self.count(NodeAttributes,
+                       NodeAttributes.node_id.in_(nodes_ids[:2])), 0)
+        self.assertEquals(
+            self.count(IPAddr, IPAddr.node.in_(nodes_ids[:2])), 0)
+        self.assertNotEquals(
+            self.count(IPAddr, IPAddr.node == nodes_ids[2]), 0)
+
+    def test_delete_cluster(self):
+        cluster_id, nodes_ids = self.create_env()
+        ng_ids = [ng.id for ng in self.db.query(NetworkGroup).filter_by(
+            cluster_id=cluster_id)]
+        admin_ng_id = self.env.network_manager.get_admin_network_group_id()
+
+        delete_cluster(cluster_id)
+        self.db.commit()
+
+        self.assertIsNone(self.db.query(Cluster).get(cluster_id))
+        self.assertEquals(self.count(Node, Node.id.in_(nodes_ids)), 0)
+        self.assertEquals(self.count(Task, Task.cluster_id == cluster_id), 0)
+        self.assertEquals(
+            self.count(Attributes, Attributes.cluster_id == cluster_id), 0)
+        self.assertEquals(
+            self.count(NetworkGroup, NetworkGroup.id.in_(ng_ids)), 0)
+        self.assertEquals(
+            self.count(IPAddrRange,
+                       IPAddrRange.network_group_id.in_(ng_ids)), 0)
+        self.assertEquals(self.count(IPAddr), 0)
+        # admin network group is not touched
+        self.assertEquals(
+            self.count(NetworkGroup, NetworkGroup.id == admin_ng_id), 1)
@@ -23,19 +23,25 @@ from mock import patch
 from netaddr import IPAddress
 from netaddr import IPNetwork
 from netaddr import IPRange
+from sqlalchemy import event
 from sqlalchemy import not_
 from sqlalchemy.orm import joinedload
 
 import nailgun
 
+from nailgun.db.sqlalchemy import engine
 from nailgun.db.sqlalchemy.models import IPAddr
 from nailgun.db.sqlalchemy.models import IPAddrRange
 from nailgun.db.sqlalchemy.models import NetworkGroup
 from nailgun.db.sqlalchemy.models import Node
 from nailgun.db.sqlalchemy.models import NodeNICInterface
+from nailgun.errors import errors
+from nailgun.network.cache import AdminNetworkCache
+from nailgun.network.interfaces import NodeInterfacesIndex
 from nailgun.network.manager import NetworkManager
 from nailgun.network.neutron import NeutronManager
 from nailgun.network.nova_network import NovaNetworkManager
+from nailgun.network.resolver import NetworkDataResolver
 from nailgun.test.base import BaseIntegrationTest
 from nailgun.test.base import fake_tasks
 from nailgun.test.base import reverse
@@ -134,6 +140,48 @@ class TestNetworkManager(BaseIntegrationTest):
             1
         )
 
+    def test_assign_ips_bulk(self):
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {"pending_addition": True, "api": True},
+                {"pending_addition": True, "api": True}
+            ]
+        )
+        nets = ['management', 'public', 'storage']
+
+        self.env.network_manager.assign_ips_bulk(self.env.nodes, nets)
+        ips = self.db.query(IPAddr).filter(
+            IPAddr.node.in_([n.id for n in self.env.nodes])
+        ).all()
+        self.assertEquals(len(ips), len(self.env.nodes) * len(nets))
+        self.assertEquals(
+            len(ips), len(set(ip.ip_addr for ip in ips)))
+
+        self.env.network_manager.assign_ips_bulk(self.env.nodes, nets)
+        ips_again = self.db.query(IPAddr).filter(
+            IPAddr.node.in_([n.id for n in self.env.nodes])
+        ).all()
+        self.assertEquals(
+            sorted(ip.ip_addr for ip in ips),
+            sorted(ip.ip_addr for ip in ips_again))
+
+    def test_assign_admin_ips_bulk(self):
+        n1 = self.env.create_node()
+        n2 = self.env.create_node()
+        admin_ng_id = self.env.network_manager.get_admin_network_group_id()
+
+        self.env.network_manager.assign_admin_ips_bulk(
+            [(n1.id, 2), (n2.id, 1)])
+        self.env.network_manager.assign_admin_ips_bulk(
+            [(n1.id, 2), (n2.id, 3)])
+
+        for node_id, count in ((n1.id, 2), (n2.id, 3)):
+            self.assertEquals(
+                self.db.query(IPAddr).filter_by(
+                    network=admin_ng_id, node=node_id).count(),
+                count)
+
     def test_assign_vip_is_idempotent(self):
         cluster = self.env.create_cluster(api=True)
         vip = self.env.network_manager.assign_vip(
@@ -247,6 +295,135 @@ class TestNetworkManager(BaseIntegrationTest):
         self.assertEqual(result, expected)
         self.assertEqual(result['value2'], [])
 
+    def test_network_data_resolver(self):
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {"pending_addition": True, "api": True},
+                {"pending_addition": True, "api": True},
+                {"pending_addition": True, "api": True}
+            ]
+        )
+        self.env.network_manager.assign_ips_bulk(
+            self.env.nodes, ['management', 'public', 'storage'])
+        expected = dict(
+            (node.id, self.env.network_manager.get_node_networks(node.id))
+            for node in self.env.nodes)
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        AdminNetworkCache.get()
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            networks = NetworkDataResolver(self.env.nodes).get_all()
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+
+        self.assertEquals(networks, expected)
+        # network groups, ips, interfaces and assignments
+        self.assertEquals(len(statements), 4)
+
+        node = self.env.nodes[0]
+        resolver = NetworkDataResolver.for_cluster(node.cluster)
+        self.assertEquals(
+            resolver.get_by_netname(node, 'management'),
+            self.env.network_manager.get_node_network_by_netname(
+                node.id, 'management'))
+        self.assertEquals(
+            resolver.get_admin_interface_name(node),
+            node.admin_interface.name)
+        self.assertRaises(
+            errors.CanNotFindNetworkForNode,
+            resolver.get_by_netname, node, 'unknown')
+
+    def test_node_interfaces_index(self):
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[{"pending_addition": True, "api": True}]
+        )
+        node = self.env.nodes[0]
+        management = self.env.network_manager._get_interface_by_network_name(
+            node, 'management')
+        index = NodeInterfacesIndex.get(node)
+        self.assertIs(index, NodeInterfacesIndex.get(node))
+        self.assertEquals(index.by_network_name['management'], management)
+        self.assertEquals(
+            self.env.network_manager.get_node_interface_by_netname(
+                node.id, 'management'),
+            management)
+
+        # index is dropped when assignments of node are changed
+        other = [i for i in node.interfaces if i.id != management.id][0]
+        network = [n for n in management.assigned_networks_list
+                   if n.name == 'management'][0]
+        management.assigned_networks_list.remove(network)
+        other.assigned_networks_list.append(network)
+        self.assertIsNot(index, NodeInterfacesIndex.get(node))
+        self.assertEquals(
+            self.env.network_manager._get_interface_by_network_name(
+                node.id, 'management'),
+            other)
+
+        # and when transaction is over
+        index = NodeInterfacesIndex.get(node)
+        self.db.commit()
+        self.assertIsNot(index, NodeInterfacesIndex.get(node))
+
+        self.assertRaises(
+            errors.CanNotFindInterface,
+            self.env.network_manager._get_interface_by_network_name,
+            node, 'unknown')
+
+    def test_update_interfaces_info(self):
+        meta = self.env.default_metadata()
+        interfaces = self.env.set_interfaces_in_meta(meta, [
+            {'name': 'eth0', 'mac': '00:00:00:00:00:01',
+             'current_speed': 100, 'max_speed': 1000},
+            {'name': 'eth1', 'mac': '00:00:00:00:00:02',
+             'current_speed': 100, 'max_speed': 1000}])
+        node = self.env.create_node(
+            api=True, meta=meta, mac='00:00:00:00:00:01')
+        node_db = self.db.query(Node).get(node['id'])
+        self.assertEquals(len(node_db.interfaces), 2)
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            if 'node_nic_interfaces' in statement and \
+                    not statement.startswith('SELECT'):
+                statements.append(statement.split()[0])
+
+        def update(interfaces):
+            meta['interfaces'] = interfaces
+            node_db.meta = deepcopy(meta)
+            self.db.commit()
+            del statements[:]
+            event.listen(engine, 'before_cursor_execute', count)
+            try:
+                self.env.network_manager.update_interfaces_info(node_db)
+            finally:
+                event.remove(engine, 'before_cursor_execute', count)
+
+        # unchanged interfaces are not written, mac case doesn't matter
+        interfaces[1]['mac'] = '00:00:00:00:00:02'.upper()
+        update(interfaces)
+        self.assertEquals(statements, [])
+
+        interfaces[1]['max_speed'] = 100
+        interfaces.append({'name': 'eth2', 'mac': '00:00:00:00:00:03'})
+        update(interfaces)
+        self.assertEquals(sorted(statements), ['INSERT', 'UPDATE'])
+
+        update(interfaces[:1])
+        self.assertEquals(statements, ['DELETE'])
+        self.assertEquals(
+            [i.mac for i in self.db.query(NodeNICInterface).filter_by(
+                node_id=node_db.id)],
+            ['00:00:00:00:00:01'])
+
     def test_nets_empty_list_if_node_does_not_belong_to_cluster(self):
         node = self.env.create_node(api=False)
         network_data = self.env.network_manager.get_node_networks(node.id)
@@ -335,6 +512,27 @@ class TestNetworkManager(BaseIntegrationTest):
         self.assertEquals(len(admin_ips), 1)
         self.assertEquals(admin_ips[0].ip_addr, '10.0.0.1')
 
+    def test_admin_network_cache(self):
+        AdminNetworkCache.invalidate()
+        AdminNetworkCache.reset_stats()
+        admin_ng_id = self.env.network_manager.get_admin_network_group_id()
+        self.assertEquals(
+            admin_ng_id,
+            self.env.network_manager.get_admin_network_group().id)
+        self.assertEquals(
+            AdminNetworkCache.stats(), {'hits': 1, 'misses': 1})
+
+        admin_range = self.db.query(IPAddrRange).filter_by(
+            network_group_id=admin_ng_id).first()
+        admin_range.last = admin_range.first
+        self.db.commit()
+
+        admin_net = self.env.network_manager.get_admin_network_data()
+        self.assertEquals(
+            admin_net.ranges, [(admin_range.first, admin_range.first)])
+        self.assertEquals(
+            AdminNetworkCache.stats(), {'hits': 1, 'misses': 2})
+
     @fake_tasks(fake_rpc=False, mock_rpc=False)
     @patch('nailgun.rpc.cast')
     def test_admin_ip_cobbler(self, mocked_rpc):
@@ -16,6 +16,7 @@
 
 import json
 
+from nailgun.api.handlers.base import iter_batches
 from nailgun.db.sqlalchemy.models import Node
 from nailgun.db.sqlalchemy.models import Notification
 from nailgun.test.base import BaseIntegrationTest
@@ -69,6 +70,114 @@ class TestHandlers(BaseIntegrationTest):
             response[0]['id']
         )
 
+    def test_node_get_with_filters(self):
+        self.env.create(
+            cluster_kwargs={"api": False},
+            nodes_kwargs=[
+                {"status": "ready", "roles": ["controller"]},
+                {"status": "ready", "roles": ["compute"],
+                 "online": False},
+                {"status": "error", "roles": ["compute", "cinder"],
+                 "pending_deletion": True},
+                {"status": "discover", "pending_addition": True},
+            ]
+        )
+        nodes_ids = [n.id for n in self.env.nodes]
+
+        def get_ids(**params):
+            resp = self.app.get(
+                reverse('NodeCollectionHandler'),
+                params=params,
+                headers=self.default_headers
+            )
+            self.assertEquals(200, resp.status)
+            return [n['id'] for n in json.loads(resp.body)]
+
+        self.assertEquals(get_ids(status='ready'), nodes_ids[:2])
+        self.assertEquals(get_ids(status='error,discover'), nodes_ids[2:])
+        self.assertEquals(get_ids(online='false'), [nodes_ids[1]])
+        self.assertEquals(get_ids(roles='compute'), nodes_ids[1:3])
+        self.assertEquals(get_ids(roles='cinder,controller'),
+                          [nodes_ids[0], nodes_ids[2]])
+        self.assertEquals(get_ids(pending_deletion='true'), [nodes_ids[2]])
+        self.assertEquals(get_ids(pending_addition='1', status='ready'), [])
+
+    def test_node_get_pages(self):
+        self.env.create(
+            cluster_kwargs={"api": False},
+            nodes_kwargs=[{} for _ in xrange(5)]
+        )
+        nodes_ids = sorted(n.id for n in self.env.nodes)
+
+        pages = []
+        params = {'limit': 2}
+        while True:
+            resp = self.app.get(
+                reverse('NodeCollectionHandler'),
+                params=params,
+                headers=self.default_headers
+            )
+            page = [n['id'] for n in json.loads(resp.body)]
+            if not page:
+                break
+            pages.append(page)
+            params['after'] = page[-1]
+        self.assertEquals(pages, [nodes_ids[:2], nodes_ids[2:4],
+                                  nodes_ids[4:]])
+
+    def test_node_batches(self):
+        self.env.create(
+            cluster_kwargs={"api": False},
+            nodes_kwargs=[{} for _ in xrange(5)]
+        )
+        nodes_ids = sorted(n.id for n in self.env.nodes)
+        query = self.db.query(Node)
+
+        batches = list(iter_batches(query, Node.id, batch_size=2))
+        self.assertEquals([[n.id for n in b] for b in batches],
+                          [nodes_ids[:2], nodes_ids[2:4], nodes_ids[4:]])
+        batches = list(iter_batches(query, Node.id, limit=3, batch_size=2))
+        self.assertEquals([[n.id for n in b] for b in batches],
+                          [nodes_ids[:2], nodes_ids[2:3]])
+
+    def test_node_get_fields(self):
+        self.env.create(
+            cluster_kwargs={"api": False},
+            nodes_kwargs=[{"roles": ["controller"]}]
+        )
+        resp = self.app.get(
+            reverse('NodeCollectionHandler'),
+            params={'fields': 'status,roles'},
+            headers=self.default_headers
+        )
+        self.assertEquals(200, resp.status)
+        self.assertEquals(json.loads(resp.body), [{
+            'id': self.env.nodes[0].id,
+            'status': 'discover',
+            'roles': ['controller']}])
+
+        resp = self.app.get(
+            reverse('NodeCollectionHandler'),
+            params={'fields': 'network_data'},
+            headers=self.default_headers
+        )
+        self.assertEquals(
+            sorted(json.loads(resp.body)[0]), ['id', 'network_data'])
+
+    def test_node_get_invalid_params(self):
+        for params in ({'fields': 'id,secret'},
+                       {'online': 'maybe'},
+                       {'status': 'ready,foo'},
+                       {'limit': 'ten'},
+                       {'after': '-1'}):
+            resp = self.app.get(
+                reverse('NodeCollectionHandler'),
+                params=params,
+                headers=self.default_headers,
+                expect_errors=True
+            )
+            self.assertEquals(400, resp.status)
+
     def test_node_get_with_cluster_None(self):
         self.env.create(
             cluster_kwargs={"api": False},
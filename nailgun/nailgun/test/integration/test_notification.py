@@ -163,3 +163,38 @@ class TestNotification(BaseIntegrationTest):
             notifications[0].message,
             "Cluster deletion fake error"
         )
+
+    def test_buffered_notifications(self):
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[{'api': False}, {'api': False}]
+        )
+        cluster = self.env.clusters[0]
+        node1, node2 = self.env.nodes
+        task = Task(name="deployment", cluster_id=cluster.id)
+        self.db.add(task)
+        self.db.commit()
+        notifier.notify("error", "node failed", cluster.id,
+                        node1.id, task.uuid)
+
+        with notifier.buffered():
+            for node in (node1, node2, node2):
+                notifier.notify("error", "node failed", cluster.id,
+                                node.id, task.uuid)
+            notifier.notify("done", "cluster is done", cluster.id)
+            # nothing is written before commit
+            self.assertEqual(self.db.query(Notification).count(), 1)
+            self.db.commit()
+            self.assertEqual(self.db.query(Notification).count(), 3)
+            # left after the last commit is written at exit
+            notifier.notify("done", "one more", cluster.id)
+        self.db.rollback()
+
+        notifications = self.db.query(Notification).order_by(
+            Notification.id).all()
+        self.assertEqual(
+            [(n.node_id, n.task_id, n.message) for n in notifications],
+            [(node1.id, task.id, "node failed"),
+             (node2.id, task.id, "node failed"),
+             (None, None, "cluster is done"),
+             (None, None, "one more")])
@@ -774,6 +774,49 @@ class TestConsumer(BaseIntegrationTest):
         self.db.refresh(self.env.nodes[0])
         self.assertEqual(self.env.nodes[0].progress, 100)
 
+    def test_offline_nodes_notifications(self):
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {"api": False, "status": "deploying"},
+                {"api": False, "status": "deploying"},
+                {"api": False, "status": "deploying"}
+            ]
+        )
+        task = Task(
+            name='deployment',
+            cluster_id=self.env.clusters[0].id,
+            status='running'
+        )
+        self.db.add(task)
+        self.db.commit()
+        kwargs = {
+            'task_uuid': task.uuid,
+            'nodes': [
+                {'uid': n.id, 'status': 'deploying', 'online': False}
+                for n in self.env.nodes[:2]
+            ] + [
+                {'uid': self.env.nodes[2].id, 'progress': 50}
+            ]
+        }
+        self.receiver.deploy_resp(**kwargs)
+        # the same failures are not notified twice
+        self.receiver.deploy_resp(**kwargs)
+
+        notifications = self.db.query(Notification).filter_by(
+            task_id=task.id).all()
+        self.assertEqual(
+            sorted(n.node_id for n in notifications),
+            sorted(n.id for n in self.env.nodes[:2]))
+        for notification in notifications:
+            self.assertEqual(notification.topic, 'error')
+            self.assertIn(u"Node is offline", notification.message)
+        for node in self.env.nodes[:2]:
+            self.db.refresh(node)
+            self.assertEqual((node.progress, node.online), (100, False))
+        self.db.refresh(self.env.nodes[2])
+        self.assertEqual(self.env.nodes[2].progress, 50)
+
     def test_remove_nodes_resp(self):
         self.env.create(
             cluster_kwargs={},
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from contextlib import contextmanager
+import time
+
+from sqlalchemy import event
+
+from nailgun.db import engine
+
+
+class BenchmarkMixin(object):
+    """Helpers for benchmarks. Benchmarks are not run by run_tests.sh,
+    to run them use:
+
+        nosetests -s nailgun/test/performance
+    """
+
+    repeat = 3
+
+    def measure(self, func, *args, **kwargs):
+        """Returns best wall-clock time of self.repeat calls of func."""
+        best = None
+        for _ in xrange(self.repeat):
+            started = time.time()
+            func(*args, **kwargs)
+            elapsed = time.time() - started
+            if best is None or elapsed < best:
+                best = elapsed
+        return best
+
+    @contextmanager
+    def count_statements(self):
+        """Collects SQL statements executed inside the block
+        into yielded list.
+        """
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+
+    def report(self, title, results):
+        """Prints benchmark results.
+
+        :param title: Benchmark name.
+        :param results: List of (name, value) pairs, float values
+        are printed as seconds.
+        """
+        print(u"\n{0}:".format(title))
+        for name, value in results:
+            if isinstance(value, float):
+                value = u"{0:.4f}s".format(value)
+            print(u"  {0:<40} {1:>11}".format(name, value))
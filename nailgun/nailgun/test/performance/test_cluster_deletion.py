@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from nailgun.db.sqlalchemy.models import Cluster
+from nailgun.db.sqlalchemy.models import IPAddr
+from nailgun.db.sqlalchemy.models import Node
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.rpc.receiver import NailgunReceiver
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+class TestClusterDeletionBenchmark(BenchmarkMixin, BaseIntegrationTest):
+
+    nodes_count = 500
+
+    def test_remove_cluster_resp(self):
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {'pending_deletion': True, 'status': 'ready'}
+                for _ in xrange(self.nodes_count)
+            ]
+        )
+        cluster = self.env.clusters[0]
+        cluster_id = cluster.id
+        nodes = self.env.nodes
+        self.env.network_manager.assign_ips_bulk(
+            nodes, ['management', 'public', 'storage'])
+        self.env.network_manager.assign_admin_ips_bulk(
+            [(n.id, 1) for n in nodes])
+        task = Task(name='cluster_deletion', cluster=cluster)
+        self.db.add(task)
+        self.db.commit()
+        kwargs = {
+            'task_uuid': task.uuid,
+            'status': 'ready',
+            'progress': 100,
+            'nodes': [{'uid': n.id} for n in nodes]
+        }
+        ips_count = self.db.query(IPAddr).count()
+
+        with self.count_statements() as statements:
+            started = time.time()
+            NailgunReceiver.remove_cluster_resp(**kwargs)
+            elapsed = time.time() - started
+
+        self.report(
+            "Removal of {0} nodes cluster".format(self.nodes_count),
+            [("IP addresses", ips_count),
+             ("SQL statements", len(statements)),
+             ("DELETE statements",
+              len([s for s in statements if s.startswith('DELETE')])),
+             ("wall time", elapsed)])
+
+        self.assertIsNone(self.db.query(Cluster).get(cluster_id))
+        self.assertEquals(self.db.query(Node).count(), 0)
+        self.assertEquals(self.db.query(IPAddr).count(), 0)
+        # number of statements doesn't depend on number of nodes
+        self.assertLess(len(statements), 100)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.base import reverse
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+class TestCollectionETagBenchmark(BenchmarkMixin, BaseIntegrationTest):
+
+    nodes_count = 200
+    polls = 20
+
+    def setUp(self):
+        super(TestCollectionETagBenchmark, self).setUp()
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[{} for _ in xrange(self.nodes_count)]
+        )
+
+    def poll(self, handler, etag=None):
+        """Gets collection self.polls times, returns
+        requests per second.
+        """
+        headers = dict(self.default_headers)
+        if etag:
+            headers['If-None-Match'] = etag
+        started = time.time()
+        for _ in xrange(self.polls):
+            resp = self.app.get(reverse(handler), headers=headers,
+                                expect_errors=True)
+            self.assertEquals(resp.status, 304 if etag else 200)
+        return self.polls / (time.time() - started)
+
+    def test_unchanged_polls(self):
+        results = []
+        for handler in ('NodeCollectionHandler',
+                        'ClusterCollectionHandler',
+                        'TaskCollectionHandler',
+                        'NotificationCollectionHandler'):
+            etag = self.app.get(
+                reverse(handler),
+                headers=self.default_headers
+            ).headers['ETag']
+            results.append((
+                handler,
+                "{0:.1f} req/s".format(self.poll(handler))))
+            results.append((
+                "  with If-None-Match",
+                "{0:.1f} req/s".format(self.poll(handler, etag))))
+        self.report(
+            "Unchanged collection polls, {0} nodes".format(
+                self.nodes_count),
+            results)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.rpc.receiver import NailgunReceiver
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+class TestDeployRespBenchmark(BenchmarkMixin, BaseIntegrationTest):
+
+    nodes_count = 200
+    messages = 20
+    # number of nodes in one message
+    sizes = (1, 10, 50, 200)
+
+    def setUp(self):
+        super(TestDeployRespBenchmark, self).setUp()
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {'status': 'deploying', 'pending_addition': True}
+                for _ in xrange(self.nodes_count)
+            ]
+        )
+        self.task = Task(
+            name='deployment',
+            cluster=self.env.clusters[0],
+            status='running'
+        )
+        self.db.add(self.task)
+        self.db.commit()
+        self.nodes_ids = [n.id for n in self.env.nodes]
+
+    def replay(self, size, offline=False):
+        """Sends self.messages deploy_resp messages with
+        progress of size nodes each, returns messages per second.
+        """
+        started = time.time()
+        for i in xrange(self.messages):
+            nodes = []
+            for node_id in self.nodes_ids[:size]:
+                node = {
+                    'uid': node_id,
+                    'status': 'deploying',
+                    'progress': i * 100 / self.messages
+                }
+                if offline:
+                    node['online'] = False
+                nodes.append(node)
+            NailgunReceiver.deploy_resp(
+                task_uuid=self.task.uuid,
+                status='running',
+                nodes=nodes
+            )
+        return self.messages / (time.time() - started)
+
+    def test_deploy_resp_throughput(self):
+        results = []
+        for size in self.sizes:
+            with self.count_statements() as statements:
+                rate = self.replay(size)
+            results.append((
+                "{0} nodes per message".format(size),
+                "{0:.1f} msg/s".format(rate)))
+            results.append((
+                "  SQL statements per message",
+                len(statements) / self.messages))
+        with self.count_statements() as statements:
+            rate = self.replay(self.nodes_count, offline=True)
+        results.append((
+            "{0} offline nodes per message".format(self.nodes_count),
+            "{0:.1f} msg/s".format(rate)))
+        results.append((
+            "  SQL statements per message",
+            len(statements) / self.messages))
+
+        self.report(
+            "deploy_resp throughput, {0} messages".format(self.messages),
+            results)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from datetime import datetime
+import multiprocessing
+import time
+
+from sqlalchemy import func
+
+from nailgun.db import db
+from nailgun.db import engine
+from nailgun.db.sqlalchemy.models import IPAddr
+from nailgun.db.sqlalchemy.models import IPAddrRange
+from nailgun.db.sqlalchemy.models import NetworkGroup
+from nailgun.db.sqlalchemy.models import Node
+from nailgun.network.manager import NetworkManager
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+def allocate_ips(nodes_ids, batch_size, failures):
+    """Assigns management IP addresses to nodes in small batches,
+    so allocations of different processes are interleaved.
+    """
+    try:
+        for i in xrange(0, len(nodes_ids), batch_size):
+            nodes = db().query(Node).filter(
+                Node.id.in_(nodes_ids[i:i + batch_size])
+            ).order_by(Node.id).all()
+            NetworkManager.assign_ips_bulk(nodes, ['management'])
+    except Exception as exc:
+        failures.put(repr(exc))
+    finally:
+        db().close()
+
+
+class TestIPAllocationConcurrency(BenchmarkMixin, BaseIntegrationTest):
+    """Allocates IP addresses from several processes at once,
+    PostgreSQL is required.
+    """
+
+    processes = 8
+    nodes_count = 2000
+    batch_size = 10
+
+    def setUp(self):
+        super(TestIPAllocationConcurrency, self).setUp()
+        cluster_id = self.env.create_cluster(api=True)['id']
+        management = self.db.query(NetworkGroup).filter_by(
+            cluster_id=cluster_id, name='management').first()
+        # room for all nodes in one network
+        management.cidr = '192.168.0.0/20'
+        management.netmask = '255.255.240.0'
+        self.db.query(IPAddrRange).filter_by(
+            network_group_id=management.id).delete()
+        self.db.add(IPAddrRange(
+            network_group_id=management.id,
+            first='192.168.0.2',
+            last='192.168.15.254'))
+        self.db.add_all(
+            Node(
+                cluster_id=cluster_id,
+                mac='00:00:{0:02x}:{1:02x}:00:00'.format(i >> 8, i & 0xff),
+                timestamp=datetime.now()
+            ) for i in xrange(self.nodes_count)
+        )
+        self.db.commit()
+        self.management_id = management.id
+        self.nodes_ids = [
+            node_id for (node_id,) in self.db.query(Node.id).filter_by(
+                cluster_id=cluster_id).order_by(Node.id)]
+
+    def run_processes(self):
+        # connections can't be shared by processes,
+        # so they are closed before fork
+        self.db.close()
+        engine.dispose()
+
+        failures = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(
+                target=allocate_ips,
+                args=(self.nodes_ids[i::self.processes],
+                      self.batch_size, failures))
+            for i in xrange(self.processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        errors = []
+        while not failures.empty():
+            errors.append(failures.get())
+        self.assertEquals(errors, [])
+        self.assertEquals([w.exitcode for w in workers],
+                          [0] * self.processes)
+
+    def test_no_duplicate_ips(self):
+        started = time.time()
+        self.run_processes()
+        elapsed = time.time() - started
+
+        ips = self.db.query(IPAddr.node, IPAddr.ip_addr).filter_by(
+            network=self.management_id).all()
+        self.report(
+            "{0} IP addresses from {1} processes".format(
+                self.nodes_count, self.processes),
+            [("allocated addresses", len(ips)),
+             ("wall time", elapsed)])
+
+        self.assertEquals(len(ips), self.nodes_count)
+        self.assertEquals(len(set(ip for _, ip in ips)), self.nodes_count)
+        self.assertEquals(
+            sorted(node_id for node_id, _ in ips), self.nodes_ids)
+
+        # allocation is idempotent when nodes already have addresses
+        self.run_processes()
+        self.assertEquals(
+            self.db.query(func.count(IPAddr.id)).filter_by(
+                network=self.management_id).scalar(),
+            self.nodes_count)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from netaddr import IPAddress
+from netaddr import IPNetwork
+from netaddr import IPRange
+
+from nailgun.network.ranges import IPRangeIndex
+from nailgun.test.base import BaseTestCase
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+class TestIPRangeIndexBenchmark(BenchmarkMixin, BaseTestCase):
+
+    checks = 10000
+
+    def setUp(self):
+        self.ranges = [
+            ('10.20.%d.1' % i, '10.20.%d.200' % i) for i in xrange(8)]
+        network = IPNetwork('10.20.0.0/16')
+        self.ips = [
+            str(IPAddress(network.first + i * 7 % network.size))
+            for i in xrange(self.checks)]
+
+    def netaddr_check(self):
+        # the same as NetworkManager.check_ip_belongs_to_net did
+        result = []
+        for ip in self.ips:
+            addr = IPAddress(ip)
+            result.append(
+                any(addr in IPRange(f, l) for f, l in self.ranges))
+        return result
+
+    def index_check(self):
+        index = IPRangeIndex(self.ranges)
+        return [ip in index for ip in self.ips]
+
+    def test_ip_in_ranges(self):
+        self.assertEquals(self.netaddr_check(), self.index_check())
+
+        netaddr_time = self.measure(self.netaddr_check)
+        index_time = self.measure(self.index_check)
+        self.report(
+            "{0} IP-in-range checks".format(self.checks),
+            [("netaddr IPRange", netaddr_time),
+             ("IPRangeIndex", index_time)])
+        self.assertLess(index_time, netaddr_time)
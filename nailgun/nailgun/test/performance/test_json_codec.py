@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+from nailgun.db.sqlalchemy.models import Cluster
+from nailgun.orchestrator.deployment_serializers import serialize
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.performance.base import BenchmarkMixin
+from nailgun.utils import json_codec
+
+
+class TestJSONCodecBenchmark(BenchmarkMixin, BaseIntegrationTest):
+
+    nodes_count = 50
+    # encodings and decodings of every document per measurement
+    rounds = 100
+
+    def setUp(self):
+        super(TestJSONCodecBenchmark, self).setUp()
+        cluster = self.env.create(
+            cluster_kwargs={'mode': 'ha_compact'},
+            nodes_kwargs=[
+                {'roles': ['controller'], 'pending_addition': True}
+                for _ in xrange(3)
+            ] + [
+                {'roles': ['compute'], 'pending_addition': True}
+                for _ in xrange(self.nodes_count - 3)
+            ]
+        )
+        cluster_db = self.db.query(Cluster).get(cluster['id'])
+        self.documents = (
+            ('node meta', self.env.nodes[0].meta),
+            ('deployment facts, {0} nodes'.format(self.nodes_count),
+             serialize(cluster_db, cluster_db.nodes)))
+
+    def encode(self, data):
+        for _ in xrange(self.rounds):
+            json_codec.dumps(data)
+
+    def decode(self, data):
+        for _ in xrange(self.rounds):
+            json_codec.loads(data)
+
+    def test_codec(self):
+        backends = [json]
+        try:
+            import simplejson
+            backends.append(simplejson)
+        except ImportError:
+            pass
+        encoder, decoder = json_codec.backends()
+        results = []
+        for title, data in self.documents:
+            encoded = json.dumps(data)
+            results.append((title, "{0} KiB".format(len(encoded) / 1024)))
+            for backend in backends:
+                previous = json_codec.use(backend)
+                try:
+                    results.append((
+                        "  {0} encode{1}".format(
+                            backend.__name__,
+                            " (used)" if backend is encoder else ""),
+                        "{0:.3f} ms".format(
+                            self.measure(self.encode, data) * 1000 /
+                            self.rounds)))
+                    results.append((
+                        "  {0} decode{1}".format(
+                            backend.__name__,
+                            " (used)" if backend is decoder else ""),
+                        "{0:.3f} ms".format(
+                            self.measure(self.decode, encoded) * 1000 /
+                            self.rounds)))
+                finally:
+                    json_codec.use(*previous)
+        self.report("JSON codec", results)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from netaddr import IPNetwork
+from netaddr import IPSet
+
+from nailgun.network.pool import CIDRPool
+from nailgun.network.pool import VLANPool
+from nailgun.test.base import BaseTestCase
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+class TestNetworkPoolBenchmark(BenchmarkMixin, BaseTestCase):
+
+    networks = 50
+    pool = ['10.0.0.0/8']
+    exclude = '10.20.0.0/24'
+    vlan_range = (100, 1000)
+
+    def setUp(self):
+        pass
+
+    def ipset_allocate(self):
+        # the same as NeutronManager.create_network_groups did
+        used_nets = []
+        used_vlans = []
+        for _ in xrange(self.networks):
+            free_vlans = sorted(
+                set(range(*self.vlan_range)) - set(used_vlans))
+            used_vlans.append(free_vlans[0])
+
+            free_set = IPSet(self.pool) - \
+                IPSet(IPNetwork(self.exclude)) - IPSet(used_nets)
+            new_net = None
+            for fcidr in sorted(list(free_set._cidrs)):
+                for n in fcidr.subnet(24, count=1):
+                    new_net = n
+                    break
+                if new_net:
+                    break
+            used_nets.append(str(new_net))
+        return used_nets, used_vlans
+
+    def pool_allocate(self):
+        vlans = VLANPool(*self.vlan_range)
+        cidrs = CIDRPool(self.pool)
+        cidrs.reserve_cidr(self.exclude)
+        used_nets = []
+        used_vlans = []
+        for _ in xrange(self.networks):
+            used_vlans.append(vlans.allocate())
+            used_nets.append(str(cidrs.allocate(24)))
+        return used_nets, used_vlans
+
+    def test_allocate_networks(self):
+        self.assertEquals(self.ipset_allocate(), self.pool_allocate())
+
+        ipset_time = self.measure(self.ipset_allocate)
+        pool_time = self.measure(self.pool_allocate)
+        self.report(
+            "{0} /24 networks with VLAN IDs".format(self.networks),
+            [("IPSet and set of VLAN IDs", ipset_time),
+             ("CIDRPool and VLANPool", pool_time)])
+        self.assertLess(pool_time, ipset_time)
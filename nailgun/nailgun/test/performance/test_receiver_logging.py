@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import os
+import time
+
+from mock import patch
+
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.logger import formatter
+from nailgun.logger import logger
+from nailgun.rpc.receiver import NailgunReceiver
+from nailgun.settings import settings
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+class TestReceiverLoggingBenchmark(BenchmarkMixin, BaseIntegrationTest):
+
+    nodes_count = 200
+    messages = 20
+
+    def setUp(self):
+        super(TestReceiverLoggingBenchmark, self).setUp()
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {'status': 'deploying', 'pending_addition': True}
+                for _ in xrange(self.nodes_count)
+            ]
+        )
+        self.task = Task(
+            name='deployment',
+            cluster=self.env.clusters[0],
+            status='running'
+        )
+        self.db.add(self.task)
+        self.db.commit()
+        self.nodes_ids = [n.id for n in self.env.nodes]
+
+        # records are formatted and written like in production
+        self.devnull = open(os.devnull, 'w')
+        self.handler = logging.StreamHandler(self.devnull)
+        self.handler.setFormatter(formatter)
+        self.handlers = logger.handlers
+        logger.handlers = [self.handler]
+        self.level = logger.level
+
+    def tearDown(self):
+        logger.handlers = self.handlers
+        logger.setLevel(self.level)
+        self.devnull.close()
+        super(TestReceiverLoggingBenchmark, self).tearDown()
+
+    def replay(self):
+        """Sends progress of all nodes self.messages times,
+        returns messages per second.
+        """
+        started = time.time()
+        for i in xrange(self.messages):
+            NailgunReceiver.deploy_resp(
+                task_uuid=self.task.uuid,
+                status='running',
+                nodes=[{'uid': node_id,
+                        'status': 'deploying',
+                        'progress': i * 100 / self.messages}
+                       for node_id in self.nodes_ids]
+            )
+        return self.messages / (time.time() - started)
+
+    def test_receiver_logging(self):
+        modes = (
+            ("INFO, full payload", logging.INFO,
+             {'max_size': 0, 'progress_sample_rate': 1}),
+            ("INFO, payload cut to 4096", logging.INFO,
+             {'max_size': 4096, 'progress_sample_rate': 1}),
+            ("INFO, every 10th progress logged", logging.INFO,
+             {'max_size': 4096, 'progress_sample_rate': 10}),
+            ("DEBUG, payload cut to 4096", logging.DEBUG,
+             {'max_size': 4096, 'progress_sample_rate': 1}),
+        )
+        results = []
+        for name, level, logging_settings in modes:
+            logger.setLevel(level)
+            with patch.dict(settings.PAYLOAD_LOGGING, logging_settings):
+                results.append(
+                    (name, "{0:.1f} msg/s".format(self.replay())))
+        self.report(
+            "deploy_resp throughput by logging mode, {0} nodes".format(
+                self.nodes_count),
+            results)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import zlib
+
+from kombu import Connection
+from mock import patch
+
+from nailgun import rpc
+from nailgun.test.base import BaseTestCase
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+@patch('nailgun.rpc.conn_str', 'memory://')
+class TestRPCCastBenchmark(BenchmarkMixin, BaseTestCase):
+    """In-memory kombu transport is used as broker, so only
+    client side costs are measured.
+    """
+
+    casts = 50
+    nodes_count = 200
+
+    def setUp(self):
+        self.message = {
+            'method': 'deploy',
+            'respond_to': 'deploy_resp',
+            'args': {
+                'task_uuid': 'c0ffee',
+                'deployment_info': [
+                    {
+                        'uid': str(i),
+                        'role': 'compute',
+                        'fqdn': 'node-{0}.domain.tld'.format(i),
+                        'nodes': [
+                            {'uid': str(j),
+                             'name': 'node-{0}'.format(j),
+                             'internal_address': '192.168.0.{0}'.format(j)}
+                            for j in xrange(20)
+                        ]
+                    }
+                    for i in xrange(self.nodes_count)
+                ]
+            }
+        }
+
+    def drain(self):
+        with Connection('memory://') as conn:
+            queue = rpc.naily_queue(conn.default_channel)
+            while queue.get(no_ack=True) is not None:
+                pass
+
+    def cast_with_new_connection(self):
+        # how rpc.cast worked before producer pool
+        for _ in xrange(self.casts):
+            json.dumps(self.message, indent=4)
+            with Connection('memory://') as conn:
+                with conn.Producer(serializer='json') as producer:
+                    producer.publish(self.message,
+                                     exchange=rpc.naily_exchange,
+                                     routing_key='naily',
+                                     declare=[rpc.naily_queue])
+        self.drain()
+
+    def cast_pooled(self):
+        for _ in xrange(self.casts):
+            rpc.cast('naily', self.message)
+        self.drain()
+
+    def test_cast(self):
+        body = json.dumps(self.message)
+        results = [
+            ("message size", "{0} bytes".format(len(body))),
+            ("compressed size",
+             "{0} bytes".format(len(zlib.compress(body)))),
+        ]
+        with patch.object(rpc.logger, 'isEnabledFor',
+                          return_value=False):
+            results.append(("connection per cast",
+                            self.measure(self.cast_with_new_connection)))
+            results.append(("pooled producer",
+                            self.measure(self.cast_pooled)))
+            with patch.dict(rpc.settings.RPC_PRODUCER,
+                            {'compression_threshold': 1}):
+                results.append(("pooled producer, zlib",
+                                self.measure(self.cast_pooled)))
+        self.report(
+            "rpc.cast of {0} deployment messages for {1} nodes".format(
+                self.casts, self.nodes_count),
+            results)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from datetime import datetime
+
+from sqlalchemy.orm import joinedload
+
+from nailgun.api.handlers.base import JSONHandler
+from nailgun.api.handlers.node import NodeCollectionHandler
+from nailgun.api.handlers.tasks import TaskHandler
+from nailgun.db.sqlalchemy.models import Node
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+def reflective_serialize(instance, fields):
+    """BasicSerializer.serialize as it was before serializers
+    were compiled.
+    """
+    data_dict = {}
+    for field in fields:
+        value = getattr(instance, field)
+        if value is None:
+            data_dict[field] = value
+        else:
+            f = getattr(instance.__class__, field)
+            if hasattr(f, "impl"):
+                rel = f.impl.__class__.__name__
+                if rel == 'ScalarObjectAttributeImpl':
+                    data_dict[field] = value.id
+                elif rel == 'CollectionAttributeImpl':
+                    data_dict[field] = [v.id for v in value]
+                else:
+                    data_dict[field] = value
+            else:
+                data_dict[field] = value
+    return data_dict
+
+
+class TestSerializersBenchmark(BenchmarkMixin, BaseIntegrationTest):
+
+    rows = 10000
+
+    def setUp(self):
+        super(TestSerializersBenchmark, self).setUp()
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[{'roles': ['controller']}]
+        )
+        cluster_id = self.env.clusters[0].id
+        meta = self.env.default_metadata()
+        self.db.execute(Node.__table__.insert(), [{
+            'name': u'Node {0}'.format(i),
+            'cluster_id': cluster_id,
+            'status': 'ready',
+            'mac': '00:{0:02x}:{1:02x}:{2:02x}:00:00'.format(
+                i >> 16, (i >> 8) & 0xff, i & 0xff),
+            'meta': meta,
+            'timestamp': datetime.now()
+        } for i in xrange(self.rows)])
+        self.db.execute(Task.__table__.insert(), [{
+            'name': 'deployment',
+            'cluster_id': cluster_id,
+            'status': 'ready',
+            'progress': 100,
+            'result': {}
+        } for _ in xrange(self.rows)])
+        self.db.commit()
+
+        node_fields = NodeCollectionHandler.fields
+        self.collections = (
+            ('Node', node_fields, self.db.query(Node).options(
+                joinedload('cluster'),
+                joinedload('role_list'),
+                joinedload('pending_role_list')).all()),
+            ('Task', TaskHandler.fields, self.db.query(Task).options(
+                joinedload('cluster')).all()))
+
+    def render_reflective(self, instances, fields):
+        for instance in instances:
+            reflective_serialize(instance, fields)
+
+    def render_compiled(self, instances, fields):
+        for instance in instances:
+            JSONHandler.render(instance, fields=fields)
+
+    def test_render(self):
+        results = []
+        for title, fields, instances in self.collections:
+            results.append((
+                "{0}, {1} fields, reflection".format(title, len(fields)),
+                "{0:.3f} s".format(self.measure(
+                    self.render_reflective, instances, fields))))
+            results.append((
+                "{0}, {1} fields, compiled".format(title, len(fields)),
+                "{0:.3f} s".format(self.measure(
+                    self.render_compiled, instances, fields))))
+        self.report(
+            "Rendering of {0} rows".format(self.rows), results)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import gc
+import json
+import os
+import shutil
+import tempfile
+import time
+from types import GeneratorType
+from urllib import urlencode
+
+from mock import patch
+
+from nailgun.api.handlers.base import is_streamed
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.settings import settings
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.base import reverse
+from nailgun.test.performance.base import BenchmarkMixin
+from nailgun.wsgi import build_app
+
+
+def rss():
+    """Returns current resident set size of process in bytes."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def materialize(data):
+    if isinstance(data, GeneratorType):
+        return list(data)
+    if is_streamed(data):
+        return dict((key, value() if callable(value) else materialize(value))
+                    for key, value in data.iteritems())
+    return data
+
+
+def buffered_json_response(data):
+    """build_json_response as it was before streaming."""
+    return json.dumps(materialize(data))
+
+
+class TestStreamingBenchmark(BenchmarkMixin, BaseIntegrationTest):
+
+    nodes_count = 1000
+    tasks_count = 5000
+    log_lines = 100000
+
+    def setUp(self):
+        super(TestStreamingBenchmark, self).setUp()
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[{} for _ in xrange(self.nodes_count)]
+        )
+        cluster = self.env.clusters[0]
+        for _ in xrange(self.tasks_count):
+            self.db.add(Task(name='deployment', cluster=cluster,
+                             status='ready', progress=100))
+        self.db.commit()
+
+        self.log_dir = tempfile.mkdtemp()
+        log_file = os.path.join(self.log_dir, 'nailgun.log')
+        with open(log_file, 'w') as f:
+            date = time.strftime(settings.UI_LOG_DATE_FORMAT)
+            for i in xrange(self.log_lines):
+                f.write('{0}:INFO:message {1} {2}\n'.format(
+                    date, i, 'x' * 100))
+        settings.update({
+            'LOGS': [{
+                'id': 'nailgun',
+                'name': 'Nailgun',
+                'remote': False,
+                'regexp': (r'^(?P<date>\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:'
+                           r'\d{2}):(?P<level>\w+):(?P<text>.+)$'),
+                'date_format': settings.UI_LOG_DATE_FORMAT,
+                'levels': [],
+                'path': log_file
+            }]
+        })
+        self.wsgi = build_app().wsgifunc()
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+        super(TestStreamingBenchmark, self).tearDown()
+
+    def get(self, handler, params=None):
+        """Reads response of handler directly from WSGI
+        application, returns time to first byte, total time,
+        growth of RSS while response is built and sent and
+        response size.
+        """
+        env = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': reverse(handler),
+            'QUERY_STRING': urlencode(params or {}),
+            'CONTENT_TYPE': 'application/json',
+            'wsgi.input': None,
+        }
+        gc.collect()
+        base_rss = peak_rss = rss()
+        started = time.time()
+        first_byte = None
+        size = 0
+        for chunk in self.wsgi(env, lambda status, headers: None):
+            if first_byte is None and chunk:
+                first_byte = time.time() - started
+            size += len(chunk)
+            peak_rss = max(peak_rss, rss())
+        return (first_byte, time.time() - started,
+                peak_rss - base_rss, size)
+
+    def test_streaming(self):
+        results = []
+        requests = (
+            ('NodeCollectionHandler', None),
+            ('TaskCollectionHandler', None),
+            ('LogEntryCollectionHandler', {'source': 'nailgun'}))
+        # streamed responses are measured first, memory
+        # freed by Python isn't always returned to OS
+        for title, patched in (('streamed', None),
+                               ('buffered', buffered_json_response)):
+            for handler, params in requests:
+                if patched:
+                    with patch('nailgun.api.handlers.base.'
+                               'build_json_response', patched):
+                        ttfb, total, memory, size = self.get(
+                            handler, params)
+                else:
+                    ttfb, total, memory, size = self.get(handler, params)
+                results.append(("{0}, {1}".format(handler, title),
+                                "{0} KiB".format(size / 1024)))
+                results.append(("  time to first byte",
+                                "{0:.3f} s".format(ttfb)))
+                results.append(("  total time", "{0:.3f} s".format(total)))
+                results.append(("  RSS growth",
+                                "{0} KiB".format(memory / 1024)))
+        self.report(
+            "Collection responses, {0} nodes, {1} tasks, "
+            "{2} log lines".format(
+                self.nodes_count, self.tasks_count, self.log_lines),
+            results)
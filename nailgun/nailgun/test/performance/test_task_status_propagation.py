@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from mock import patch
+
+from nailgun.db.sqlalchemy.models import Cluster
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.rpc.receiver import NailgunReceiver
+from nailgun.settings import settings
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+class TestTaskStatusPropagationBenchmark(BenchmarkMixin,
+                                         BaseIntegrationTest):
+
+    messages = 1000
+    nodes_count = 20
+
+    def setUp(self):
+        super(TestTaskStatusPropagationBenchmark, self).setUp()
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {'status': 'provisioned', 'pending_addition': True}
+                for _ in xrange(self.nodes_count)
+            ]
+        )
+        cluster = self.env.clusters[0]
+        self.supertask = Task(name='deploy', cluster_id=cluster.id)
+        self.db.add(self.supertask)
+        self.db.commit()
+        provision = self.supertask.create_subtask('provision')
+        provision.weight = 0.4
+        provision.status = 'ready'
+        provision.progress = 100
+        self.deployment = self.supertask.create_subtask('deployment')
+        self.deployment.weight = 0.6
+        self.db.commit()
+        self.nodes_ids = [n.id for n in self.env.nodes]
+
+    def deploy(self):
+        """Sends self.messages deploy_resp messages, every one
+        with progress of one node, the last one finishes deployment.
+        """
+        for i in xrange(self.messages - 1):
+            node_id = self.nodes_ids[i % self.nodes_count]
+            NailgunReceiver.deploy_resp(
+                task_uuid=self.deployment.uuid,
+                nodes=[{'uid': node_id,
+                        'status': 'deploying',
+                        'progress': i * 100 / self.messages}]
+            )
+        NailgunReceiver.deploy_resp(
+            task_uuid=self.deployment.uuid,
+            status='ready',
+            nodes=[{'uid': node_id, 'status': 'ready', 'progress': 100}
+                   for node_id in self.nodes_ids]
+        )
+
+    def test_deployment_statements(self):
+        with patch.dict(settings.TASK_PROGRESS_PROPAGATION,
+                        {'progress_step': 5, 'interval': 3600}):
+            with self.count_statements() as statements:
+                self.deploy()
+
+        self.assertEquals(self.supertask.status, 'ready')
+        self.assertEquals(self.supertask.progress, 100)
+        cluster = self.db.query(Cluster).get(self.supertask.cluster_id)
+        self.assertEquals(cluster.status, 'operational')
+
+        self.report(
+            "deploy_resp of {0} messages, {1} nodes".format(
+                self.messages, self.nodes_count),
+            [("SQL statements", len(statements)),
+             ("SQL statements per message",
+              "{0:.1f}".format(float(len(statements)) / self.messages))])
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.rpc.receiver import NailgunReceiver
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.test.performance.base import BenchmarkMixin
+
+
+class TestVerifyNetworksRespBenchmark(BenchmarkMixin, BaseIntegrationTest):
+
+    nodes_count = 500
+    vlans = range(100, 120)
+
+    def setUp(self):
+        super(TestVerifyNetworksRespBenchmark, self).setUp()
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[{'api': False} for _ in xrange(self.nodes_count)]
+        )
+        self.cluster = self.env.clusters[0]
+        self.sent = [
+            {'uid': node.id,
+             'networks': [{'iface': 'eth0', 'vlans': self.vlans},
+                          {'iface': 'eth1', 'vlans': self.vlans}]}
+            for node in self.env.nodes
+        ]
+        # every second node doesn't receive half of vlans on eth1
+        self.received = [
+            {'uid': node['uid'],
+             'networks': [{'iface': 'eth0', 'vlans': self.vlans},
+                          {'iface': 'eth1',
+                           'vlans': self.vlans[i % 2 * 10:]}]}
+            for i, node in enumerate(self.sent)
+        ]
+
+    def verify(self):
+        task = Task(name='verify_networks', cluster_id=self.cluster.id)
+        task.cache = {'args': {'nodes': self.sent}}
+        self.db.add(task)
+        self.db.commit()
+        NailgunReceiver.verify_networks_resp(
+            task_uuid=task.uuid,
+            status='ready',
+            nodes=self.received
+        )
+        self.assertEquals(task.status, 'error')
+        self.assertEquals(len(task.result), self.nodes_count / 2)
+
+    def test_verify_networks_resp(self):
+        with self.count_statements() as statements:
+            self.verify()
+        self.report(
+            "verify_networks_resp, {0} nodes".format(self.nodes_count),
+            [("time", self.measure(self.verify)),
+             ("SQL statements", len(statements))])
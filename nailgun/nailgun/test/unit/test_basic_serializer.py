@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest
+
+from nailgun.api.serializers.base import BasicSerializer
+from nailgun.db.sqlalchemy.models import Cluster
+from nailgun.db.sqlalchemy.models import Task
+
+
+class TestBasicSerializer(unittest.TestCase):
+
+    fields = ('id', 'name', 'cluster', 'subtasks', 'parent', 'result')
+
+    def test_relations_are_serialized_as_ids(self):
+        task = Task(id=1, name='deploy', cluster=Cluster(id=2),
+                    subtasks=[Task(id=3), Task(id=4)], result={'a': 1})
+        self.assertEquals(
+            BasicSerializer.serialize(task, fields=self.fields),
+            {'id': 1, 'name': 'deploy', 'cluster': 2, 'subtasks': [3, 4],
+             'parent': None, 'result': {'a': 1}})
+        self.assertEquals(
+            BasicSerializer.serialize(Task(id=5), fields=list(self.fields)),
+            {'id': 5, 'name': None, 'cluster': None, 'subtasks': [],
+             'parent': None, 'result': None})
+
+    def test_getters_are_cached_by_field(self):
+        getter = BasicSerializer.getter(Task, 'cluster')
+        self.assertIs(BasicSerializer.getter(Task, 'cluster'), getter)
+        BasicSerializer.serialize(Task(), fields=('name', 'name', 'id'))
+        BasicSerializer.serialize(Task(), fields=('id', 'name'))
+        self.assertEquals(
+            set(f for m, f in BasicSerializer._getters if m is Task) -
+            set(self.fields),
+            set())
+        # attributes missing in model are not cached
+        BasicSerializer.getter(Task, 'no_such_field')
+        self.assertNotIn((Task, 'no_such_field'), BasicSerializer._getters)
+
+    def test_no_fields(self):
+        self.assertRaises(ValueError, BasicSerializer.serialize, Task(), ())
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest
+
+from nailgun.errors import errors
+from nailgun.network.allocator import IPAllocator
+
+
+class TestIPAllocator(unittest.TestCase):
+
+    def test_skips_used_ips(self):
+        allocator = IPAllocator(
+            [('10.0.0.1', '10.0.0.10')],
+            ['10.0.0.1', '10.0.0.3', '192.168.0.1']
+        )
+        self.assertEquals(
+            allocator.get_free_ips(3),
+            ['10.0.0.2', '10.0.0.4', '10.0.0.5']
+        )
+
+    def test_allocated_ips_are_marked_used(self):
+        allocator = IPAllocator([('10.0.0.1', '10.0.0.2')])
+        self.assertEquals(allocator.get_free_ips(), ['10.0.0.1'])
+        self.assertEquals(allocator.get_free_ips(), ['10.0.0.2'])
+        self.assertRaises(errors.OutOfIPs, allocator.get_free_ips)
+
+    def test_spans_several_ranges(self):
+        allocator = IPAllocator(
+            [('10.0.1.1', '10.0.1.2'), ('10.0.0.1', '10.0.0.2')],
+            ['10.0.0.2']
+        )
+        self.assertEquals(
+            allocator.get_free_ips(3),
+            ['10.0.0.1', '10.0.1.1', '10.0.1.2']
+        )
+
+    def test_overlapping_ranges_are_merged(self):
+        allocator = IPAllocator(
+            [('10.0.0.1', '10.0.0.5'), ('10.0.0.3', '10.0.0.8')]
+        )
+        self.assertEquals(allocator.ranges, [(167772161, 167772168)])
+        self.assertEquals(len(set(allocator.get_free_ips(8))), 8)
+
+    def test_not_enough_ips(self):
+        allocator = IPAllocator([('10.0.0.1', '10.0.0.3')], ['10.0.0.2'])
+        self.assertRaises(errors.OutOfIPs, allocator.get_free_ips, 3)
+        # failed allocation must not mark anything as used
+        self.assertEquals(allocator.get_free_ips(2), ['10.0.0.1', '10.0.0.3'])
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest
+
+from mock import Mock
+from netaddr import IPAddress
+
+from nailgun.network.ranges import ip_to_int
+from nailgun.network.ranges import IPRangeIndex
+
+
+class TestIPRangeIndex(unittest.TestCase):
+
+    def test_ip_to_int(self):
+        self.assertEquals(ip_to_int('10.0.0.1'), 167772161)
+        self.assertEquals(ip_to_int(u'10.0.0.1'), 167772161)
+        self.assertEquals(ip_to_int(IPAddress('10.0.0.1')), 167772161)
+        self.assertEquals(ip_to_int(167772161), 167772161)
+
+    def test_membership(self):
+        index = IPRangeIndex([
+            ('10.0.0.10', '10.0.0.20'),
+            ('10.0.0.1', '10.0.0.5')
+        ])
+        for ip in ('10.0.0.1', '10.0.0.5', '10.0.0.10', '10.0.0.20'):
+            self.assertIn(ip, index)
+        for ip in ('10.0.0.0', '10.0.0.6', '10.0.0.9', '10.0.0.21'):
+            self.assertNotIn(ip, index)
+        self.assertNotIn('10.0.0.1', IPRangeIndex([]))
+
+    def test_ranges_are_merged(self):
+        index = IPRangeIndex([
+            ('10.0.0.1', '10.0.0.5'),
+            ('10.0.0.6', '10.0.0.8'),
+            ('10.0.0.3', '10.0.0.4')
+        ])
+        self.assertEquals(index.ranges, [(167772161, 167772168)])
+        self.assertEquals(index.size, 8)
+
+    def test_for_cidr(self):
+        index = IPRangeIndex.for_cidr('10.20.0.0/24')
+        self.assertIn('10.20.0.0', index)
+        self.assertIn('10.20.0.255', index)
+        self.assertNotIn('10.20.1.0', index)
+        self.assertIs(index, IPRangeIndex.for_cidr('10.20.0.0/24'))
+
+    def test_for_network_group_is_cached_by_ranges(self):
+        ng = Mock()
+        ng.ip_ranges = [Mock(first='10.0.0.1', last='10.0.0.5')]
+        index = IPRangeIndex.for_network_group(ng)
+        self.assertIs(index, IPRangeIndex.for_network_group(ng))
+
+        ng.ip_ranges = [Mock(first='10.0.0.1', last='10.0.0.6')]
+        self.assertIn('10.0.0.6', IPRangeIndex.for_network_group(ng))
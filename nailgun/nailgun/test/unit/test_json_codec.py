@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import unittest
+
+from nailgun.db.sqlalchemy.models.fields import JSON
+from nailgun.utils import json_codec
+
+
+class TestJSONCodec(unittest.TestCase):
+
+    data = {
+        'name': u'Untitled (узел)',
+        'progress': 50,
+        'cpu': {'real': 1, 'spec': [{'frequency': 2.93, 'model': 'x'}]},
+        'online': True,
+        'cluster': None,
+        'path': '/dev/disk/by-path/pci-0000:00:0d.0-scsi-0:0:0:0'
+    }
+
+    def tearDown(self):
+        json_codec.use(*json_codec._default_backends())
+
+    def test_same_as_stdlib_json(self):
+        encoded = json_codec.dumps(self.data)
+        self.assertEquals(encoded, json.dumps(self.data))
+        self.assertEquals(json_codec.loads(encoded), self.data)
+        self.assertEquals(
+            json.loads(json_codec.dumps(self.data, indent=4)), self.data)
+
+    def test_strings_are_decoded_to_unicode(self):
+        for backend in json_codec.backends():
+            json_codec.use(backend)
+            data = json_codec.loads('{"name": "node", "roles": ["x"]}')
+            self.assertEquals(data, {'name': 'node', 'roles': ['x']})
+            self.assertIsInstance(data.keys()[0], unicode)
+            self.assertIsInstance(data['name'], unicode)
+            self.assertIsInstance(data['roles'][0], unicode)
+            self.assertEquals(
+                json_codec.loads('"\xd1\x83\xd0\xb7"'), u'уз')
+
+    def test_invalid_json(self):
+        self.assertRaises(ValueError, json_codec.loads, '{"a": ')
+
+    def test_backends_are_switched(self):
+        previous = json_codec.use(json)
+        self.assertEquals(json_codec.backends(), (json, json))
+        self.assertEquals(json_codec.use(*previous), (json, json))
+        self.assertEquals(json_codec.backends(), previous)
+
+    def test_json_column(self):
+        column = JSON()
+        value = column.process_bind_param(self.data, None)
+        self.assertEquals(column.process_result_value(value, None),
+                          self.data)
+        self.assertIsNone(column.process_bind_param(None, None))
+        self.assertIsNone(column.process_result_value(None, None))
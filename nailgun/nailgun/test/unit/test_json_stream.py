@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from collections import OrderedDict
+import json
+import unittest
+
+from mock import patch
+
+from nailgun.api.handlers.base import is_streamed
+from nailgun.api.handlers.base import iter_json
+from nailgun.api.handlers.base import stream_json
+
+
+def encode(data):
+    return ''.join(iter_json(data))
+
+
+class TestJSONStream(unittest.TestCase):
+
+    def test_same_output_as_json_dumps(self):
+        items = [{'id': 1, 'name': u'node – 1'}, {'id': 2}, [], None]
+        self.assertEquals(encode(x for x in items), json.dumps(items))
+        self.assertEquals(encode(x for x in []), json.dumps([]))
+        data = OrderedDict([('entries', (x for x in items)), ('to', 10)])
+        self.assertEquals(encode(data), json.dumps(OrderedDict([
+            ('entries', items), ('to', 10)])))
+
+    def test_callable_is_called_after_preceding_generator(self):
+        state = {'read': 0}
+
+        def read():
+            for i in xrange(3):
+                state['read'] += 1
+                yield i
+
+        data = OrderedDict([
+            ('entries', read()),
+            ('read', lambda: state['read'])])
+        self.assertEquals(json.loads(encode(data)),
+                          {'entries': [0, 1, 2], 'read': 3})
+
+    def test_is_streamed(self):
+        self.assertTrue(is_streamed(x for x in []))
+        self.assertTrue(is_streamed({'has_more': lambda: False}))
+        self.assertFalse(is_streamed({'entries': []}))
+        self.assertFalse(is_streamed([1, 2]))
+
+    @patch('nailgun.api.handlers.base.db')
+    def test_chunks(self, mocked_db):
+        items = [{'id': i} for i in xrange(100)]
+        chunks = list(stream_json((x for x in items), chunk_size=100))
+        # the first chunk is sent as soon as the first item is ready
+        self.assertEquals(chunks[0], '[{"id": 0}')
+        self.assertTrue(all(len(c) < 120 for c in chunks))
+        self.assertEquals(json.loads(''.join(chunks)), items)
+        self.assertEquals(mocked_db.return_value.commit.call_count, 1)
+
+    @patch('nailgun.api.handlers.base.db')
+    def test_transaction_is_rolled_back_on_error(self, mocked_db):
+        def fail():
+            yield 1
+            raise ValueError()
+
+        stream = stream_json(fail())
+        self.assertEquals(stream.next(), '[1')
+        self.assertRaises(ValueError, stream.next)
+        self.assertEquals(mocked_db.return_value.rollback.call_count, 1)
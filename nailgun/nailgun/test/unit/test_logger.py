@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import unittest
+
+from mock import patch
+
+from nailgun.logger import LazyPayload
+from nailgun.logger import LogSampler
+from nailgun.rpc.receiver import NailgunReceiver
+from nailgun.settings import settings
+
+
+class TestLazyPayload(unittest.TestCase):
+
+    def test_payload_is_serialized(self):
+        self.assertEquals(str(LazyPayload({'a': [1, 2]})), '{"a": [1, 2]}')
+        self.assertEquals(str(LazyPayload(u'тест')), u'тест'.encode('utf-8'))
+
+    def test_long_payload_is_cut(self):
+        payload = {'nodes': ['node'] * 100}
+        self.assertEquals(str(LazyPayload(payload, 1000)),
+                          str(LazyPayload(payload)))
+
+        data = str(LazyPayload(payload))
+        self.assertEquals(
+            str(LazyPayload(payload, 10)),
+            '{0}... ({1} bytes more, md5 {2})'.format(
+                data[:10], len(data) - 10,
+                hashlib.md5(data[10:]).hexdigest()))
+
+
+class TestLogSampler(unittest.TestCase):
+
+    def test_every_rate_th_record_is_logged(self):
+        sampler = LogSampler()
+        self.assertEquals(
+            [sampler('t1', 3) for _ in xrange(7)],
+            [True, False, False, True, False, False, True])
+        # the first record of other key is logged
+        self.assertTrue(sampler('t2', 3))
+        self.assertTrue(all(sampler('t3', 1) for _ in xrange(3)))
+
+
+class TestReceiverLogSampling(unittest.TestCase):
+
+    def test_only_progress_messages_are_sampled(self):
+        is_progress = NailgunReceiver._is_progress
+        self.assertTrue(is_progress({
+            'task_uuid': 't1', 'progress': 10,
+            'nodes': [{'uid': 1, 'status': 'deploying'}]}))
+        self.assertFalse(is_progress({'progress': 10}))
+        self.assertFalse(is_progress({'task_uuid': 't1', 'status': 'ready'}))
+        self.assertFalse(is_progress({'task_uuid': 't1', 'error': 'failed'}))
+        self.assertFalse(is_progress({
+            'task_uuid': 't1',
+            'nodes': [{'uid': 1, 'status': 'deploying'},
+                      {'uid': 2, 'status': 'error'}]}))
+
+    @patch('nailgun.rpc.receiver.logger')
+    def test_node_errors_are_always_logged(self, mocked_logger):
+        with patch.dict(settings.PAYLOAD_LOGGING,
+                        {'progress_sample_rate': 1000}):
+            for _ in xrange(3):
+                NailgunReceiver._log_received('deploy_resp', {
+                    'task_uuid': 'sampled-task',
+                    'nodes': [{'uid': 1, 'status': 'error'}]})
+        self.assertEquals(mocked_logger.info.call_count, 3)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest
+
+from netaddr import IPNetwork
+from netaddr import IPSet
+
+from nailgun.errors import errors
+from nailgun.network.pool import CIDRPool
+from nailgun.network.pool import VLANPool
+
+
+class TestCIDRPool(unittest.TestCase):
+
+    def test_allocate_skips_reserved(self):
+        pool = CIDRPool(['172.16.0.0/16'])
+        pool.reserve_cidr('172.16.0.0/24')
+        pool.reserve_cidr('172.16.2.128/25')
+        self.assertEquals(pool.allocate(24), IPNetwork('172.16.1.0/24'))
+        self.assertEquals(pool.allocate(24), IPNetwork('172.16.3.0/24'))
+        self.assertEquals(pool.size, 65536 - 256 * 3 - 128)
+
+    def test_allocate_needs_aligned_block(self):
+        pool = CIDRPool(['10.0.0.0/24', '10.0.1.0/24'])
+        pool.reserve_cidr('10.0.0.0/25')
+        self.assertEquals(pool.allocate(24), IPNetwork('10.0.1.0/24'))
+        self.assertRaises(errors.NoSuitableCIDR, pool.allocate, 24)
+        self.assertEquals(pool.allocate(25), IPNetwork('10.0.0.128/25'))
+        self.assertFalse(pool)
+        self.assertRaises(errors.OutOfIPs, pool.allocate, 24)
+
+    def test_reserve_across_free_blocks(self):
+        pool = CIDRPool(['10.0.0.0/24', '10.0.2.0/24', '10.0.4.0/24'])
+        pool.reserve(IPNetwork('10.0.0.128').first,
+                     IPNetwork('10.0.4.127').first)
+        self.assertEquals(
+            pool.free,
+            [(IPNetwork('10.0.0.0').first, IPNetwork('10.0.0.127').first),
+             (IPNetwork('10.0.4.128').first, IPNetwork('10.0.4.255').first)])
+
+    def test_same_result_as_ipset(self):
+        cidrs = ['192.168.0.0/22', '10.0.0.0/23']
+        excluded = ['192.168.0.64/26', '10.0.0.0/24', '192.168.2.0/24']
+        pool = CIDRPool(cidrs)
+        for cidr in excluded:
+            pool.reserve_cidr(cidr)
+
+        free_set = IPSet(cidrs)
+        for cidr in excluded:
+            free_set -= IPSet([cidr])
+        for _ in xrange(3):
+            expected = None
+            for fcidr in sorted(free_set.iter_cidrs()):
+                for net in fcidr.subnet(24, count=1):
+                    expected = net
+                    break
+                if expected:
+                    break
+            self.assertEquals(pool.allocate(24), expected)
+            free_set -= IPSet([expected])
+
+
+class TestVLANPool(unittest.TestCase):
+
+    def test_allocate_lowest_free(self):
+        vlans = VLANPool(100, 104)
+        self.assertEquals(len(vlans), 4)
+        self.assertTrue(vlans.take(100))
+        self.assertFalse(vlans.take(100))
+        self.assertFalse(vlans.take(104))
+        self.assertEquals(vlans.allocate(), 101)
+        self.assertTrue(vlans.take(103))
+        self.assertEquals(vlans.allocate(), 102)
+        self.assertEquals(len(vlans), 0)
+        self.assertRaises(errors.OutOfVLANs, vlans.allocate)
+
+    def test_membership(self):
+        vlans = VLANPool(100, 1000)
+        self.assertIn(100, vlans)
+        self.assertIn(999, vlans)
+        self.assertNotIn(99, vlans)
+        self.assertNotIn(1000, vlans)
+        self.assertNotIn(None, vlans)
+        self.assertEquals(len(VLANPool(10, 10)), 0)
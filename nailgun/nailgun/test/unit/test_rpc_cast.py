@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest
+
+from kombu import Connection
+from mock import patch
+
+from nailgun import rpc
+
+
+@patch('nailgun.rpc.conn_str', 'memory://')
+class TestRPCCast(unittest.TestCase):
+
+    def get_messages(self):
+        with Connection('memory://') as conn:
+            queue = rpc.naily_queue(conn.default_channel)
+            messages = []
+            message = queue.get()
+            while message is not None:
+                messages.append(message)
+                message = queue.get()
+            return messages
+
+    def setUp(self):
+        # drops messages left by other tests
+        self.get_messages()
+
+    def test_producer_connection_is_reused(self):
+        rpc.cast('naily', {'method': 'deploy'})
+        connection = rpc.get_connection()
+        rpc.cast('naily', {'method': 'provision'})
+        self.assertIs(rpc.get_connection(), connection)
+
+        messages = self.get_messages()
+        self.assertEquals(
+            [m.payload for m in messages],
+            [{'method': 'deploy'}, {'method': 'provision'}])
+        for message in messages:
+            self.assertNotIn('compression', message.headers)
+
+    def test_large_messages_are_compressed(self):
+        message = {'method': 'deploy', 'args': {'nodes': ['node'] * 100}}
+        with patch.dict(rpc.settings.RPC_PRODUCER,
+                        {'compression_threshold': 100}):
+            rpc.cast('naily', {'method': 'deploy'})
+            rpc.cast('naily', message)
+
+        small, large = self.get_messages()
+        self.assertNotIn('compression', small.headers)
+        self.assertEquals(large.headers['compression'], 'application/x-gzip')
+        self.assertEquals(large.payload, message)
+
+    @patch('nailgun.rpc.logger')
+    def test_debug_dump_is_skipped(self, mocked_logger):
+        mocked_logger.isEnabledFor.return_value = False
+        rpc.cast('naily', {'method': 'deploy'})
+        self.assertFalse(mocked_logger.debug.called)
+        self.get_messages()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest
+
+from mock import Mock
+from mock import patch
+
+from nailgun.rpc.coalescer import MessageCoalescer
+from nailgun.rpc.threaded import RPCConsumer
+
+
+def deploy_resp(task_uuid, nodes=None, **kwargs):
+    args = {'task_uuid': task_uuid}
+    if nodes is not None:
+        args['nodes'] = nodes
+    args.update(kwargs)
+    return {'method': 'deploy_resp', 'args': args}
+
+
+class TestMessageCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        self.coalescer = MessageCoalescer()
+
+    def test_latest_node_progress_is_kept(self):
+        self.coalescer.add(deploy_resp('t1', [
+            {'uid': 1, 'status': 'deploying', 'progress': 10},
+            {'uid': 2, 'status': 'deploying', 'progress': 10}]))
+        self.coalescer.add(deploy_resp('t1', [
+            {'uid': 1, 'progress': 30}]))
+        self.coalescer.add(deploy_resp('t1', [
+            {'uid': 2, 'status': 'error', 'progress': 40}]))
+
+        groups = self.coalescer.pop_all()
+        self.assertEquals(len(groups), 1)
+        body, messages = groups[0]
+        self.assertEquals(len(messages), 3)
+        self.assertEquals(body['args']['nodes'], [
+            {'uid': 1, 'status': 'deploying', 'progress': 30},
+            {'uid': 2, 'status': 'error', 'progress': 40}])
+        self.assertEquals(len(self.coalescer), 0)
+
+    def test_terminal_status_is_not_merged(self):
+        self.coalescer.add(deploy_resp('t1', progress=50))
+        self.coalescer.add(deploy_resp('t1', status='ready', progress=100))
+        self.coalescer.add(deploy_resp('t1', progress=100))
+
+        bodies = [body for body, _ in self.coalescer.pop_all()]
+        self.assertEquals(
+            [(b['args'].get('status'), b['args']['progress'])
+             for b in bodies],
+            [('ready', 100), (None, 100)])
+
+    def test_terminal_node_status_is_not_merged(self):
+        self.coalescer.add(deploy_resp('t1', [
+            {'uid': 1, 'status': 'deploying', 'progress': 10}]))
+        self.coalescer.add(deploy_resp('t1', [
+            {'uid': 1, 'status': 'error', 'error_type': 'deploy'}]))
+        self.coalescer.add(deploy_resp('t1', [
+            {'uid': 1, 'status': 'deploying', 'progress': 30}]))
+
+        bodies = [body for body, _ in self.coalescer.pop_all()]
+        self.assertEquals(
+            [b['args']['nodes'] for b in bodies],
+            [[{'uid': 1, 'status': 'error', 'progress': 10,
+               'error_type': 'deploy'}],
+             [{'uid': 1, 'status': 'deploying', 'progress': 30}]])
+
+    def test_other_methods_are_barriers(self):
+        remove = {'method': 'remove_nodes_resp',
+                  'args': {'task_uuid': 't2', 'nodes': []}}
+        self.coalescer.add(deploy_resp('t1', progress=10))
+        self.coalescer.add(deploy_resp('t3', progress=10))
+        self.coalescer.add(deploy_resp('t1', progress=20))
+        self.coalescer.add(remove)
+        self.coalescer.add(deploy_resp('t1', progress=30))
+
+        bodies = [body for body, _ in self.coalescer.pop_all()]
+        self.assertEquals(
+            [(b['method'], b['args']['task_uuid'],
+              b['args'].get('progress')) for b in bodies],
+            [('deploy_resp', 't1', 20),
+             ('deploy_resp', 't3', 10),
+             ('remove_nodes_resp', 't2', None),
+             ('deploy_resp', 't1', 30)])
+
+    def test_progress_is_recalculated_by_nodes(self):
+        self.coalescer.add(deploy_resp('t1', progress=10))
+        self.coalescer.add(deploy_resp('t1', [{'uid': 1, 'progress': 20}]))
+
+        body, _ = self.coalescer.pop_all()[0]
+        self.assertIsNone(body['args']['progress'])
+
+    def test_original_body_is_not_changed(self):
+        first = deploy_resp('t1', [{'uid': 1, 'progress': 10}])
+        self.coalescer.add(first)
+        self.coalescer.add(deploy_resp('t1', [{'uid': 1, 'progress': 20}]))
+        self.assertEquals(first['args']['nodes'], [{'uid': 1, 'progress': 10}])
+
+
+class TestRPCConsumerCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        self.receiver = Mock()
+
+    @patch('nailgun.rpc.threaded.db')
+    def test_counters(self, mocked_db):
+        consumer = RPCConsumer(Mock(), self.receiver, coalesce_window=3)
+        messages = [Mock() for _ in xrange(4)]
+        for i, msg in enumerate(messages):
+            consumer.consume_msg(deploy_resp('t1', progress=i), msg)
+
+        # the first three are merged and applied once
+        self.assertEquals(self.receiver.deploy_resp.call_count, 1)
+        self.receiver.deploy_resp.assert_called_with(
+            task_uuid='t1', progress=2)
+        for msg in messages[:3]:
+            self.assertTrue(msg.ack.called)
+        self.assertFalse(messages[3].ack.called)
+
+        consumer.flush()
+        self.assertTrue(messages[3].ack.called)
+        self.assertEquals(consumer.stats(), {'received': 4, 'applied': 2})
+
+    @patch('nailgun.rpc.threaded.db')
+    def test_coalescing_disabled(self, mocked_db):
+        consumer = RPCConsumer(Mock(), self.receiver)
+        for i in xrange(3):
+            consumer.consume_msg(deploy_resp('t1', progress=i), Mock())
+        self.assertEquals(self.receiver.deploy_resp.call_count, 3)
+        self.assertEquals(consumer.stats(), {'received': 3, 'applied': 3})
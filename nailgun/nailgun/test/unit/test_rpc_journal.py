@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import Mock
+from mock import patch
+
+from nailgun.rpc.journal import journal_files
+from nailgun.rpc.journal import MessageJournal
+from nailgun.rpc.journal import read_journal
+from nailgun.rpc.replay import percentile
+from nailgun.rpc.replay import replay
+from nailgun.rpc.threaded import RPCConsumer
+
+
+def deploy_resp(progress):
+    return {'method': 'deploy_resp',
+            'args': {'task_uuid': 't1', 'progress': progress}}
+
+
+class TestMessageJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_messages_are_read_in_order(self):
+        journal = MessageJournal(self.path, max_bytes=200, backup_count=10)
+        for i in xrange(10):
+            journal.write(deploy_resp(i), timestamp=float(i))
+        journal.close()
+
+        self.assertGreater(len(journal_files(self.path)), 1)
+        self.assertEquals(
+            list(read_journal(self.path)),
+            [(float(i), deploy_resp(i)) for i in xrange(10)])
+
+    def test_old_files_are_removed(self):
+        journal = MessageJournal(self.path, max_bytes=1, backup_count=2)
+        for i in xrange(5):
+            journal.write(deploy_resp(i))
+        journal.close()
+
+        self.assertEquals(
+            journal_files(self.path),
+            [self.path + '.2', self.path + '.1', self.path])
+        self.assertEquals(
+            [body['args']['progress']
+             for _, body in read_journal(self.path)],
+            [2, 3, 4])
+
+    def test_incomplete_record_is_skipped(self):
+        journal = MessageJournal(self.path)
+        journal.write(deploy_resp(1))
+        journal.write(deploy_resp(2))
+        journal.close()
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+
+        self.assertEquals(
+            [body for _, body in read_journal(self.path)],
+            [deploy_resp(1)])
+
+    @patch('nailgun.rpc.threaded.db')
+    def test_consumer_writes_journal(self, mocked_db):
+        journal = MessageJournal(self.path)
+        consumer = RPCConsumer(Mock(), Mock(), journal=journal)
+        for i in xrange(3):
+            consumer.consume_msg(deploy_resp(i), Mock())
+        journal.close()
+
+        self.assertEquals(
+            [body for _, body in read_journal(self.path)],
+            [deploy_resp(i) for i in xrange(3)])
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_percentile(self):
+        values = range(1, 101)
+        self.assertEquals(percentile(values, 50), 50)
+        self.assertEquals(percentile(values, 99), 99)
+        self.assertEquals(percentile([5], 90), 5)
+        self.assertIsNone(percentile([], 50))
+
+    @patch('nailgun.rpc.threaded.db')
+    def test_replay(self, mocked_db):
+        receiver = Mock()
+        records = [(float(i), deploy_resp(i)) for i in xrange(5)]
+        records.append((5.0, {'method': 'remove_nodes_resp',
+                              'args': {'task_uuid': 't2'}}))
+
+        stats = replay(records, receiver=receiver)
+
+        self.assertEquals(receiver.deploy_resp.call_count, 5)
+        receiver.deploy_resp.assert_called_with(task_uuid='t1', progress=4)
+        self.assertEquals(stats.count, 6)
+        methods = stats.methods()
+        self.assertEquals(methods['deploy_resp']['count'], 5)
+        self.assertEquals(methods['remove_nodes_resp']['count'], 1)
+        self.assertIn('msg/s', stats.format())
+
+    @patch('nailgun.rpc.replay.time')
+    @patch('nailgun.rpc.threaded.db')
+    def test_replay_at_recorded_speed(self, mocked_db, mocked_time):
+        mocked_time.time.return_value = 100.0
+        records = [(10.0, deploy_resp(0)), (12.0, deploy_resp(1))]
+
+        replay(records, receiver=Mock(), speed=2)
+
+        mocked_time.sleep.assert_called_once_with(1.0)
@@ -19,6 +19,7 @@ from nailgun.test.base import BaseTestCase
 from nailgun.db import db
 from nailgun.db.sqlalchemy.models import Task
 from nailgun.rpc.receiver import get_task_by_uuid
+from nailgun.rpc.receiver import NailgunReceiver
 
 
 class TestUtils(BaseTestCase):
@@ -34,3 +35,30 @@ class TestUtils(BaseTestCase):
         self.assertRaises(errors.CannotFindTask,
                           get_task_by_uuid,
                           'not_found_uuid')
+
+    def test_nodes_with_invalid_uids_are_skipped(self):
+        node = self.env.create_node(api=False, status='provisioning')
+        task = Task(name='provision')
+        db().add(task)
+        db().commit()
+        NailgunReceiver.provision_resp(
+            task_uuid=task.uuid,
+            nodes=[{'status': 'provisioned', 'progress': 100},
+                   {'uid': 'abc', 'status': 'provisioned'},
+                   {'uid': node.id, 'status': 'provisioned',
+                    'progress': 100}])
+        db().refresh(node)
+        self.assertEquals(node.status, 'provisioned')
+
+        task = Task(name='deployment', cluster_id=node.cluster_id)
+        db().add(task)
+        db().commit()
+        NailgunReceiver.deploy_resp(
+            task_uuid=task.uuid,
+            nodes=[{'status': 'deploying', 'progress': 10},
+                   {'uid': 'abc', 'status': 'deploying'},
+                   {'uid': node.id, 'status': 'deploying',
+                    'progress': 10}])
+        db().refresh(node)
+        self.assertEquals(node.status, 'deploying')
+        self.assertEquals(node.progress, 10)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from collections import defaultdict
+import threading
+import unittest
+
+from mock import Mock
+from mock import patch
+
+from nailgun.rpc.threaded import RPCConsumer
+
+
+class FakeReceiver(object):
+
+    lock = threading.Lock()
+    applied = defaultdict(list)
+    threads = defaultdict(set)
+
+    @classmethod
+    def deploy_resp(cls, task_uuid, progress):
+        with cls.lock:
+            cls.applied[task_uuid].append(progress)
+            cls.threads[task_uuid].add(threading.current_thread().name)
+
+
+class TestRPCConsumerWorkers(unittest.TestCase):
+
+    # task uuid => cluster id
+    clusters = {'t1': 1, 't2': 1, 't3': 2, 't4': None}
+
+    def setUp(self):
+        FakeReceiver.applied.clear()
+        FakeReceiver.threads.clear()
+
+    @patch('nailgun.rpc.threaded.db')
+    def test_messages_of_cluster_are_applied_in_order(self, mocked_db):
+        mocked_db.return_value.query.return_value.filter_by.side_effect = \
+            lambda uuid: Mock(scalar=Mock(return_value=self.clusters[uuid]))
+
+        consumer = RPCConsumer(Mock(), FakeReceiver, workers=3)
+        messages = []
+        for progress in xrange(50):
+            for task_uuid in sorted(self.clusters):
+                msg = Mock()
+                messages.append(msg)
+                consumer.consume_msg(
+                    {'method': 'deploy_resp',
+                     'args': {'task_uuid': task_uuid,
+                              'progress': progress}},
+                    msg)
+        consumer.stop_workers()
+
+        for task_uuid in self.clusters:
+            self.assertEquals(
+                FakeReceiver.applied[task_uuid], range(50))
+            self.assertEquals(len(FakeReceiver.threads[task_uuid]), 1)
+        # tasks of one cluster are handled by one worker
+        self.assertEquals(FakeReceiver.threads['t1'],
+                          FakeReceiver.threads['t2'])
+        for msg in messages:
+            self.assertEquals(msg.ack.call_count, 1)
+        self.assertEquals(consumer.stats(), {'received': 200,
+                                             'applied': 200})
+
+    def test_partition_key_is_cached(self):
+        consumer = RPCConsumer(Mock(), FakeReceiver)
+        with patch('nailgun.rpc.threaded.db') as mocked_db:
+            mocked_db.return_value.query.return_value.filter_by.\
+                return_value.scalar.return_value = 5
+            body = {'method': 'deploy_resp', 'args': {'task_uuid': 't1'}}
+            self.assertEquals(consumer.partition_key(body), ('cluster', 5))
+            self.assertEquals(consumer.partition_key(body), ('cluster', 5))
+            self.assertEquals(mocked_db.return_value.query.call_count, 1)
+        self.assertIsNone(
+            consumer.partition_key({'method': 'x', 'args': {}}))
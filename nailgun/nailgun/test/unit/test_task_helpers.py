@@ -15,10 +15,13 @@
 #    under the License.
 
 
+from mock import patch
+
 from nailgun.db.sqlalchemy.models import Cluster
 from nailgun.db.sqlalchemy.models import Task
 from nailgun.orchestrator.deployment_serializers \
     import DeploymentHASerializer
+from nailgun.settings import settings
 from nailgun.task.helpers import TaskHelper
 from nailgun.test.base import BaseUnitTest
 
@@ -118,6 +121,29 @@ class TestTaskHelpers(BaseUnitTest):
         progress = TaskHelper.recalculate_deployment_task_progress(task)
         self.assertEquals(progress, 25)
 
+    def test_recalculate_deployment_task_progress_offline_nodes(self):
+        cluster = self.create_env([
+            {'roles': ['controller'],
+             'status': 'deploying',
+             'progress': 50},
+            {'roles': ['compute'],
+             'status': 'deploying',
+             'online': False,
+             'progress': 100},
+            {'roles': ['compute'],
+             'status': 'discover',
+             'online': False,
+             'progress': 0}])
+
+        task = Task(name='deploy', cluster_id=cluster.id)
+        self.db.add(task)
+        self.db.commit()
+
+        # offline nodes are counted twice: by status and as offline
+        # with progress 100, (50 + 100 + 0 + 100 + 100) / 5
+        progress = TaskHelper.recalculate_deployment_task_progress(task)
+        self.assertEquals(progress, 70)
+
     def test_recalculate_provisioning_task_progress(self):
         cluster = self.create_env([
             {'roles': ['controller'],
@@ -133,3 +159,30 @@ class TestTaskHelpers(BaseUnitTest):
 
         progress = TaskHelper.recalculate_provisioning_task_progress(task)
         self.assertEquals(progress, 50)
+
+    @patch.dict(settings.TASK_PROGRESS_PROPAGATION,
+                {'progress_step': 10, 'interval': 3600})
+    def test_parent_task_progress_is_debounced(self):
+        cluster = self.create_env([{'roles': ['controller']}])
+        supertask = Task(name='deploy', cluster_id=cluster.id)
+        self.db.add(supertask)
+        self.db.commit()
+        provision = supertask.create_subtask('provision')
+        provision.weight = 1.0
+        deployment = supertask.create_subtask('deployment')
+        deployment.weight = 3.0
+        self.db.commit()
+
+        TaskHelper.update_task_status(provision.uuid, 'running', 20)
+        self.assertEquals(supertask.progress, 5)
+        # change is smaller than progress_step
+        TaskHelper.update_task_status(provision.uuid, 'running', 28)
+        self.assertEquals(supertask.progress, 5)
+        TaskHelper.update_task_status(provision.uuid, 'running', 40)
+        self.assertEquals(supertask.progress, 10)
+        # status transitions are always propagated
+        TaskHelper.update_task_status(provision.uuid, 'ready', 100)
+        self.assertEquals(supertask.progress, 25)
+        TaskHelper.update_task_status(deployment.uuid, 'ready', 100)
+        self.assertEquals(supertask.status, 'ready')
+        self.assertEquals(supertask.progress, 100)
@@ -0,0 +1,73 @@
+#    Copyright 2013 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""JSON codec of API responses and requests, JSON columns
+and RPC payloads.
+
+Encoder and decoder are chosen separately as the fastest
+installed ones: C decoder of simplejson is several times faster
+than one of stdlib json, while C encoder of stdlib json is
+faster than simplejson's. Both modules produce the same output
+with default arguments (with indent simplejson doesn't leave
+trailing spaces).
+"""
+
+import json
+
+
+def _default_backends():
+    """Returns (encoder module, decoder module)."""
+    try:
+        import simplejson
+        from simplejson import _speedups  # noqa
+    except ImportError:
+        # pure Python simplejson is slower than stdlib json,
+        # which has C speedups of its own
+        return json, json
+    if json.encoder.c_make_encoder is None:
+        return simplejson, simplejson
+    return json, simplejson
+
+
+_encoder, _decoder = _default_backends()
+
+
+def backends():
+    """Returns (encoder module, decoder module)."""
+    return _encoder, _decoder
+
+
+def use(encoder, decoder=None):
+    """Makes modules with json compatible dumps and loads
+    encoder and decoder, returns previous (encoder, decoder).
+
+    :param encoder: Module used by dumps.
+    :param decoder: Module used by loads, encoder by default.
+    """
+    global _encoder, _decoder
+    previous = _encoder, _decoder
+    _encoder, _decoder = encoder, decoder or encoder
+    return previous
+
+
+def dumps(obj, **kwargs):
+    return _encoder.dumps(obj, **kwargs)
+
+
+def loads(s, encoding='utf-8', **kwargs):
+    # simplejson decodes ASCII strings of str input as str,
+    # unicode input is always decoded to unicode like stdlib does
+    if isinstance(s, str):
+        s = s.decode(encoding)
+    return _decoder.loads(s, **kwargs)